@@ -0,0 +1,178 @@
+"""Multi-threaded ``pyarrow.csv`` reader backend for the raw files.
+
+The default pandas C parser reads a file on one thread. ``pyarrow.csv``
+splits a file into blocks and parses them on all cores, and only converts
+the columns named in ``include_columns``. The raw files have no header, so
+columns are selected by their generated ``f<index>`` names and renamed to the
+``Datalog names``/``MFC names`` afterwards. The timestamp column is always
+read as text so it goes through the same explicit-format parsing as the
+pandas path.
+
+Run ``python arrow_reader.py`` to read every configured raw file with both
+backends and list any column that differs.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+    pacsv = None
+
+from file_encoding import detect_encoding
+
+READERS = ("pandas", "arrow")
+BLOCK_BYTES = 1 << 24
+# The strings pandas reads as missing by default, so both backends agree
+NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def arrow_available() -> bool:
+    """True when pyarrow is installed."""
+    return pacsv is not None
+
+
+def _arrow_encoding(encoding: str) -> str:
+    # Arrow skips a UTF-8 byte order mark itself
+    return "utf8" if encoding.replace("-", "").lower() in ("utf8", "utf8sig") else encoding
+
+
+def read_raw_table(path: Path, usecols: List[int], names: List[str],
+                   column_types: Dict[str, "pa.DataType"] | None = None,
+                   text_columns: Sequence[str] = (), null_values: Sequence[str] = NULL_VALUES,
+                   decimal: str = ".") -> "pa.Table":
+    """Read the selected columns of one tab-separated raw file as an Arrow table.
+
+    Args:
+        path: The raw datalog or MFC file to read.
+        usecols: Column indices to extract, in ascending order.
+        names: Headers for the extracted columns, in the same order as usecols.
+        column_types: Arrow type per header, for columns whose type is known.
+        text_columns: Headers always read as strings, such as the timestamp.
+        null_values: Strings read as missing.
+        decimal: Decimal mark of the numeric columns.
+
+    Returns:
+        pa.Table with the columns named ``names``.
+    """
+    raw_names = {name: f"f{col}" for col, name in zip(usecols, names)}
+    types = {raw_names[name]: pa.string() for name in text_columns if name in raw_names}
+    types.update({raw_names[name]: dtype for name, dtype in (column_types or {}).items() if name in raw_names})
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(
+            autogenerate_column_names=True,
+            use_threads=True,
+            block_size=BLOCK_BYTES,
+            encoding=_arrow_encoding(detect_encoding(path)),
+        ),
+        parse_options=pacsv.ParseOptions(delimiter="\t"),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[raw_names[name] for name in names],
+            column_types=types,
+            null_values=list(null_values),
+            strings_can_be_null=True,
+            decimal_point=decimal,
+        ),
+    )
+    return table.rename_columns(names)
+
+
+def table_to_frame(table: "pa.Table") -> pd.DataFrame:
+    """Convert a raw-file table to the frame the pandas parser would give.
+
+    All-empty columns, which Arrow types as null, become float64 NaN columns,
+    and missing text values are NaN rather than None.
+    """
+    df = table.to_pandas()
+    for name, field in zip(table.column_names, table.schema):
+        if pa.types.is_null(field.type):
+            df[name] = np.nan
+        elif df[name].dtype == object and df[name].isna().any():
+            df[name] = df[name].where(df[name].notna(), np.nan)
+    return df
+
+
+def read_arrow_frame(path: Path, usecols: List[int], names: List[str],
+                     text_columns: Sequence[str] = (), **options) -> pd.DataFrame | None:
+    """Read a raw file with Arrow, or return None if Arrow cannot parse it.
+
+    Arrow rejects lines with a different number of fields, which the pandas
+    parser pads with NaN, and values that do not fit ``column_types``, so the
+    caller falls back to pandas for those files. ``options`` are passed on to
+    ``read_raw_table``.
+    """
+    try:
+        return table_to_frame(read_raw_table(path, usecols, names, text_columns=text_columns, **options))
+    except (pa.ArrowInvalid, UnicodeDecodeError) as exc:
+        print(f"  {path.name}: the Arrow reader could not parse the file ({exc}); reading with pandas.")
+        return None
+
+
+def compare_readers(path: Path, usecols: List[int], names: List[str],
+                    timestamp_col: str | None = None) -> pd.DataFrame:
+    """Read one file with both backends and list the columns that differ.
+
+    The timestamp column is compared as the raw text both backends hand on
+    to ``parse_timestamps``.
+
+    Returns:
+        DataFrame with one row per differing column: the dtypes from each
+        backend, the number of differing values and, for float columns, the
+        largest difference in units in the last place.
+    """
+    expected = pd.read_csv(path, sep="\t", usecols=usecols, header=None, names=names,
+                           low_memory=False, encoding=detect_encoding(path))
+    text_columns = [timestamp_col] if timestamp_col is not None else []
+    actual = table_to_frame(read_raw_table(path, usecols, names, text_columns=text_columns))
+    rows = []
+    for name in names:
+        left, right = expected[name], actual[name]
+        if left.dtype == right.dtype and left.equals(right):
+            continue
+        ulps = np.nan
+        if left.dtype == right.dtype == np.float64:
+            differs = ~((left == right) | (left.isna() & right.isna()))
+            a, b = left[differs].to_numpy(), right[differs].to_numpy()
+            ulps = float(np.max(np.abs(a - b) / np.spacing(np.abs(a)))) if len(a) else 0.0
+            count = int(differs.sum())
+        else:
+            count = int((left.astype(str) != right.astype(str)).sum())
+        rows.append({"file": path.name, "column": name, "pandas": str(left.dtype),
+                     "arrow": str(right.dtype), "differences": count, "max_ulps": ulps})
+    return pd.DataFrame(rows, columns=["file", "column", "pandas", "arrow", "differences", "max_ulps"])
+
+
+if __name__ == "__main__":
+    from pipeline import discover, load_config, plan_columns
+
+    if not arrow_available():
+        raise SystemExit("pyarrow is not installed; only the pandas reader is available.")
+    config = load_config()
+    plan = plan_columns(config)
+    discovered = discover(config)
+    reports = [
+        compare_readers(path, plan.usecols, plan.names, plan.output_headers[0])
+        for path in discovered.datalog_files
+    ]
+    reports += [
+        compare_readers(path, plan.usecols_mfc, plan.names_mfc, plan.output_headers_mfc[0])
+        for path in discovered.mfc_files
+    ]
+    differences = [report for report in reports if not report.empty]
+    if not differences:
+        print("\nBoth readers give identical data for every file.")
+    else:
+        print("\nColumns that differ between the pandas and Arrow readers:")
+        print(pd.concat(differences, ignore_index=True).to_string(index=False))
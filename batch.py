@@ -0,0 +1,304 @@
+"""Build many data packs in one run on a shared worker pool.
+
+Takes a list of config files (in the ``inputs.json`` layout) or folders of
+them and builds every pack in its own worker process, at most ``--workers``
+at a time. A pack is only started while the estimated memory of the running
+packs stays under ``--memory-mb``; a pack too big for the limit runs on its
+own. Packs that read the same raw files never run side by side, and have the
+ingest cache switched on, so each shared file is parsed once and the later
+packs load it from the cache.
+
+Each pack's console output goes to its own log file, and a summary of the
+successes, failures and timings is printed and written as JSON at the end:
+
+    python batch.py configs/ rig2_inputs.json --workers 3 --memory-mb 12000
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
+
+from compact import peak_memory_mb
+from file_discovery import discover_files
+from output_plan import output_plan
+from pipeline import (RUN_REPORT_SUFFIX, build_data_pack, load_config, new_run_report, output_path,
+                      raw_schemas, stream_data_packs, timestamp_formats, write_run_report)
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DEFAULT_LOG_DIR = PROJECT_DIR / "batch_logs"
+# Rough peak memory of an in-memory build per byte of raw text
+MEMORY_PER_RAW_BYTE = 4.0
+STREAMING_MEMORY_MB = 512.0
+
+
+class PackJob(NamedTuple):
+    """One data pack to build."""
+
+    name: str
+    config_path: Path
+    config: Dict[str, Any]
+    files: FrozenSet[Path]
+    memory_mb: float
+
+
+class PackResult(NamedTuple):
+    """Outcome of one data pack build."""
+
+    name: str
+    config_path: str
+    ok: bool
+    seconds: float
+    peak_rss_mb: float | None
+    error: str | None
+    log_path: str
+    report_path: str | None
+
+
+def config_files(sources: Iterable[Path]) -> List[Path]:
+    """Expand folders into the ``*.json`` config files they hold, sorted by name."""
+    paths: List[Path] = []
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            paths.extend(sorted(source.glob("*.json")))
+        else:
+            paths.append(source)
+    return paths
+
+
+def estimate_memory_mb(config: Dict[str, Any], files: Iterable[Path]) -> float:
+    """Rough peak memory of a build, from the size of its raw files.
+
+    ``"Memory estimate (MB)"`` in the config overrides the estimate.
+    """
+    if "Memory estimate (MB)" in config:
+        return float(config["Memory estimate (MB)"])
+    if config.get("Streaming", False):
+        return STREAMING_MEMORY_MB
+    raw_bytes = sum(path.stat().st_size for path in files if path.is_file())
+    return raw_bytes * MEMORY_PER_RAW_BYTE / (1024 * 1024)
+
+
+def _planning_failure(path: Path, exc: Exception) -> PackResult:
+    return PackResult(name=path.stem, config_path=str(path), ok=False, seconds=0.0, peak_rss_mb=None,
+                      error=f"{type(exc).__name__}: {exc}", log_path="", report_path=None)
+
+
+def load_jobs(paths: Iterable[Path], workers: int) -> Tuple[List[PackJob], List[PackResult]]:
+    """Load the configs and plan one job per data pack.
+
+    Timestamp formats and raw schemas are resolved here, one pack after
+    another, so the workers never write ``timestamp_formats.json`` or
+    ``raw_schemas.json`` at the same time. With more than one worker, each
+    pack formats and reads in a single process so the pool size is the real
+    limit on concurrency.
+
+    Returns:
+        The jobs, and a failed PackResult for each config that could not be
+        planned (unreadable config, missing folder, undetectable timestamp
+        format, invalid ``"Outputs"``, or the same Folder Path and Data Pack
+        Name as an earlier config, so the same output files).
+    """
+    loaded = []
+    failures = []
+    for path in paths:
+        try:
+            config = load_config(path)
+            discovered = discover_files(Path(config["Folder Path"]))
+            files = frozenset(raw.resolve() for raw in discovered.datalog_files + discovered.mfc_files)
+            datalog_format, mfc_format = timestamp_formats(config, discovered)
+            datalog_schema, mfc_schema = raw_schemas(config, discovered)
+            output_plan(config)
+        except (OSError, KeyError, ValueError) as exc:
+            print(f"Skipping {path}: {type(exc).__name__}: {exc}")
+            failures.append(_planning_failure(path, exc))
+            continue
+        config["Timestamp format"] = datalog_format
+        config["MFC timestamp format"] = mfc_format
+        if datalog_schema is not None:
+            config["Datalog schema"] = datalog_schema.to_dict()
+        if mfc_schema is not None:
+            config["MFC schema"] = mfc_schema.to_dict()
+        if workers > 1:
+            config["Write workers"] = 1
+            config["Parallel read"] = False
+        outputs = output_path(config, "").resolve()
+        clash = next((other for other, other_config, _ in loaded
+                      if output_path(other_config, "").resolve() == outputs), None)
+        if clash is not None:
+            exc = ValueError(f"writes the same outputs as {clash} ({outputs.name}* in {outputs.parent})")
+            print(f"Skipping {path}: {exc}")
+            failures.append(_planning_failure(path, exc))
+            continue
+        loaded.append((path, config, files))
+
+    jobs = []
+    for path, config, files in loaded:
+        shared = any(files & other for other_path, _, other in loaded if other_path != path)
+        if shared:
+            config.setdefault("Ingest cache", True)
+        jobs.append(PackJob(config["Data Pack Name"], path, config, files,
+                            estimate_memory_mb(config, files)))
+    return jobs, failures
+
+
+def run_pack(config: Dict[str, Any], log_path: Path) -> Dict[str, Any]:
+    """Build one data pack in a worker process, with its output in ``log_path``."""
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            if config.get("Streaming", False):
+                report = new_run_report(config, "streaming")
+                stream_data_packs(config, report=report)
+                write_run_report(report, config)
+            else:
+                build_data_pack(config)
+            error = None
+        except Exception as exc:
+            traceback.print_exc()
+            error = f"{type(exc).__name__}: {exc}"
+    return {
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_memory_mb(),
+        "error": error,
+    }
+
+
+def _admit(job: PackJob, running: List[PackJob], memory_mb: float | None) -> bool:
+    """Whether ``job`` can start next to the packs already running."""
+    if not running:
+        return True
+    if any(job.files & other.files for other in running):
+        return False
+    if memory_mb is None:
+        return True
+    return sum(other.memory_mb for other in running) + job.memory_mb <= memory_mb
+
+
+def run_batch(jobs: List[PackJob], workers: int = 1, memory_mb: float | None = None,
+              log_dir: Path = DEFAULT_LOG_DIR) -> List[PackResult]:
+    """Build every pack on one worker pool.
+
+    Jobs start in order. A job that does not fit yet (too much memory in
+    use, or raw files shared with a running pack) waits, and later jobs
+    that do fit may start first.
+
+    Args:
+        jobs: The packs to build.
+        workers: Most packs built at the same time.
+        memory_mb: Limit on the summed memory estimates of running packs.
+        log_dir: Folder for the per-pack log files.
+
+    Returns:
+        One PackResult per job, in job order.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
+    pending = list(range(len(jobs)))
+    running: Dict[Future, int] = {}
+    results: Dict[int, PackResult] = {}
+    started: Dict[int, float] = {}
+
+    # Packs from different folders may share a name; their logs must not
+    names = [job.name for job in jobs]
+    log_paths = [
+        log_dir / (f"{job.name}.log" if names.count(job.name) == 1 else f"{job.name}_{index + 1}.log")
+        for index, job in enumerate(jobs)
+    ]
+
+    # A fresh process per pack, so memory is returned and peak RSS is per pack
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        while pending or running:
+            for index in list(pending):
+                if len(running) >= workers:
+                    break
+                job = jobs[index]
+                if _admit(job, [jobs[other] for other in running.values()], memory_mb):
+                    print(f"Starting {job.name} (estimated {job.memory_mb:.0f} MB)...")
+                    started[index] = time.perf_counter()
+                    running[pool.submit(run_pack, job.config, log_paths[index])] = index
+                    pending.remove(index)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                job = jobs[index]
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    # The worker died, e.g. killed for running out of memory
+                    outcome = {"seconds": time.perf_counter() - started[index],
+                               "peak_rss_mb": None, "error": f"{type(exc).__name__}: {exc}"}
+                ok = outcome["error"] is None
+                report_path = output_path(job.config, RUN_REPORT_SUFFIX)
+                result = PackResult(
+                    name=job.name,
+                    config_path=str(job.config_path),
+                    ok=ok,
+                    seconds=outcome["seconds"],
+                    peak_rss_mb=outcome["peak_rss_mb"],
+                    error=outcome["error"],
+                    log_path=str(log_paths[index]),
+                    report_path=str(report_path) if ok and report_path.exists() else None,
+                )
+                results[index] = result
+                status = "done" if ok else f"FAILED ({result.error})"
+                print(f"{job.name}: {status} in {result.seconds:.1f} s")
+    return [results[index] for index in range(len(jobs))]
+
+
+def write_summary(results: List[PackResult], path: Path, seconds: float) -> Path:
+    """Print the batch summary and write it as JSON."""
+    print(f"\n{'Data pack':<32}{'Status':<8}{'Seconds':>10}{'Peak RSS (MB)':>15}")
+    for result in results:
+        peak = f"{result.peak_rss_mb:.0f}" if result.peak_rss_mb is not None else "-"
+        status = "ok" if result.ok else "failed"
+        print(f"{result.name:<32}{status:<8}{result.seconds:>10.1f}{peak:>15}")
+    failed = [result for result in results if not result.ok]
+    print(f"\n{len(results) - len(failed)} succeeded, {len(failed)} failed in {seconds:.1f} s.")
+    for result in failed:
+        log = f" (see {result.log_path})" if result.log_path else ""
+        print(f"  {result.name}: {result.error}{log}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "finished": datetime.now().isoformat(timespec="seconds"),
+            "total_seconds": seconds,
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "packs": [result._asdict() for result in results],
+        }, f, indent=2)
+    print(f"Summary: {path}")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build several data packs on a shared worker pool.")
+    parser.add_argument("configs", nargs="+", type=Path,
+                        help="config files in the inputs.json layout, or folders of them")
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="most packs built at the same time (default: half the CPU cores)")
+    parser.add_argument("--memory-mb", type=float,
+                        help="limit on the estimated memory of the packs running at once")
+    parser.add_argument("--log-dir", type=Path, default=DEFAULT_LOG_DIR,
+                        help="folder for the per-pack logs and the summary")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    jobs, failures = load_jobs(config_files(args.configs), args.workers)
+    print(f"\nBuilding {len(jobs)} data pack(s) with up to {args.workers} worker(s)...")
+    results = run_batch(jobs, args.workers, args.memory_mb, args.log_dir) + failures
+    write_summary(results, args.log_dir / f"batch_summary_{datetime.now():%Y%m%d_%H%M%S}.json",
+                  time.perf_counter() - start)
+    if any(not result.ok for result in results):
+        raise SystemExit(1)
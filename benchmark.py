@@ -0,0 +1,238 @@
+"""Time and memory-profile each stage of the pipeline.
+
+Runs the stages of a data pack build one by one (file discovery, reads,
+merge, sort check, resample, duplicate removal, sentinel detection and CSV
+writes) on synthetic data or on a real ``inputs.json`` and stores the
+results as JSON, so a change can be compared against a baseline run:
+
+    python benchmark.py --rows 500000 --output before.json
+    python benchmark.py --rows 500000 --baseline before.json
+
+Each stage is timed over ``--repeat`` runs (the best time is kept) and then
+run once more under ``tracemalloc`` for its peak allocation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from csv_writer import write_csv
+from file_discovery import discover_files
+from functions import (deduplicate_timestamps, read_raw_files, replace_constant_numeric_columns,
+                       resample_seconds)
+from merge import merge_time_ordered, sort_by_time
+from pipeline import load_config, mfc_resampling, plan_columns, sentinel_values
+from synthetic_data import SyntheticSpec, add_spec_arguments, spec_from_args, write_synthetic_pack
+
+PROJECT_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = PROJECT_DIR / "benchmark_results"
+# A stage this much slower than the baseline is flagged
+SLOWER_THRESHOLD = 1.10
+
+
+class StageResult(NamedTuple):
+    """Best wall time of one stage and the peak memory it allocated."""
+
+    seconds: float
+    peak_mb: float | None
+
+
+class _Recorder:
+    """Runs stages, keeping their timings and (when tracing) peak memory."""
+
+    def __init__(self, trace: bool) -> None:
+        self.trace = trace
+        self.seconds: Dict[str, float] = {}
+        self.peaks: Dict[str, float] = {}
+
+    def __call__(self, name: str, func: Callable, *args, **kwargs):
+        if self.trace:
+            tracemalloc.reset_peak()
+            held = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.seconds[name] = time.perf_counter() - start
+        if self.trace:
+            # Peak on top of what was already held when the stage started
+            self.peaks[name] = (tracemalloc.get_traced_memory()[1] - held) / (1024 * 1024)
+        return result
+
+
+def _run_stages(config: Dict[str, Any], output_dir: Path, stage: _Recorder) -> Dict[str, int]:
+    """Run every stage once, in pipeline order. Returns the row counts."""
+    plan = plan_columns(config)
+    aggregation, max_gap = mfc_resampling(config)
+    sentinels = sentinel_values(config)
+
+    discovered = stage("discover_files", discover_files, Path(config["Folder Path"]))
+
+    def read():
+        datalog = read_raw_files(discovered.datalog_files, plan.usecols, plan.names,
+                                 timestamp_col=plan.output_headers[0],
+                                 timestamp_format=config.get("Timestamp format"))
+        mfc = read_raw_files(discovered.mfc_files, plan.usecols_mfc, plan.names_mfc,
+                             timestamp_col=plan.output_headers_mfc[0],
+                             timestamp_format=config.get("MFC timestamp format"))
+        return datalog, mfc
+
+    datalog_frames, mfc_frames = stage("read_raw_files", read)
+    df, dfMfc = stage("merge_time_ordered", lambda: (merge_time_ordered(datalog_frames),
+                                                     merge_time_ordered(mfc_frames)))
+    del datalog_frames, mfc_frames
+    raw_rows = {"datalog": len(df), "mfc": len(dfMfc)}
+
+    for new_column in config["Additional columns"]:
+        if new_column not in df.columns:
+            df[new_column] = "-"
+    df = df.reindex(columns=plan.output_headers)
+    dfMfc = dfMfc.reindex(columns=plan.output_headers_mfc)
+
+    df, dfMfc = stage("sort_by_time", lambda: (sort_by_time(df), sort_by_time(dfMfc)))
+    dfMfc = stage("resample_seconds", resample_seconds, dfMfc, aggregation, max_gap)
+    df.insert(1, "Time Step", np.arange(len(df)))
+    dfMfc.insert(1, "Time Step", np.arange(len(dfMfc)))
+
+    df, dfMfc = stage("deduplicate_timestamps", lambda: (deduplicate_timestamps(df),
+                                                         deduplicate_timestamps(dfMfc)))
+    df, dfMfc = stage("replace_constant_numeric_columns",
+                      lambda: (replace_constant_numeric_columns(df, sentinels),
+                               replace_constant_numeric_columns(dfMfc, sentinels)))
+
+    def write():
+        write_csv(df, output_dir / "datalog.csv")
+        write_csv(dfMfc, output_dir / "mfc.csv")
+
+    stage("write_csv", write)
+    return raw_rows
+
+
+def run_benchmark(config: Dict[str, Any], repeat: int = 1, memory: bool = True) -> Dict[str, Any]:
+    """Time every stage on the data ``config`` points at.
+
+    Args:
+        config: The run configuration.
+        repeat: Timed runs per stage; the fastest is reported.
+        memory: Also run once under ``tracemalloc`` for each stage's peak.
+
+    Returns:
+        Dict with the environment, row counts and per-stage results, ready
+        to be written as JSON.
+    """
+    timings: Dict[str, List[float]] = {}
+    rows: Dict[str, int] = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(max(repeat, 1)):
+            recorder = _Recorder(trace=False)
+            rows = _run_stages(config, Path(output_dir), recorder)
+            for name, seconds in recorder.seconds.items():
+                timings.setdefault(name, []).append(seconds)
+
+        peaks: Dict[str, float] = {}
+        if memory:
+            recorder = _Recorder(trace=True)
+            tracemalloc.start()
+            try:
+                _run_stages(config, Path(output_dir), recorder)
+            finally:
+                tracemalloc.stop()
+            peaks = recorder.peaks
+
+    stages = {
+        name: StageResult(seconds=min(runs), peak_mb=peaks.get(name))._asdict()
+        for name, runs in timings.items()
+    }
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "rows": rows,
+        "repeat": repeat,
+        "stages": stages,
+        "total_seconds": sum(stage["seconds"] for stage in stages.values()),
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Print each stage's time against a baseline run.
+
+    Returns:
+        Names of the stages more than 10% slower than the baseline.
+    """
+    slower = []
+    print(f"\n{'Stage':<34}{'Baseline (s)':>14}{'Current (s)':>14}{'Ratio':>8}")
+    for name, stage in current["stages"].items():
+        before = baseline["stages"].get(name)
+        if before is None:
+            print(f"{name:<34}{'-':>14}{stage['seconds']:>14.3f}{'-':>8}")
+            continue
+        ratio = stage["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        flag = "  slower" if ratio > SLOWER_THRESHOLD else ""
+        print(f"{name:<34}{before['seconds']:>14.3f}{stage['seconds']:>14.3f}{ratio:>8.2f}{flag}")
+        if flag:
+            slower.append(name)
+    return slower
+
+
+def _print_results(results: Dict[str, Any]) -> None:
+    print(f"\nRows: {results['rows']['datalog']} datalog, {results['rows']['mfc']} MFC")
+    print(f"{'Stage':<34}{'Seconds':>10}{'Peak (MB)':>12}")
+    for name, stage in results["stages"].items():
+        peak = f"{stage['peak_mb']:.1f}" if stage["peak_mb"] is not None else "-"
+        print(f"{name:<34}{stage['seconds']:>10.3f}{peak:>12}")
+    print(f"{'Total':<34}{results['total_seconds']:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the data pack pipeline stage by stage.")
+    parser.add_argument("--config", type=Path,
+                        help="benchmark the data in this inputs.json instead of synthetic data")
+    parser.add_argument("--data", type=Path, help="keep the synthetic files in this folder")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--output", type=Path, help="results JSON (default: benchmark_results/)")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        spec: SyntheticSpec | None = None
+        if args.config is not None:
+            config = load_config(args.config)
+        else:
+            spec = spec_from_args(args)
+            folder = args.data or Path(scratch) / "raw"
+            print(f"Writing synthetic data to {folder}...")
+            config = write_synthetic_pack(folder, spec)
+
+        results = run_benchmark(config, repeat=args.repeat, memory=not args.no_memory)
+        results["spec"] = spec._asdict() if spec is not None else None
+        results["config"] = str(args.config) if args.config is not None else None
+
+    _print_results(results)
+
+    output = args.output or RESULTS_DIR / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare_results(results, json.load(f))
@@ -0,0 +1,116 @@
+"""Compact in-memory dtypes for long data packs.
+
+With 40+ channels logged at 1 Hz for weeks, float64 channels and object
+columns of "-" take several gigabytes. In compact mode:
+
+- sensor channels are stored as float32 when every value prints the same
+  from float32, so the CSVs are unchanged;
+- placeholder and hyphenated columns become a one-category categorical of
+  "-", one byte per row instead of an object pointer per row;
+- with Arrow dtypes, text columns are stored as Arrow-backed strings.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+PLACEHOLDER = "-"
+
+
+def placeholder_column(length: int) -> pd.Categorical:
+    """A column of ``length`` hyphens stored as one-byte category codes."""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[PLACEHOLDER])
+
+
+def float32_safe(values: np.ndarray) -> bool:
+    """True when every value reads back unchanged from its float32 text form."""
+    valid = np.unique(values[~np.isnan(values)])
+    narrowed = valid.astype(np.float32)
+    if not np.isfinite(narrowed[np.isfinite(valid)]).all():
+        return False
+    return bool((narrowed.astype(str).astype(np.float64) == valid).all())
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    """Memory held by a DataFrame, including the strings in object columns."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def peak_memory_mb() -> float | None:
+    """Peak resident memory of this process so far, or None if unavailable."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def compact_frame(df: pd.DataFrame, placeholders: Iterable[str] = (),
+                  arrow_dtypes: bool = False, downcast: bool = True) -> pd.DataFrame:
+    """Store the columns of a frame in compact dtypes.
+
+    The first (timestamp) column is left as it is.
+
+    Args:
+        df: The frame to compact.
+        placeholders: Columns that only hold hyphens; stored as categorical markers.
+        arrow_dtypes: Store text columns as Arrow-backed strings.
+        downcast: Store float64 columns as float32 where that prints the same.
+
+    Returns:
+        DataFrame with the same values in smaller dtypes.
+    """
+    placeholders = set(placeholders)
+    changes = {}
+    for col in df.columns[1:]:
+        series = df[col]
+        if col in placeholders:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                changes[col] = placeholder_column(len(df))
+        elif downcast and series.dtype == np.float64:
+            if float32_safe(series.to_numpy()):
+                changes[col] = series.astype(np.float32)
+        elif arrow_dtypes and series.dtype == object:
+            changes[col] = series.astype("string[pyarrow]")
+    if not changes:
+        return df
+    result = df.assign(**changes)
+    result.attrs = dict(df.attrs)
+    return result
+
+
+def report_memory(label: str, before_mb: float, after_mb: float) -> None:
+    """Print the memory of a frame before and after compaction, and the process peak."""
+    peak = peak_memory_mb()
+    peak_text = f", process peak {peak:.1f} MB" if peak is not None else ""
+    print(f"  {label}: {before_mb:.1f} MB -> {after_mb:.1f} MB{peak_text}")
@@ -1,26 +1,45 @@
+import hashlib
+import io
+from itertools import chain, islice
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple
+
 import pandas as pd
 import numpy as np 
-from pathlib import Path
+
+from file_encoding import FALLBACK_ENCODINGS, detect_encoding, remember_encoding
+
 
 
 
+DEFAULT_COMPARE_CHUNK_ROWS = 100_000
+CSV_ENCODINGS = FALLBACK_ENCODINGS
 
 original_filepath = Path(r"C:\LocalOnly\Data packs raw data\SCA005_SCA006_AgeingTuning_240925_DataPack 1.csv").resolve()
 comparison_filepath = Path(r"C:\LocalOnly\Data packs raw data\SCA005_SCA006_AgeingTuning_240925 41 comparison.csv").resolve()
 
 
 def load_csv(path: Path) -> pd.DataFrame:
-    """Load CSV while handling Windows-encoded exports from Excel."""
+    """Load CSV while handling Windows-encoded exports from Excel.
 
-    encodings_to_try = ("utf-8", "utf-8-sig", "cp1252", "latin1")
+    The encoding is detected from the BOM and a sample of the file, so the
+    file is normally parsed once. If bytes past the sample do not fit the
+    detected encoding, the remaining fallback encodings are tried in turn.
+    """
+
+    detected = detect_encoding(path)
+    encodings_to_try = (detected,) + tuple(enc for enc in CSV_ENCODINGS if enc != detected)
     last_error: Exception | None = None
 
     for enc in encodings_to_try:
         try:
-            return pd.read_csv(path, encoding=enc)
+            df = pd.read_csv(path, encoding=enc)
         except UnicodeDecodeError as exc:
             last_error = exc
             continue
+        if enc != detected:
+            remember_encoding(path, enc)
+        return df
 
     msg = f"Unable to decode {path} with tried encodings {encodings_to_try}."
     if last_error is not None:
@@ -67,36 +86,69 @@ def compare_exact(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
 def compare_numeric_with_tol(a: pd.DataFrame, b: pd.DataFrame, atol=0.0, rtol=1e-12) -> pd.DataFrame:
     """
     Numeric-aware comparison:
-    - For numeric columns: uses np.isclose with atol/rtol.
+    - For numeric columns: uses np.isclose with atol/rtol; +inf and -inf
+      only match themselves, and NaN matches NaN (a lone NaN compares as 0).
     - For non-numeric: exact match.
+    Numeric and non-numeric columns are each compared as one 2D block, and
+    the differing cells are pulled out with a single nonzero call per block.
     Returns a tall diff table with columns: column, index, left, right, abs_diff.
+
+    Run ``python -m doctest csv_comparison.py`` to check the special values:
+
+    >>> inf = float("inf")
+    >>> a = pd.DataFrame({"x": [1.0, inf, -inf, inf, inf, np.nan, np.nan, 2.0]})
+    >>> b = pd.DataFrame({"x": [1.0, inf, -inf, -inf, 5.0, np.nan, 3.0, inf]})
+    >>> compare_numeric_with_tol(a, b, rtol=1e-6)["index"].tolist()
+    [3, 4, 6, 7]
     """
+    numeric = [
+        col for col in a.columns
+        if pd.api.types.is_numeric_dtype(a[col]) and pd.api.types.is_numeric_dtype(b[col])
+    ]
+    others = [col for col in a.columns if col not in set(numeric)]
+
     diffs = []
-    for col in a.columns:
-        s1, s2 = a[col], b[col]
-        # Align types for comparison
-        if pd.api.types.is_numeric_dtype(s1) and pd.api.types.is_numeric_dtype(s2):
-            # Treat NaNs as equal if both NaN
-            both_nan = s1.isna() & s2.isna()
-            close = np.isclose(s1.fillna(0), s2.fillna(0), rtol=rtol, atol=atol)
-            mask = ~(close | both_nan)
-        else:
-            mask = ~(s1.eq(s2) | (s1.isna() & s2.isna()))
-
-        if mask.any():
-            sub = pd.DataFrame({
-                "column": col,
-                "index": a.index[mask],
-                "left": s1[mask],
-                "right": s2[mask],
-            })
-            # Add absolute difference for numerics (NaN for non-numeric)
-            with np.errstate(invalid="ignore"):
-                sub["abs_diff"] = (sub["left"] - sub["right"]).abs() if pd.api.types.is_numeric_dtype(s1) and pd.api.types.is_numeric_dtype(s2) else np.nan
-            diffs.append(sub)
+    if numeric:
+        whole = len(numeric) == len(a.columns)
+        left = (a if whole else a[numeric]).to_numpy(dtype=float, na_value=np.nan)
+        right = (b if whole else b[numeric]).to_numpy(dtype=float, na_value=np.nan)
+        nan1, nan2 = np.isnan(left), np.isnan(right)
+        # Treat NaNs as equal if both NaN; a lone NaN compares as 0
+        filled1 = np.where(nan1, 0.0, left) if nan1.any() else left
+        filled2 = np.where(nan2, 0.0, right) if nan2.any() else right
+        # np.isclose's test, written out so the difference is computed once.
+        # Infinities only match themselves: rtol * inf would let any gap pass
+        finite = np.isfinite(filled1) & np.isfinite(filled2)
+        with np.errstate(invalid="ignore"):
+            gap = np.abs(filled1 - filled2)
+            close = np.where(finite, gap <= atol + rtol * np.abs(filled2), filled1 == filled2)
+        cols, rows = np.nonzero(~(close | (nan1 & nan2)).T)
+        with np.errstate(invalid="ignore"):
+            abs_diff = np.abs(left[rows, cols] - right[rows, cols])
+        diffs.append(pd.DataFrame({
+            "column": np.asarray(numeric, dtype=object)[cols],
+            "index": a.index[rows],
+            "left": left[rows, cols],
+            "right": right[rows, cols],
+            "abs_diff": abs_diff,
+        }))
 
+    if others:
+        left = a[others].to_numpy(dtype=object)
+        right = b[others].to_numpy(dtype=object)
+        nan1, nan2 = pd.isna(left), pd.isna(right)
+        cols, rows = np.nonzero(~((left == right) | (nan1 & nan2)).T)
+        diffs.append(pd.DataFrame({
+            "column": np.asarray(others, dtype=object)[cols],
+            "index": a.index[rows],
+            "left": left[rows, cols],
+            "right": right[rows, cols],
+            "abs_diff": np.nan,
+        }))
+
+    diffs = [diff for diff in diffs if not diff.empty]
     if diffs:
-        out = pd.concat(diffs, ignore_index=True)
+        out = pd.concat(diffs, ignore_index=True) if len(diffs) > 1 else diffs[0]
         # optional: sort by column then index
         return out.sort_values(["column", "index"], kind="stable").reset_index(drop=True)
     return pd.DataFrame()
@@ -112,25 +164,161 @@ def diff_summary(diff_df: pd.DataFrame) -> pd.DataFrame:
     return grp.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
 
 
-df = load_csv(original_filepath)
-df_compare = load_csv(comparison_filepath)
+class ChunkedComparison(NamedTuple):
+    """Outcome of a chunked comparison of two CSV files."""
+
+    chunks: int
+    identical_chunks: int
+    rows_left: int
+    rows_right: int
+    headers_match: bool
+    summary: pd.DataFrame
+
+    @property
+    def identical(self) -> bool:
+        """True when both files hold exactly the same header and rows."""
+        return self.headers_match and self.identical_chunks == self.chunks and self.rows_left == self.rows_right
+
+
+def _read_csv_bytes(header: bytes, block: bytes, encoding: str,
+                    dtype: Dict[str, str] | None = None) -> pd.DataFrame:
+    """Parse a block of CSV lines under its header, in the file's detected encoding first.
 
-a, b = align_frames(df, df_compare, key=None)
+    A block whose values do not fit ``dtype`` (text in a column that was
+    numeric in the first block) is parsed again with inferred dtypes.
+    """
+    for enc in (encoding,) + tuple(enc for enc in CSV_ENCODINGS if enc != encoding):
+        try:
+            try:
+                return pd.read_csv(io.BytesIO(header + block), encoding=enc, dtype=dtype)
+            except ValueError as exc:
+                if dtype is None or isinstance(exc, UnicodeDecodeError):
+                    raise
+                return pd.read_csv(io.BytesIO(header + block), encoding=enc)
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError("unknown", block, 0, len(block), f"Unable to decode chunk with {CSV_ENCODINGS}.")
 
-exact_diff = compare_exact(a,b)
 
-if exact_diff.empty:
-    print("The dataframes are exactly the same.")
-else:
-    print("Differences found between dataframes:")
-    print(exact_diff)
+def _block_dtypes(header: bytes, block: bytes, encoding: str) -> Dict[str, str] | None:
+    """The dtypes of a file, inferred once from its header and first block.
+
+    Numeric columns are read as float64 so that a later block with blanks or
+    decimals still fits; every other column is read as text.
+    """
+    if not block:
+        return None
+    frame = _read_csv_bytes(header, block, encoding)
+    return {col: "float64" if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            else "object" for col, dtype in frame.dtypes.items()}
+
+
+def _iter_blocks(f: BinaryIO, chunk_rows: int) -> Iterator[bytes]:
+    """Yield the remaining lines of a binary file, ``chunk_rows`` lines at a time."""
+    while True:
+        lines = list(islice(f, chunk_rows))
+        if not lines:
+            return
+        yield b"".join(lines)
+
+
+def _block_rows(block: bytes) -> int:
+    """Number of lines in a block, counting a final line with no newline."""
+    return block.count(b"\n") + (1 if block and not block.endswith(b"\n") else 0)
+
+
+def merge_summaries(summaries: List[pd.DataFrame]) -> pd.DataFrame:
+    """Combine per-chunk ``diff_summary`` tables into one."""
+    summaries = [summary for summary in summaries if not summary.empty]
+    if not summaries:
+        return diff_summary(pd.DataFrame())
+    grp = pd.concat(summaries, ignore_index=True).groupby("column", as_index=False).agg(
+        count=("count", "sum"),
+        max_abs_diff=("max_abs_diff", "max"),
+    )
+    return grp.sort_values("count", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def compare_csv_chunked(left: Path, right: Path, atol=0.0, rtol=1e-12,
+                        chunk_rows: int = DEFAULT_COMPARE_CHUNK_ROWS) -> ChunkedComparison:
+    """Compare two CSV files row by row without loading either one whole.
+
+    Both files are read in aligned blocks of ``chunk_rows`` lines and each
+    block is hashed. When the headers match, blocks with equal digests are
+    skipped without being parsed; only differing blocks are parsed and go
+    through ``compare_numeric_with_tol``. The dtypes of each file are
+    inferred once, from its header and first block, and every parsed block is
+    read with them, so a column is not numeric in one block and text in the
+    next. Rows are matched by position, as ``align_frames`` does without a key.
+
+    Args:
+        left: The reference CSV.
+        right: The CSV to check against it.
+        atol: Absolute tolerance for numeric columns.
+        rtol: Relative tolerance for numeric columns.
+        chunk_rows: Lines per block.
+
+    Returns:
+        ChunkedComparison with block counts and the per-column ``diff_summary``.
+    """
+    encoding1, encoding2 = detect_encoding(left), detect_encoding(right)
+    with open(left, "rb") as f1, open(right, "rb") as f2:
+        header1, header2 = f1.readline(), f2.readline()
+        headers_match = header1 == header2
+
+        chunks = identical = rows_left = rows_right = 0
+        summaries: List[pd.DataFrame] = []
+        blocks1, blocks2 = _iter_blocks(f1, chunk_rows), _iter_blocks(f2, chunk_rows)
+        first1, first2 = next(blocks1, b""), next(blocks2, b"")
+        blocks1, blocks2 = chain([first1], blocks1), chain([first2], blocks2)
+        # Inferred from the first blocks once a block differs, then passed to every block read
+        dtypes = None
+        while True:
+            block1, block2 = next(blocks1, b""), next(blocks2, b"")
+            if not block1 and not block2:
+                break
+            offset = rows_left if block1 else rows_right
+            chunks += 1
+            rows_left += _block_rows(block1)
+            rows_right += _block_rows(block2)
+
+            # Cheap digest check first; identical regions are never parsed
+            if headers_match and hashlib.blake2b(block1).digest() == hashlib.blake2b(block2).digest():
+                identical += 1
+                continue
+
+            if dtypes is None:
+                dtypes = (_block_dtypes(header1, first1, encoding1), _block_dtypes(header2, first2, encoding2))
+            a = _read_csv_bytes(header1, block1, encoding1, dtypes[0])
+            b = _read_csv_bytes(header2, block2, encoding2, dtypes[1])
+            a.index += offset
+            b.index += offset
+            a, b = align_frames(a, b, key=None)
+            summaries.append(diff_summary(compare_numeric_with_tol(a, b, atol=atol, rtol=rtol)))
+
+    return ChunkedComparison(
+        chunks=chunks,
+        identical_chunks=identical,
+        rows_left=rows_left,
+        rows_right=rows_right,
+        headers_match=headers_match,
+        summary=merge_summaries(summaries),
+    )
 
-numeric_diff = compare_numeric_with_tol(a, b, atol=1e-6, rtol=1e-12)
-if numeric_diff.empty:
-    print("No differences within tolerance ✅")
-else:
-    print("Differences beyond tolerance:")
-    print(diff_summary(numeric_diff)) 
 
+if __name__ == "__main__":
+    result = compare_csv_chunked(original_filepath, comparison_filepath, atol=1e-6, rtol=1e-12)
 
+    if result.identical:
+        print("The files are exactly the same.")
+    else:
+        print(f"Differences found: {result.chunks - result.identical_chunks} of {result.chunks} "
+              f"chunk(s) differ ({result.rows_left} vs {result.rows_right} rows).")
+        if not result.headers_match:
+            print("The headers differ; only the shared columns are compared.")
 
+    if result.summary.empty:
+        print("No differences within tolerance ✅")
+    else:
+        print("Differences beyond tolerance:")
+        print(result.summary)
@@ -0,0 +1,197 @@
+"""Chunked, parallel CSV writer for the data pack outputs.
+
+``write_csv`` gives the same bytes as ``DataFrame.to_csv(path, index=False)``
+but formats the frame in row chunks on a pool of worker processes and writes
+the chunks in order. Formatting in ``to_csv`` holds the GIL, so worker threads
+would not run side by side; processes do.
+
+Datetime columns are printed with one layout for the whole frame, picked the
+way ``to_csv`` picks it. ``to_csv`` itself decides per internal block of rows,
+so one sub-second timestamp would otherwise add ``.000`` to only some rows.
+
+Columns listed in ``df.attrs["hyphenated_columns"]`` (or passed explicitly)
+are written as "-" chunk by chunk, so invalid columns can stay numeric in
+memory instead of being turned into whole object columns of strings.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from run_report import advance
+
+HYPHENATED_ATTR = "hyphenated_columns"
+DEFAULT_WRITE_CHUNK_ROWS = 100_000
+# Below this many rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 500_000
+
+_DAY_NS = 86_400_000_000_000
+_SECOND_NS = 1_000_000_000
+
+
+def hyphenated_columns(df: pd.DataFrame) -> List[str]:
+    """Return the columns of ``df`` that are marked to be written as hyphens."""
+    return [col for col in df.attrs.get(HYPHENATED_ATTR, []) if col in df.columns]
+
+
+def _datetime_precision(values: np.ndarray) -> str:
+    """Pick the layout ``to_csv`` would use for a datetime column.
+
+    Mirrors pandas: date only when every value is midnight, otherwise the
+    coarsest of seconds/milli/micro/nanoseconds that shows every value exactly.
+    """
+    valid = values[values != np.iinfo(np.int64).min]
+    if not len(valid) or not (valid % _DAY_NS).any():
+        return "date"
+    fraction = valid % _SECOND_NS
+    if (fraction % 1_000).any():
+        return "ns"
+    if (fraction % 1_000_000).any():
+        return "us"
+    if fraction.any():
+        return "ms"
+    return "s"
+
+
+def _format_datetimes(series: pd.Series, precision: str) -> pd.Series:
+    """Format a datetime column with a fixed layout, NaT as an empty field."""
+    unit = {"date": "D", "s": "s", "ms": "ms", "us": "us", "ns": "ns"}[precision]
+    text = np.datetime_as_string(series.to_numpy(dtype="datetime64[ns]"), unit=unit)
+    text = pd.Series(np.char.replace(text, "T", " "), index=series.index, dtype=object)
+    return text.where(series.notna(), np.nan)
+
+
+def _datetime_layouts(df: pd.DataFrame) -> Dict[str, str]:
+    """Whole-frame layout of every datetime column, so all chunks print alike."""
+    layouts = {}
+    for col in df.columns:
+        if pd.api.types.is_datetime64_dtype(df[col].dtype):
+            values = df[col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            layouts[col] = _datetime_precision(values)
+    return layouts
+
+
+_PRECISIONS = ("date", "s", "ms", "us", "ns")
+
+
+class LayoutTally:
+    """Whole-stream datetime layouts, gathered one chunk at a time.
+
+    Gives the layouts ``write_csv`` would use for the concatenated chunks, so
+    a stream written chunk by chunk prints like the whole frame.
+    """
+
+    def __init__(self) -> None:
+        self.layouts: Dict[str, str] = {}
+
+    def add(self, chunk: pd.DataFrame) -> bool:
+        """Fold one chunk into the tally; True if a layout changed."""
+        changed = False
+        for col, precision in _datetime_layouts(chunk).items():
+            current = self.layouts.get(col)
+            merged = precision if current is None else max(current, precision, key=_PRECISIONS.index)
+            if merged != current:
+                self.layouts[col] = merged
+                changed = True
+        return changed
+
+
+def format_csv_chunk(chunk: pd.DataFrame, header: bool, hyphenated: Iterable[str] = (),
+                     layouts: Dict[str, str] | None = None) -> str:
+    """Format one chunk of rows as CSV text.
+
+    Args:
+        chunk: The rows to format.
+        header: Include the header line.
+        hyphenated: Columns written as "-" on every row.
+        layouts: Whole-frame datetime layouts from ``_datetime_layouts`` or ``LayoutTally``.
+
+    Returns:
+        str: The CSV text for the chunk.
+    """
+    replacements = {col: "-" for col in hyphenated}
+    for col, precision in (layouts or {}).items():
+        # to_csv picks the layout per block of about 100000 / columns rows, so
+        # only an all-dates column prints alike throughout without help
+        if col not in replacements and precision != "date":
+            replacements[col] = _format_datetimes(chunk[col], precision)
+    if replacements:
+        chunk = chunk.assign(**replacements)
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=header)
+    return buffer.getvalue()
+
+
+def _iter_formatted(df: pd.DataFrame, hyphenated: List[str], layouts: Dict[str, str],
+                    chunk_rows: int, workers: int) -> Iterator[str]:
+    """Yield the CSV text of ``df`` chunk by chunk, in row order."""
+    starts = range(0, max(len(df), 1), chunk_rows)
+    if workers <= 1:
+        for start in starts:
+            yield format_csv_chunk(df.iloc[start:start + chunk_rows], start == 0, hyphenated, layouts)
+        return
+
+    # Keep a bounded number of chunks in flight so memory stays flat
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: deque = deque()
+        for start in starts:
+            in_flight.append(pool.submit(
+                format_csv_chunk, df.iloc[start:start + chunk_rows], start == 0, hyphenated, layouts
+            ))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def write_csv(df: pd.DataFrame, path: Path, hyphenated: Iterable[str] | None = None,
+              workers: int | None = None, chunk_rows: int = DEFAULT_WRITE_CHUNK_ROWS) -> None:
+    """Write a DataFrame to CSV as ``to_csv(index=False)`` does, with one datetime layout per column.
+
+    Args:
+        df: The frame to write.
+        path: Destination CSV file.
+        hyphenated: Columns written as "-" on every row. Defaults to the
+            columns marked in ``df.attrs["hyphenated_columns"]``.
+        workers: Number of formatting processes. ``None`` uses one per CPU
+            core; small frames are always formatted in this process.
+        chunk_rows: Rows formatted per chunk.
+    """
+    hyphenated = hyphenated_columns(df) if hyphenated is None else [
+        col for col in hyphenated if col in df.columns
+    ]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if len(df) < PARALLEL_MIN_ROWS:
+        workers = 1
+    layouts = _datetime_layouts(df)
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for start, text in zip(range(0, max(len(df), 1), chunk_rows),
+                               _iter_formatted(df, hyphenated, layouts, chunk_rows, workers)):
+            f.write(text)
+            advance(rows=min(chunk_rows, len(df) - start))
+
+
+def append_csv(chunk: pd.DataFrame, path: Path, header: bool, hyphenated: Iterable[str] = (),
+               layouts: Dict[str, str] | None = None) -> None:
+    """Write one chunk of a stream to a CSV file, starting the file when ``header`` is set.
+
+    Args:
+        chunk: The rows to write.
+        path: Destination CSV file.
+        header: Start a new file with the header line.
+        hyphenated: Columns written as "-" on every row.
+        layouts: Whole-stream datetime layouts from ``LayoutTally``.
+    """
+    hyphenated = [col for col in hyphenated if col in chunk.columns]
+    with open(path, "w" if header else "a", encoding="utf-8", newline="") as f:
+        f.write(format_csv_chunk(chunk, header, hyphenated, layouts))
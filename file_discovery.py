@@ -17,7 +17,7 @@ def discover_files(directory: Path) -> DiscoveredFiles:
     """Scan directory and separate MFC files from datalog files.
 
     Files are classified as MFC if their name (case-insensitive) contains "mfc".
-    Files with extensions .parquet, .csv, or .xlsx are skipped.
+    Files with extensions .parquet, .arrow, .csv, .xlsx, or .json (run reports) are skipped.
     All other files are treated as datalog files.
 
     Args:
@@ -29,7 +29,7 @@ def discover_files(directory: Path) -> DiscoveredFiles:
     if not directory.is_dir():
         raise ValueError(f"Path is not a directory: {directory}")
 
-    skip_extensions = {".parquet", ".csv", ".xlsx"}
+    skip_extensions = {".parquet", ".arrow", ".csv", ".xlsx", ".json"}
     mfc_files: list[Path] = []
     datalog_files: list[Path] = []
 
@@ -0,0 +1,80 @@
+"""Text encoding detection for CSV exports and raw data files.
+
+Excel exports are often cp1252 because of the "°C" headers, while the logger
+writes plain ASCII/UTF-8. Rather than parsing a whole file once per candidate
+encoding, the encoding is picked from the byte order mark or a bounded sample
+from the start of the file (always including the header line), and the file
+is then parsed once. Results are cached per file fingerprint.
+"""
+
+from __future__ import annotations
+
+import codecs
+from pathlib import Path
+from typing import Dict, Tuple
+
+# Tried in this order when the sample does not settle it
+FALLBACK_ENCODINGS: Tuple[str, ...] = ("utf-8", "utf-8-sig", "cp1252", "latin1")
+SAMPLE_BYTES = 1 << 20
+
+_BOMS: Tuple[Tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+_detected: Dict[Tuple[str, int, int], str] = {}
+
+
+def _fingerprint(path: Path) -> Tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+
+def _decodes(sample: bytes, encoding: str) -> bool:
+    """True when ``sample`` decodes cleanly, allowing a character cut off at the end."""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """Pick the encoding of a byte sample from its BOM or its contents."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in ("utf-8", "cp1252"):
+        if _decodes(sample, encoding):
+            return encoding
+    return "latin1"
+
+
+def detect_encoding(path: Path, sample_bytes: int = SAMPLE_BYTES) -> str:
+    """Detect the encoding of a file from a bounded sample, cached per fingerprint.
+
+    Args:
+        path: The file to inspect.
+        sample_bytes: Bytes read from the start of the file; the sample is
+            extended to the end of the header line if that is longer.
+
+    Returns:
+        str: The encoding name to pass to ``open`` or ``pd.read_csv``.
+    """
+    path = Path(path)
+    key = _fingerprint(path)
+    if key not in _detected:
+        with open(path, "rb") as f:
+            sample = f.read(sample_bytes)
+            if b"\n" not in sample:
+                sample += f.readline()
+        _detected[key] = sniff_encoding(sample)
+    return _detected[key]
+
+
+def remember_encoding(path: Path, encoding: str) -> None:
+    """Record the encoding a file actually parsed with, for later reads."""
+    _detected[_fingerprint(Path(path))] = encoding
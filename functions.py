@@ -1,9 +1,26 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+import io
 import json
+import os
+import numpy as np
 import pandas as pd 
-from typing import Dict, List, Iterable, NamedTuple
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Iterable, Iterator, NamedTuple, Tuple
+
+from arrow_reader import READERS, arrow_available, read_arrow_frame
+from compact import placeholder_column
+from csv_writer import HYPHENATED_ATTR, hyphenated_columns
+from file_encoding import detect_encoding
+from merge import SOURCE_ATTR
+from raw_schema import RawSchema, coerce_to_schema, report_mismatches
+from run_report import advance
+from timestamps import parse_timestamps, report_parse
+
+if TYPE_CHECKING:
+    from ingest_cache import IngestCache
 
 
 
@@ -11,6 +28,8 @@ from typing import Dict, List, Iterable, NamedTuple
 PROJECT_DIR = Path(__file__).resolve().parent
 STATE = PROJECT_DIR / "state.json"
 CONSTANT_SENTINELS: tuple[float, ...] = (0.0, 1372.0)
+_ONE_SECOND_NS = 1_000_000_000
+MFC_AGGREGATIONS: tuple[str, ...] = ("mean", "last", "max", "min", "first")
 
 #
 def set_state(datalog_path: Path, mfc_path: Path) -> None:
@@ -62,17 +81,19 @@ def has_state() -> bool:
     return STATE.exists()  
 
 
-def deduplicate_timestamps(data: pd.DataFrame) -> pd.DataFrame:
+def deduplicate_timestamps(data: pd.DataFrame, debug: bool = False) -> pd.DataFrame:
     """Resolve duplicate timestamps by expanding them at 1 Hz.
 
-    The first row in each duplicate block remains unchanged. Later duplicates
-    are redistributed at a 1 Hz cadence, first filling the forward window up to
-    the next unique timestamp and then any available window back toward the
-    previous unique timestamp. When no unique one-second slot remains, the
-    surplus rows are dropped.
+    Each run of identical timestamps is spread over the free one-second slots
+    around it: slots back toward the previous timestamp and forward toward the
+    next unique timestamp are collected, sorted, and handed to the rows of the
+    run in order. When no unique one-second slot remains, the surplus rows are
+    dropped.
 
     Args:
         data (pd.DataFrame): Input data with a datetime column in position 0.
+        debug (bool): Print the backward, forward and assigned slots for each
+            duplicate run.
 
     Returns:
         pd.DataFrame: DataFrame with duplicates adjusted or removed.
@@ -82,102 +103,234 @@ def deduplicate_timestamps(data: pd.DataFrame) -> pd.DataFrame:
     if data.empty:
         return data.copy()
 
-
     df = data.copy()
     timestamp_col = df.columns[0]
+    original_dtype = df[timestamp_col].dtype
 
-    # list to hold indices to drop when no unique slot exists
-    drop_indices: list[int] = []
-    i = 0
-
-    timestamp_pos = df.columns.get_loc(timestamp_col)
-
-    # Iterate through the DataFrame to find and adjust duplicate timestamps
-    while i < len(df):
-        # Locate the run of identical timestamps that starts at position i
-        current_time = df.iat[i, timestamp_pos]
-        run_end = i
-        while (
-            run_end + 1 < len(df)
-            and df.iat[run_end + 1, timestamp_pos] == current_time
-        ):
-            run_end += 1
-
-        run_length = run_end - i + 1
-
-        if run_length > 1:
-            #Identify the neighbouring distinct timestamps to understand our window to work with
-            next_time = (
-                df.iat[run_end + 1, timestamp_pos]
-                if run_end + 1 < len(df)
-                else None
-            )
-            prev_time = (
-                df.iat[i - 1, timestamp_pos]
-                if i - 1 >= 0
-                else None
-            )
+    values = pd.to_datetime(df[timestamp_col]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    new_values, drop_positions = resolve_duplicate_slots(values, debug=debug)
+
+    if not np.array_equal(new_values, values) or len(drop_positions):
+        resolved = pd.Series(new_values.view("datetime64[ns]"), index=df.index)
+        if resolved.dtype != original_dtype:
+            resolved = resolved.astype(original_dtype)
+        df[timestamp_col] = resolved
 
-            duplicates_in_run = run_length
-
-            # Collect forward slots strictly between current_time and next_time
-            forward_slots: list[pd.Timestamp] = []
-            if next_time is not None and pd.notna(next_time):
-                step = 1
-                while True:
-                    candidate = current_time + pd.Timedelta(seconds=step)
-                    if candidate >= next_time:
-                        break
-                    forward_slots.append(candidate)
-                    step += 1
-
-            # Collect backward slots strictly between prev_time and current_time
-            backward_slots: list[pd.Timestamp] = []
-            if prev_time is not None and pd.notna(prev_time):
-                step = 1
-                while True:
-                    candidate = current_time - pd.Timedelta(seconds=step)
-                    if candidate <= prev_time:
-                        break
-                    backward_slots.append(candidate)
-                    step += 1
-            else:
-                # No lower bound: create as many slots as needed, extending backwards
-                for step in range(1, duplicates_in_run):
-                    backward_slots.append(current_time - pd.Timedelta(seconds=step))
-
-            # Build the list of candidate timestamps including the original value
-            candidate_slots = sorted(backward_slots + [current_time] + forward_slots)
-            print(backward_slots)
-            print(current_time)
-            print(forward_slots)
-            print(candidate_slots)
-
-            # Assign candidate slots to rows in order; drop any surplus rows
-            for offset, row_pos in enumerate(range(i, run_end + 1)):
-                if offset < len(candidate_slots):
-                    df.iat[row_pos, timestamp_pos] = candidate_slots[offset]
-                else:
-                    drop_indices.append(row_pos)
-
-        # Move to the next block of timestamps
-        i = run_end + 1
-
-    if drop_indices:
+    if len(drop_positions):
         # Remove rows that could not be uniquely reassigned
-        df.drop(index=df.index[drop_indices], inplace=True)
+        df.drop(index=df.index[drop_positions], inplace=True)
 
     # Final tidy-up to leave the caller with a chronologically ordered frame
-    df.sort_values(by=timestamp_col, inplace=True)
+    df.sort_values(by=timestamp_col, inplace=True, kind="stable")
     df.reset_index(drop=True, inplace=True)
-    if drop_indices:
+    if len(drop_positions):
         print(
             "Dropped {count} rows due to insufficient spacing for duplicates."
-            .format(count=len(drop_indices))
+            .format(count=len(drop_positions))
         )
     return df
 
 
+def resolve_duplicate_slots(values: np.ndarray, debug: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """Work out the 1 Hz slot for every row of every duplicate-timestamp run.
+
+    The runs are located with a ``diff`` over the int64 nanosecond timestamps
+    and the forward and backward slot capacity of every run is computed in
+    bulk. Only runs that directly follow another run are revisited one by one,
+    since their backward window starts at the slot given to the previous run's
+    last row. The first row is treated as having no lower bound.
+
+    Args:
+        values (np.ndarray): int64 nanosecond timestamps, NaT as ``iNaT``.
+        debug (bool): Print the backward, forward and assigned slots for each
+            duplicate run.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The re-assigned timestamps (rows to be
+            dropped keep their original value) and the positions of the rows
+            that could not be given a unique slot.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    new_values = values.copy()
+    if len(values) < 2:
+        return new_values, np.empty(0, dtype=np.intp)
+
+    is_nat = values == np.iinfo(np.int64).min
+
+    # A run boundary sits wherever the value changes; NaT never joins a run
+    same_as_next = (values[1:] == values[:-1]) & ~is_nat[1:] & ~is_nat[:-1]
+    boundaries = np.flatnonzero(~same_as_next) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(values)])) - 1
+    lengths = ends - starts + 1
+
+    is_run = lengths > 1
+    starts, ends, lengths = starts[is_run], ends[is_run], lengths[is_run]
+    if not len(starts):
+        return new_values, np.empty(0, dtype=np.intp)
+
+    current = values[starts]
+
+    # Forward capacity: whole seconds strictly before the next timestamp
+    next_pos = ends + 1
+    has_next = next_pos < len(values)
+    next_pos = np.minimum(next_pos, len(values) - 1)
+    has_next &= ~is_nat[next_pos]
+    forward = _slots_between(current, values[next_pos])
+    forward[~has_next] = 0
+
+    # Backward capacity: whole seconds strictly after the previous timestamp
+    prev_pos = np.maximum(starts - 1, 0)
+    has_prev = starts > 0
+    has_prev &= ~is_nat[prev_pos]
+    backward = _slots_between(values[prev_pos], current)
+    # No lower bound: extend backwards as far as the run needs
+    backward[~has_prev] = lengths[~has_prev] - 1
+
+    # A run directly after another run sees that run's re-assigned last row
+    chained = np.flatnonzero(starts[1:] == ends[:-1] + 1) + 1
+    for run in chained:
+        prior = run - 1
+        prev_value = current[prior]
+        if lengths[prior] <= backward[prior] + 1 + forward[prior]:
+            prev_value += (lengths[prior] - 1 - backward[prior]) * _ONE_SECOND_NS
+        backward[run] = _slots_between(prev_value, current[run])
+
+    capacity = backward + 1 + forward
+
+    # Hand sorted candidate slots to rows in order; drop any surplus rows
+    run_ids = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.arange(len(run_ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(starts, lengths) + offsets
+    keep = offsets < capacity[run_ids]
+
+    new_values[positions[keep]] = (
+        current[run_ids[keep]]
+        + (offsets[keep] - backward[run_ids[keep]]) * _ONE_SECOND_NS
+    )
+
+    if debug:
+        for run in range(len(starts)):
+            _print_run_slots(current[run], backward[run], forward[run])
+
+    return new_values, positions[~keep]
+
+
+def _slots_between(lower, upper):
+    """Count whole one-second steps strictly between ``lower`` and ``upper``.
+
+    Works element-wise on int64 nanosecond arrays as well as on scalars.
+    """
+    gap = np.asarray(upper, dtype=np.int64) - np.asarray(lower, dtype=np.int64)
+    slots = -(-gap // _ONE_SECOND_NS) - 1
+    return np.maximum(slots, 0)
+
+
+def _print_run_slots(current: int, backward: int, forward: int) -> None:
+    """Print the candidate slots of one duplicate run for debugging."""
+    current_time = pd.Timestamp(int(current))
+    second = pd.Timedelta(seconds=1)
+    backward_slots = [current_time - second * step for step in range(1, backward + 1)]
+    forward_slots = [current_time + second * step for step in range(1, forward + 1)]
+    print(backward_slots)
+    print(current_time)
+    print(forward_slots)
+    print(sorted(backward_slots + [current_time] + forward_slots))
+
+
+
+def fill_gap_bins(bins: np.ndarray, max_gap: int | None = 0, previous_bin: int | None = None) -> np.ndarray:
+    """Add the empty seconds of short gaps between sorted, occupied second bins.
+
+    Args:
+        bins: Occupied bins in ascending order.
+        max_gap: Longest run of empty seconds to fill; ``None`` fills every gap.
+        previous_bin: Last bin already emitted before ``bins``, so a gap across
+            the boundary is filled too.
+
+    Returns:
+        The occupied bins plus every second of the gaps that were filled.
+    """
+    if not len(bins):
+        return bins
+    before = bins[0] - 1 if previous_bin is None else previous_bin
+    steps = np.diff(bins, prepend=before)
+    filled = steps - 1 if max_gap is None else np.where(steps - 1 <= max_gap, steps - 1, 0)
+    counts = filled + 1
+    ends = np.cumsum(counts)
+    offsets = np.arange(ends[-1]) - np.repeat(ends - counts, counts)
+    return np.repeat(bins - filled, counts) + offsets
+
+
+def aggregate_seconds(values: pd.DataFrame, seconds: np.ndarray,
+                      aggregation: Dict[str, str] | None = None, max_gap: int | None = 0,
+                      previous_bin: int | None = None) -> tuple[np.ndarray, pd.DataFrame]:
+    """Aggregate value columns per whole second.
+
+    Args:
+        values: Numeric value columns, one row per reading.
+        seconds: Floored epoch second of each row, ascending.
+        aggregation: Aggregation per column, one of ``MFC_AGGREGATIONS``;
+            columns not listed are averaged.
+        max_gap: Longest run of empty seconds to emit as all-NaN rows;
+            ``None`` emits every second.
+        previous_bin: Last bin already emitted, for gaps across chunks.
+
+    Returns:
+        Tuple of the emitted bins and a frame with one row per bin.
+
+    Raises:
+        ValueError: If an aggregation is not one of ``MFC_AGGREGATIONS``.
+    """
+    aggregation = aggregation or {}
+    hows: Dict[str, List[str]] = {}
+    for col in values.columns:
+        how = aggregation.get(col, "mean")
+        if how not in MFC_AGGREGATIONS:
+            raise ValueError(
+                f"Unknown MFC aggregation '{how}' for column '{col}'; "
+                f"use one of {', '.join(MFC_AGGREGATIONS)}."
+            )
+        hows.setdefault(how, []).append(col)
+
+    grouped = values.groupby(seconds)
+    parts = [getattr(grouped[cols], how)() for how, cols in hows.items()]
+    result = pd.concat(parts, axis=1)[list(values.columns)] if parts else pd.DataFrame(index=np.unique(seconds))
+
+    bins = fill_gap_bins(result.index.to_numpy(dtype=np.int64), max_gap, previous_bin)
+    if len(bins) != len(result):
+        result = result.reindex(bins)
+    return bins, result.reset_index(drop=True)
+
+
+def resample_seconds(df: pd.DataFrame, aggregation: Dict[str, str] | None = None,
+                     max_gap: int | None = 0) -> pd.DataFrame:
+    """Resample a frame to one row per second on floored int64 seconds.
+
+    Only seconds with data are emitted, plus the empty seconds of gaps no
+    longer than ``max_gap``; with ``max_gap=None`` every second from the first
+    to the last reading is emitted, like ``resample("1S")``. Non-numeric
+    columns are dropped.
+
+    Args:
+        df: Frame with the timestamp in the first column.
+        aggregation: Aggregation per column (mean, last, max, min or first);
+            columns not listed are averaged.
+        max_gap: Longest run of empty seconds to fill with NaN rows.
+
+    Returns:
+        DataFrame with the second in the first column and one row per bin.
+    """
+    timestamp_col = df.columns[0]
+    stamps = pd.to_datetime(df[timestamp_col])
+    valid = stamps.notna().to_numpy()
+    seconds = stamps[valid].to_numpy(dtype="datetime64[ns]").view(np.int64) // _ONE_SECOND_NS
+    values = df.loc[valid, df.columns[1:]].select_dtypes(include=["number"])
+
+    bins, result = aggregate_seconds(values.reset_index(drop=True), seconds, aggregation, max_gap)
+    result.insert(0, timestamp_col, pd.to_datetime(bins * _ONE_SECOND_NS))
+    return result
+
 
 def build_output_headers(base_headers: List[str], additions: Dict[str, str]) -> List[str]:
     ordered = base_headers.copy()
@@ -191,53 +344,366 @@ def build_output_headers(base_headers: List[str], additions: Dict[str, str]) ->
     return ordered
 
 
-def exclude_columns(df: pd.DataFrame, excluded_columns: List[str]) -> pd.DataFrame:
-    """Replace all data in specified columns with hyphens.
-    
+def read_typed_file(path: Path, usecols: List[int], names: List[str], schema: RawSchema) -> pd.DataFrame:
+    """Read the selected columns of one raw file with the dtypes of ``schema``.
+
+    A file with values that do not fit the schema is read again as text and
+    its numeric columns converted one by one; the values that do not fit are
+    left blank and reported.
+    """
+    options = dict(sep="\t", usecols=usecols, header=None, names=names, low_memory=False,
+                   encoding=detect_encoding(path), **schema.read_options())
+    try:
+        return pd.read_csv(path, dtype=schema.read_dtypes(usecols, names), **options)
+    except ValueError:
+        pass
+    numeric = schema.numeric(usecols, names)
+    df, mismatches = coerce_to_schema(pd.read_csv(path, dtype=str, **options), numeric, schema.decimal)
+    report_mismatches(path.name, numeric, mismatches)
+    return df
+
+
+def read_raw_file(
+    path: Path,
+    usecols: List[int],
+    names: List[str],
+    timestamp_col: str | None = None,
+    timestamp_format: str | None = None,
+    reader: str = "pandas",
+    schema: RawSchema | None = None,
+) -> pd.DataFrame:
+    """Read the selected columns of one tab-separated raw data file.
+
     Args:
-        df: The DataFrame to process.
-        excluded_columns: List of column names to replace with hyphens.
-    
+        path: The raw datalog or MFC file to read.
+        usecols: Column indices to extract, in ascending order.
+        names: Headers for the extracted columns, in the same order as usecols.
+        timestamp_col: Column to parse as datetimes while reading.
+        timestamp_format: Explicit format for ``timestamp_col``; values it does
+            not match are parsed by day-first inference and reported.
+        reader: ``"pandas"`` for the pandas C parser, or ``"arrow"`` for the
+            multi-threaded ``pyarrow.csv`` parser. A file Arrow cannot parse,
+            such as one with a short last line, is read with pandas.
+        schema: Dtypes and NA conventions to read with instead of inferring
+            each column's type.
+
     Returns:
-        DataFrame with excluded columns filled with hyphens.
+        DataFrame holding the selected columns under the given names.
     """
-    result = df.copy()
-    
-    for col in excluded_columns:
-        if col in result.columns:
-            result[col] = "-"
-    
-    return result
+    df = None
+    if reader == "arrow":
+        options = {}
+        if schema is not None:
+            options = dict(column_types=schema.arrow_types(usecols, names),
+                           null_values=schema.na_values, decimal=schema.decimal)
+        df = read_arrow_frame(path, usecols, names, [timestamp_col] if timestamp_col is not None else [],
+                              **options)
+    if df is None and schema is not None:
+        df = read_typed_file(path, usecols, names, schema)
+    if df is None:
+        df = pd.read_csv(
+            path,
+            sep="\t",
+            usecols=usecols,
+            parse_dates=True,
+            low_memory=False,
+            header=None,
+            names=names,
+            encoding=detect_encoding(path),
+        )
+    if timestamp_col is not None and timestamp_format is not None:
+        df[timestamp_col], mismatched, coerced = parse_timestamps(df[timestamp_col], timestamp_format)
+        report_parse(path.name, timestamp_format, mismatched, coerced)
+    return df
 
 
-def replace_constant_numeric_columns(df: pd.DataFrame, values: Iterable[float] = CONSTANT_SENTINELS) -> pd.DataFrame:
-    """Replace numeric columns that are entirely one of the sentinel values with hyphens."""
+class _ByteRange(io.RawIOBase):
+    """Read-only view of the bytes from ``start`` to ``end`` of an open binary file."""
+
+    def __init__(self, f: BinaryIO, start: int, end: int) -> None:
+        f.seek(start)
+        self._f = f
+        self._left = end - start
+
+    def readable(self) -> bool:
+        return True
 
-    result = df.copy()
-    numeric_columns = result.select_dtypes(include=["number"]).columns
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._left)
+        if size <= 0:
+            return 0
+        data = self._f.read(size)
+        buffer[:len(data)] = data
+        self._left -= len(data)
+        return len(data)
 
-    for col in numeric_columns:
-        series = result[col]
-        non_na = series.dropna()
-        if non_na.empty:
+
+def iter_raw_file(path: Path, usecols: List[int], names: List[str], chunk_rows: int,
+                  byte_range: Tuple[int, int] | None = None,
+                  schema: RawSchema | None = None) -> Iterator[pd.DataFrame]:
+    """Read the selected columns of one raw data file in chunks of rows.
+
+    With a schema, a chunk with values that do not fit it makes the rest of
+    the file be read as text and converted, as ``read_typed_file`` does.
+
+    Args:
+        path: The raw datalog or MFC file to read.
+        usecols: Column indices to extract, in ascending order.
+        names: Headers for the extracted columns, in the same order as usecols.
+        chunk_rows: Maximum number of rows per chunk.
+        byte_range: Only read the lines between these byte offsets; the range
+            must start at the beginning of a line and be non-empty.
+        schema: Dtypes and NA conventions to read with.
+
+    Yields:
+        DataFrames of at most ``chunk_rows`` rows, in file order.
+    """
+    def chunks(**options) -> Iterator[pd.DataFrame]:
+        with ExitStack() as stack:
+            source = path
+            if byte_range is not None:
+                f = stack.enter_context(open(path, "rb"))
+                source = io.BufferedReader(_ByteRange(f, *byte_range))
+            with pd.read_csv(
+                source,
+                sep="\t",
+                usecols=usecols,
+                header=None,
+                names=names,
+                chunksize=chunk_rows,
+                encoding=detect_encoding(path),
+                **options,
+            ) as reader:
+                yield from reader
+
+    if schema is None:
+        yield from chunks()
+        return
+
+    rows = 0
+    try:
+        for chunk in chunks(dtype=schema.read_dtypes(usecols, names), **schema.read_options()):
+            rows += len(chunk)
+            yield chunk
+        return
+    except ValueError:
+        pass
+
+    # Read the rest of the file as text, skipping the rows already yielded
+    numeric = schema.numeric(usecols, names)
+    mismatches: Dict[str, List[int]] = {}
+    skip = rows
+    for chunk in chunks(dtype=str, **schema.read_options()):
+        if skip >= len(chunk):
+            skip -= len(chunk)
             continue
+        chunk = chunk.iloc[skip:]
+        skip = 0
+        chunk, found = coerce_to_schema(chunk, numeric, schema.decimal, first_row=rows)
+        for column, bad in found.items():
+            mismatches.setdefault(column, []).extend(bad)
+        rows += len(chunk)
+        yield chunk
+    report_mismatches(path.name, numeric, mismatches)
+
+
+def read_raw_files(
+    paths: Iterable[Path],
+    usecols: List[int],
+    names: List[str],
+    workers: int | None = 1,
+    cache: "IngestCache | None" = None,
+    timestamp_col: str | None = None,
+    timestamp_format: str | None = None,
+    reader: str = "pandas",
+    schema: RawSchema | None = None,
+) -> List[pd.DataFrame]:
+    """Read several raw data files, optionally in parallel and through a cache.
+
+    Missing files are reported and skipped. With more than one worker the files
+    are parsed in a process pool, but the frames are always returned in the
+    order of ``paths`` so the concatenated result matches a serial read. With a
+    cache, only files that are new or changed since they were cached are parsed.
+
+    Args:
+        paths: The raw files to read, in the order they should be combined.
+        usecols: Column indices to extract, in ascending order.
+        names: Headers for the extracted columns, in the same order as usecols.
+        workers: Number of worker processes. ``None`` uses one per CPU core and
+            ``1`` reads serially in this process.
+        cache: Per-file ingest cache to load from and store to.
+        timestamp_col: Column to parse as datetimes while reading.
+        timestamp_format: Explicit format for ``timestamp_col``.
+        reader: Parser backend, one of ``READERS``. ``"arrow"`` falls back to
+            pandas when pyarrow is not installed.
+        schema: Dtypes and NA conventions to read with instead of inferring
+            each column's type.
 
-        hyphenate = False
+    Returns:
+        List of DataFrames, one per file that was read, each naming its file
+        in ``attrs["source_file"]``.
+
+    Raises:
+        ValueError: If ``reader`` is not one of ``READERS``.
+    """
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader '{reader}'; use one of {', '.join(READERS)}.")
+    if reader == "arrow" and not arrow_available():
+        print("  pyarrow is not installed; reading with pandas.")
+        reader = "pandas"
+
+    existing: list[Path] = []
+    for path in paths:
+        if not path.exists():
+            print(f"  Warning: {path.name} not found, skipping.")
+            continue
+        existing.append(path)
+
+    frames: dict[Path, pd.DataFrame] = {}
+    if cache is not None:
+        for path in existing:
+            cached = cache.get(path, usecols, names, timestamp_format, schema)
+            if cached is not None:
+                print(f"  Loaded {path.name} from cache.")
+                frames[path] = cached
+                advance(rows=len(cached), bytes_done=path.stat().st_size)
+    to_parse = [path for path in existing if path not in frames]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(to_parse))
+
+    if workers <= 1:
+        for path in to_parse:
+            print(f"  Reading {path.name}...")
+            frames[path] = read_raw_file(path, usecols, names, timestamp_col, timestamp_format, reader, schema)
+            advance(rows=len(frames[path]), bytes_done=path.stat().st_size)
+    else:
+        print(f"  Reading {len(to_parse)} file(s) with {workers} workers...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = pool.map(
+                read_raw_file,
+                to_parse,
+                [usecols] * len(to_parse),
+                [names] * len(to_parse),
+                [timestamp_col] * len(to_parse),
+                [timestamp_format] * len(to_parse),
+                [reader] * len(to_parse),
+                [schema] * len(to_parse),
+            )
+            for path, frame in zip(to_parse, parsed):
+                frames[path] = frame
+                advance(rows=len(frame), bytes_done=path.stat().st_size)
 
-        for sentinel in values:
-            if non_na.eq(sentinel).all():
-                hyphenate = True
-                break
+    if cache is not None:
+        for path in to_parse:
+            cache.put(path, usecols, names, frames[path], timestamp_format, schema)
 
-        if not hyphenate and non_na.lt(0).all():
-            hyphenate = True
+    for path in existing:
+        frames[path].attrs[SOURCE_ATTR] = path.name
+    return [frames[path] for path in existing]
 
-        if hyphenate:
-            result[col] = "-"
 
+def mark_hyphenated(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """Return a shallow copy of ``df`` with ``columns`` added to its hyphenated columns."""
+    marked = list(df.attrs.get(HYPHENATED_ATTR, []))
+    marked += [col for col in columns if col in df.columns and col not in marked]
+    result = df.copy(deep=False)
+    result.attrs = {**df.attrs, HYPHENATED_ATTR: marked}
     return result
 
 
+def apply_hyphenation(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with its hyphenated columns replaced by "-" placeholders.
+
+    The columns stay marked, so ``csv_writer.write_csv`` still writes them as
+    hyphens. Use it on frames that leave the pipeline other than through
+    ``write_csv``, such as the ones ``pipeline.build_data_pack`` returns.
+    """
+    columns = hyphenated_columns(df)
+    if not columns:
+        return df
+    return df.assign(**{col: placeholder_column(len(df)) for col in columns})
+
+
+def exclude_columns(df: pd.DataFrame, excluded_columns: List[str]) -> pd.DataFrame:
+    """Mark the specified columns to be written as hyphens.
+
+    The data is left in place; the columns are listed in
+    ``df.attrs["hyphenated_columns"]``, which ``csv_writer.write_csv`` honours.
+    ``apply_hyphenation`` replaces them with "-" in the frame itself.
+
+    Args:
+        df: The DataFrame to process.
+        excluded_columns: List of column names to write as hyphens.
+
+    Returns:
+        Shallow copy of the DataFrame with the excluded columns marked.
+    """
+    return mark_hyphenated(df, excluded_columns)
+
+
+def invalid_column_masks(block: np.ndarray, values: Iterable[float] = CONSTANT_SENTINELS
+                         ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Test every column of a 2D numeric block against the invalid-data rules.
+
+    Args:
+        block: Float array of shape (rows, columns), NaN for missing values.
+        values: Sentinel values that mark a column as invalid.
+
+    Returns:
+        Tuple of per-column masks: has any non-NaN value, non-NaN values are
+        all one sentinel (shape (len(values), columns)), and non-NaN values
+        are all negative.
+    """
+    missing = np.isnan(block)
+    has_data = ~missing.all(axis=0)
+    all_negative = ((block < 0) | missing).all(axis=0)
+    all_sentinel = np.array(
+        [((block == sentinel) | missing).all(axis=0) for sentinel in values],
+        dtype=bool,
+    ).reshape(-1, block.shape[1])
+    return has_data, all_sentinel, all_negative
+
+
+def invalid_numeric_columns(df: pd.DataFrame, values: Iterable[float] = CONSTANT_SENTINELS) -> List[str]:
+    """Find the numeric columns whose data is entirely one sentinel value or all negative.
+
+    All numeric columns are tested at once on a single 2D array.
+
+    Args:
+        df: The DataFrame to inspect.
+        values: Sentinel values that mark a column as invalid.
+
+    Returns:
+        Names of the invalid columns, in frame order.
+    """
+    numeric_columns = df.select_dtypes(include=["number"]).columns
+    if not len(numeric_columns):
+        return []
+    block = df[numeric_columns].to_numpy(dtype=float, na_value=np.nan)
+    has_data, all_sentinel, all_negative = invalid_column_masks(block, values)
+    invalid = has_data & (all_sentinel.any(axis=0) | all_negative)
+    return list(numeric_columns[invalid])
+
+
+def replace_constant_numeric_columns(df: pd.DataFrame, values: Iterable[float] = CONSTANT_SENTINELS) -> pd.DataFrame:
+    """Mark numeric columns that are entirely one of the sentinel values (or all negative) as hyphens.
+
+    The columns keep their numbers in memory and are listed in
+    ``df.attrs["hyphenated_columns"]``; ``csv_writer.write_csv`` writes them
+    as "-", and ``apply_hyphenation`` replaces them in the frame itself.
+
+    Args:
+        df: The DataFrame to process.
+        values: Sentinel values that mark a column as invalid.
+
+    Returns:
+        Shallow copy of the DataFrame with the invalid columns marked.
+    """
+    return mark_hyphenated(df, invalid_numeric_columns(df, values))
+
+
 class DiscoveredFiles(NamedTuple):
     """Container for categorized file paths from a raw data directory."""
 
@@ -249,7 +715,7 @@ def discover_files(directory: Path) -> DiscoveredFiles:
     """Scan directory and separate MFC files from datalog files.
 
     Files are classified as MFC if their name (case-insensitive) contains "mfc".
-    Files with extensions .parquet, .csv, or .xlsx are skipped.
+    Files with extensions .parquet, .arrow, .csv, .xlsx, or .json (run reports) are skipped.
     All other files are treated as datalog files.
 
     Args:
@@ -261,7 +727,7 @@ def discover_files(directory: Path) -> DiscoveredFiles:
     if not directory.is_dir():
         raise ValueError(f"Path is not a directory: {directory}")
 
-    skip_extensions = {".parquet", ".csv", ".xlsx"}
+    skip_extensions = {".parquet", ".arrow", ".csv", ".xlsx", ".json"}
     mfc_files: list[Path] = []
     datalog_files: list[Path] = []
 
@@ -1,13 +1,33 @@
-"""Standalone Tkinter GUI for configuring data pack processing."""
+"""Standalone Tkinter GUI for configuring data pack processing.
+
+Runs build the data pack on a worker thread so the window stays responsive.
+The thread hands stage and progress events to the Tk main thread through a
+queue that is polled with ``root.after``; Cancel asks the pipeline to stop at
+its next chunk boundary.
+
+Browsing to a raw file previews a bounded head sample of it, read in the
+background and cached per file, with sample values for every column index;
+selected columns can be added to the datalog or MFC columns of the preset.
+"""
 
 from __future__ import annotations
 
+import queue
+import threading
 import tkinter as tk
+from pathlib import Path
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
+import run_report
+from pipeline import INPUTS, build_data_pack, load_config, new_run_report, stream_data_packs, write_run_report
 from presets import DEFAULT_PRESETS, DEFAULT_PRESET_NAME
+from raw_preview import RawSample, SampleCache
+from run_report import RunCancelled, StageProgress, StageRecord
+
+POLL_MS = 100
+PREVIEW_VALUES = 5
 
 
 class DataPackGUI:
@@ -31,16 +51,35 @@ class DataPackGUI:
 
         self.datalog_path_var = tk.StringVar()
         self.mfc_path_var = tk.StringVar()
+        # Blank means the name of the raw-file folder
+        self.pack_name_var = tk.StringVar()
         self.preset_var = tk.StringVar(value=DEFAULT_PRESET_NAME)
         self.new_preset_name_var = tk.StringVar()
         self.status_var = tk.StringVar(value="Ready.")
+        self.progress_var = tk.StringVar(value="")
+
+        # Events from the worker thread, drained on the Tk thread
+        self.events: queue.Queue = queue.Queue()
+        self.worker: threading.Thread | None = None
+        # Set when the window was closed during a run; it closes once the run stops
+        self.closing = False
+
+        # Raw file previews, read on background threads
+        self.samples = SampleCache()
+        self.previews: queue.Queue = queue.Queue()
+        self.preview_kind = "datalog"
+        self.preview_request = 0
+        self.preview_sample: RawSample | None = None
+        self.preview_var = tk.StringVar(value="Browse to a raw file to preview its columns.")
 
         self._build_layout()
         self._populate_from_preset(DEFAULT_PRESET_NAME)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build_layout(self) -> None:
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(1, weight=1)
+        self.root.rowconfigure(2, weight=1)
 
         paths_frame = ttk.LabelFrame(self.root, text="Source Locations")
         paths_frame.grid(column=0, row=0, padx=16, pady=(16, 8), sticky="nsew")
@@ -56,6 +95,14 @@ class DataPackGUI:
         mfc_entry.grid(column=1, row=1, padx=8, pady=6, sticky="ew")
         ttk.Button(paths_frame, text="Browse", command=self._browse_mfc).grid(column=2, row=1, padx=8, pady=6)
 
+        ttk.Label(paths_frame, text="Data pack name").grid(column=0, row=2, padx=8, pady=6, sticky="w")
+        ttk.Entry(paths_frame, textvariable=self.pack_name_var, width=40).grid(
+            column=1, row=2, padx=8, pady=6, sticky="w"
+        )
+        ttk.Label(paths_frame, text="Leave blank to use the folder name").grid(
+            column=2, row=2, padx=8, pady=6, sticky="w"
+        )
+
         preset_frame = ttk.LabelFrame(self.root, text="Preset Configuration")
         preset_frame.grid(column=0, row=1, padx=16, pady=8, sticky="nsew")
         preset_frame.columnconfigure(1, weight=1)
@@ -104,10 +151,52 @@ class DataPackGUI:
 
         ttk.Button(button_bar, text="Save Preset", command=self._save_preset).grid(column=0, row=0, padx=6, pady=4)
         ttk.Button(button_bar, text="Reset", command=self._reset_fields).grid(column=1, row=0, padx=6, pady=4)
-        ttk.Button(button_bar, text="Run", command=self._run_placeholder).grid(column=2, row=0, padx=6, pady=4)
+        self.run_button = ttk.Button(button_bar, text="Run", command=self._run)
+        self.run_button.grid(column=2, row=0, padx=6, pady=4)
+        self.cancel_button = ttk.Button(button_bar, text="Cancel", command=self._cancel, state="disabled")
+        self.cancel_button.grid(column=3, row=0, padx=6, pady=4)
+
+        preview_frame = ttk.LabelFrame(self.root, text="Raw File Preview")
+        preview_frame.grid(column=0, row=2, padx=16, pady=8, sticky="nsew")
+        preview_frame.columnconfigure(0, weight=1)
+        preview_frame.rowconfigure(1, weight=1)
+
+        ttk.Label(preview_frame, textvariable=self.preview_var, anchor="w").grid(
+            column=0, row=0, columnspan=2, padx=8, pady=(6, 2), sticky="ew"
+        )
+        self.preview_tree = ttk.Treeview(
+            preview_frame, columns=("index", "header", "samples"), show="headings", height=8, selectmode="extended"
+        )
+        self.preview_tree.heading("index", text="Column")
+        self.preview_tree.heading("header", text="Header in preset")
+        self.preview_tree.heading("samples", text="Sample values")
+        self.preview_tree.column("index", width=70, stretch=False, anchor="e")
+        self.preview_tree.column("header", width=260, stretch=False)
+        self.preview_tree.column("samples", width=500)
+        self.preview_tree.grid(column=0, row=1, padx=(8, 0), pady=4, sticky="nsew")
+        self.preview_tree.bind("<Double-1>", lambda _event: self._add_selected_columns(self.preview_kind))
+        scrollbar = ttk.Scrollbar(preview_frame, orient="vertical", command=self.preview_tree.yview)
+        scrollbar.grid(column=1, row=1, padx=(0, 8), pady=4, sticky="ns")
+        self.preview_tree.configure(yscrollcommand=scrollbar.set)
+
+        preview_buttons = ttk.Frame(preview_frame)
+        preview_buttons.grid(column=0, row=2, columnspan=2, padx=8, pady=(2, 6), sticky="e")
+        ttk.Button(preview_buttons, text="Add to Datalog Columns",
+                   command=lambda: self._add_selected_columns("datalog")).grid(column=0, row=0, padx=6)
+        ttk.Button(preview_buttons, text="Add to MFC Columns",
+                   command=lambda: self._add_selected_columns("mfc")).grid(column=1, row=0, padx=6)
+
+        progress_frame = ttk.LabelFrame(self.root, text="Progress")
+        progress_frame.grid(column=0, row=3, padx=16, pady=8, sticky="ew")
+        progress_frame.columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=100)
+        self.progress_bar.grid(column=0, row=0, padx=8, pady=(8, 4), sticky="ew")
+        ttk.Label(progress_frame, textvariable=self.progress_var, anchor="w").grid(
+            column=0, row=1, padx=8, pady=(0, 8), sticky="ew"
+        )
 
         status_bar = ttk.Label(self.root, textvariable=self.status_var, anchor="w")
-        status_bar.grid(column=0, row=2, padx=16, pady=(4, 16), sticky="ew")
+        status_bar.grid(column=0, row=4, padx=16, pady=(4, 16), sticky="ew")
 
     def _populate_from_preset(self, preset_name: str) -> None:
         preset = self.presets.get(preset_name)
@@ -118,6 +207,7 @@ class DataPackGUI:
         self._set_text_widget(self.datalog_headers_text, "\n".join(preset["datalog_headers"]))
         self._set_text_widget(self.mfc_columns_text, self._format_columns(preset["mfc_columns"]))
         self._set_text_widget(self.mfc_headers_text, "\n".join(preset["mfc_headers"]))
+        self._refresh_preview_headers()
         self.status_var.set(f"Loaded preset '{preset_name}'.")
 
     def _format_columns(self, columns: List[int | str]) -> str:
@@ -138,12 +228,97 @@ class DataPackGUI:
         if path:
             self.datalog_path_var.set(path)
             self.status_var.set("Datalog path selected.")
+            self._load_preview(Path(path), "datalog")
 
     def _browse_mfc(self) -> None:
         path = filedialog.askopenfilename(title="Select MFC file", filetypes=[("Data files", "*.tsv *.csv *.txt"), ("All files", "*.*")])
         if path:
             self.mfc_path_var.set(path)
             self.status_var.set("MFC path selected.")
+            self._load_preview(Path(path), "mfc")
+
+    def _column_widgets(self, kind: str) -> Tuple[tk.Text, tk.Text]:
+        if kind == "mfc":
+            return self.mfc_columns_text, self.mfc_headers_text
+        return self.datalog_columns_text, self.datalog_headers_text
+
+    def _load_preview(self, path: Path, kind: str) -> None:
+        """Show the column preview of a raw file, reading its sample in the background."""
+        self.preview_kind = kind
+        self.preview_request += 1
+        sample = self.samples.cached(path)
+        if sample is not None:
+            self._show_preview(sample)
+            return
+
+        request = self.preview_request
+        self.preview_var.set(f"Reading the start of {path.name}...")
+
+        def read() -> None:
+            try:
+                self.previews.put((request, self.samples.get(path)))
+            except OSError as exc:
+                self.previews.put((request, exc))
+
+        threading.Thread(target=read, name="raw preview", daemon=True).start()
+        self.root.after(POLL_MS, self._poll_preview, request)
+
+    def _poll_preview(self, request: int) -> None:
+        # A newer browse supersedes this one and polls for itself
+        if request != self.preview_request:
+            return
+        try:
+            done, result = self.previews.get_nowait()
+        except queue.Empty:
+            done = None
+        if done != request:
+            self.root.after(POLL_MS, self._poll_preview, request)
+            return
+        if isinstance(result, OSError):
+            self.preview_var.set(f"Could not read the file: {result}")
+        else:
+            self._show_preview(result)
+
+    def _show_preview(self, sample: RawSample) -> None:
+        self.preview_sample = sample
+        more = "+" if sample.truncated else ""
+        self.preview_var.set(
+            f"{sample.path.name} ({'MFC' if self.preview_kind == 'mfc' else 'datalog'}): {sample.columns} columns, "
+            f"first {len(sample.rows)}{more} rows. Select columns and add them, or double-click one."
+        )
+        self._refresh_preview_headers()
+
+    def _refresh_preview_headers(self) -> None:
+        """List every column of the previewed file with its preset header, if any."""
+        sample = self.preview_sample
+        if sample is None:
+            return
+        columns_text, headers_text = self._column_widgets(self.preview_kind)
+        headers = dict(zip(self._parse_columns(columns_text.get("1.0", tk.END)),
+                           self._parse_headers(headers_text.get("1.0", tk.END))))
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        for index in range(sample.columns):
+            values = [value for value in sample.column_values(index) if value.strip()][:PREVIEW_VALUES]
+            self.preview_tree.insert("", tk.END, iid=str(index),
+                                     values=(index, headers.get(index, ""), ", ".join(values)))
+
+    def _add_selected_columns(self, kind: str) -> None:
+        """Append the selected preview columns to a column list, with editable placeholder headers."""
+        selected = sorted(int(iid) for iid in self.preview_tree.selection())
+        if not selected:
+            self.status_var.set("Select one or more columns in the preview first.")
+            return
+        columns_text, headers_text = self._column_widgets(kind)
+        columns = self._parse_columns(columns_text.get("1.0", tk.END))
+        headers = self._parse_headers(headers_text.get("1.0", tk.END))
+        added = [index for index in selected if index not in columns]
+        columns += added
+        headers += [f"Column {index}" for index in added]
+        self._set_text_widget(columns_text, self._format_columns(columns))
+        self._set_text_widget(headers_text, "\n".join(headers))
+        self._refresh_preview_headers()
+        label = "MFC" if kind == "mfc" else "datalog"
+        self.status_var.set(f"Added {len(added)} column(s) to the {label} columns; rename their headers as needed.")
 
     def _save_preset(self) -> None:
         preset_name = self.new_preset_name_var.get().strip() or self.preset_var.get()
@@ -183,29 +358,174 @@ class DataPackGUI:
         self.new_preset_name_var.set("")
         self.status_var.set(f"Preset '{preset_name}' stored for this session.")
 
-    def _run_placeholder(self) -> None:
-        payload = {
-            "datalog_path": self.datalog_path_var.get(),
-            "mfc_path": self.mfc_path_var.get(),
-            "preset": self.preset_var.get(),
-            "datalog_columns": self._parse_columns(self.datalog_columns_text.get("1.0", tk.END)),
-            "datalog_headers": self._parse_headers(self.datalog_headers_text.get("1.0", tk.END)),
-            "mfc_columns": self._parse_columns(self.mfc_columns_text.get("1.0", tk.END)),
-            "mfc_headers": self._parse_headers(self.mfc_headers_text.get("1.0", tk.END)),
-        }
+    def _build_config(self) -> Dict[str, Any] | None:
+        """Overlay the paths, pack name and preset fields on ``inputs.json``; None if they are incomplete."""
+        config = load_config() if INPUTS.exists() else {}
+        datalog_path = self.datalog_path_var.get().strip()
+        mfc_path = self.mfc_path_var.get().strip()
+
+        # The pipeline reads every raw file in one folder
+        folders = {Path(path).parent for path in (datalog_path, mfc_path) if path}
+        if len(folders) > 1:
+            messagebox.showerror("Different Folders", "The datalog and MFC files must be in the same folder.")
+            return None
+        if folders:
+            config["Folder Path"] = str(folders.pop())
+        if not config.get("Folder Path"):
+            messagebox.showerror("Missing Data", "Please select a datalog or MFC file.")
+            return None
 
-        summary = (
-            "Inputs collected:\n"
-            f"- Datalog: {payload['datalog_path'] or 'not set'}\n"
-            f"- MFC: {payload['mfc_path'] or 'not set'}\n"
-            f"- Preset: {payload['preset']}\n"
-            f"- Datalog columns: {len(payload['datalog_columns'])}\n"
-            f"- Datalog headers: {len(payload['datalog_headers'])}\n"
-            f"- MFC columns: {len(payload['mfc_columns'])}\n"
-            f"- MFC headers: {len(payload['mfc_headers'])}"
-        )
-        messagebox.showinfo("Preview", summary)
-        self.status_var.set("Configuration captured. Backend integration pending.")
+        datalog_columns = self._parse_columns(self.datalog_columns_text.get("1.0", tk.END))
+        datalog_headers = self._parse_headers(self.datalog_headers_text.get("1.0", tk.END))
+        mfc_columns = self._parse_columns(self.mfc_columns_text.get("1.0", tk.END))
+        mfc_headers = self._parse_headers(self.mfc_headers_text.get("1.0", tk.END))
+        if not datalog_columns or len(datalog_columns) != len(datalog_headers):
+            messagebox.showerror("Mismatch", "Datalog columns and headers are required and must have the same length.")
+            return None
+        if not mfc_columns or len(mfc_columns) != len(mfc_headers):
+            messagebox.showerror("Mismatch", "MFC columns and headers are required and must have the same length.")
+            return None
+
+        config.update({
+            "Preset": self.preset_var.get(),
+            "Datalog columns": datalog_columns,
+            "Datalog names": datalog_headers,
+            "MFC columns": mfc_columns,
+            "MFC names": mfc_headers,
+        })
+        # The name in inputs.json belongs to whatever folder it was written for
+        config["Data Pack Name"] = self.pack_name_var.get().strip() or Path(config["Folder Path"]).name
+        config.setdefault("Additional columns", {})
+        return config
+
+    def _run(self) -> None:
+        if self.worker is not None and self.worker.is_alive():
+            return
+        config = self._build_config()
+        if config is None:
+            return
+
+        run_report.clear_cancel()
+        run_report.subscribe(self._on_stage)
+        run_report.subscribe_progress(self._on_progress)
+        self.worker = threading.Thread(target=self._run_pipeline, args=(config,), name="data pack run", daemon=True)
+        self.run_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar.configure(mode="determinate", value=0)
+        self.progress_var.set("")
+        self.status_var.set(f"Building {config['Data Pack Name']}...")
+        self.worker.start()
+        self.root.after(POLL_MS, self._poll_events)
+
+    def _run_pipeline(self, config: Dict[str, Any]) -> None:
+        """Worker thread: build the data pack and post how it ended."""
+        try:
+            if config.get("Streaming", False):
+                report = new_run_report(config, "streaming")
+                stream_data_packs(config, report=report)
+                write_run_report(report, config)
+            else:
+                build_data_pack(config)
+        except RunCancelled:
+            self.events.put(("cancelled", None))
+        except Exception as exc:
+            self.events.put(("error", f"{type(exc).__name__}: {exc}"))
+        else:
+            self.events.put(("done", config["Folder Path"]))
+
+    def _on_stage(self, stage: str, record: StageRecord | None) -> None:
+        self.events.put(("stage", (stage, record)))
+
+    def _on_progress(self, progress: StageProgress) -> None:
+        self.events.put(("progress", progress))
+
+    def _cancel(self) -> None:
+        run_report.request_cancel()
+        self.cancel_button.configure(state="disabled")
+        self.status_var.set("Cancelling after the current chunk...")
+
+    def _poll_events(self) -> None:
+        """Show the worker's events on the Tk thread, until the run ends."""
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "stage":
+                self._show_stage(*payload)
+            elif kind == "progress":
+                self._show_progress(payload)
+            else:
+                self._finish_run(kind, payload)
+                return
+        self.root.after(POLL_MS, self._poll_events)
+
+    def _show_stage(self, stage: str, record: StageRecord | None) -> None:
+        if record is None:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="indeterminate", value=0)
+            self.progress_bar.start()
+            self.progress_var.set(f"{stage}...")
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate", value=100)
+            self.progress_var.set(f"{stage}: done in {record.seconds:.1f} s")
+
+    def _show_progress(self, progress: StageProgress) -> None:
+        text = f"{progress.stage}: {progress.rows:,} rows"
+        if progress.rows_per_second is not None:
+            text += f", {progress.rows_per_second:,.0f} rows/s"
+        if progress.fraction is not None:
+            self.progress_bar.stop()
+            self.progress_bar.configure(mode="determinate", value=100 * progress.fraction)
+            text += f", {progress.fraction:.0%}"
+        if progress.eta_seconds is not None:
+            text += f", about {progress.eta_seconds:.0f} s left"
+        self.progress_var.set(text)
+
+    def _finish_run(self, outcome: str, detail: str | None) -> None:
+        run_report.unsubscribe(self._on_stage)
+        run_report.unsubscribe_progress(self._on_progress)
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode="determinate", value=100 if outcome == "done" else 0)
+        self.run_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        if self.closing:
+            return
+        if outcome == "done":
+            self.status_var.set(f"Data pack written to {detail}.")
+            messagebox.showinfo("Finished", f"The data pack was written to {detail}.")
+        elif outcome == "cancelled":
+            self.status_var.set("Cancelled; the files being written when the run stopped are incomplete.")
+        else:
+            self.status_var.set("The run failed.")
+            messagebox.showerror("Run Failed", detail)
+
+    def _on_close(self) -> None:
+        """Close the window, first letting a running build stop after its current chunk.
+
+        Closing straight away would end the process in the middle of a write
+        and leave a truncated output file.
+        """
+        if self.worker is None or not self.worker.is_alive():
+            self.root.destroy()
+            return
+        if self.closing:
+            return
+        self.closing = True
+        run_report.request_cancel()
+        self.run_button.configure(state="disabled")
+        self.cancel_button.configure(state="disabled")
+        self.status_var.set("Closing after the current chunk...")
+        self._close_when_stopped()
+
+    def _close_when_stopped(self) -> None:
+        if self.worker is not None and self.worker.is_alive():
+            self.root.after(POLL_MS, self._close_when_stopped)
+            return
+        run_report.unsubscribe(self._on_stage)
+        run_report.unsubscribe_progress(self._on_progress)
+        self.root.destroy()
 
     def _reset_fields(self) -> None:
         self.datalog_path_var.set("")
@@ -0,0 +1,141 @@
+"""Per-file cache of parsed raw data files.
+
+During a campaign the tool is rerun on a folder that only gains a file or two,
+so every raw file that has already been parsed is kept as a parquet extract.
+An extract is keyed on the file's path, size and modification time plus the
+column plan (indices, headers, timestamp format and raw schema) it was read with; a rerun parses only new or
+changed files and loads the rest from the cache.
+
+Run ``python ingest_cache.py --clear`` to empty the cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+from raw_schema import RawSchema
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = PROJECT_DIR / "ingest_cache"
+DEFAULT_CACHE_MB = 2048
+
+
+class IngestCache:
+    """A size-bounded directory of parquet extracts of raw data files."""
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_mb: float = DEFAULT_CACHE_MB) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def key(self, path: Path, usecols: List[int], names: List[str],
+            timestamp_format: str | None = None, schema: RawSchema | None = None) -> str:
+        """Fingerprint a raw file together with the column plan used to read it."""
+        stat = path.stat()
+        plan = [list(usecols), list(names), timestamp_format]
+        if schema is not None:
+            plan.append(schema.to_dict())
+        plan = json.dumps(plan)
+        plan = hashlib.sha256(plan.encode("utf-8")).hexdigest()
+        fingerprint = json.dumps([str(path.resolve()), stat.st_size, stat.st_mtime_ns, plan])
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"{key}.parquet"
+
+    def get(self, path: Path, usecols: List[int], names: List[str],
+            timestamp_format: str | None = None, schema: RawSchema | None = None) -> pd.DataFrame | None:
+        """Return the cached extract of a raw file, or None if it is not cached."""
+        entry = self._entry(self.key(path, usecols, names, timestamp_format, schema))
+        if not entry.exists():
+            return None
+        try:
+            frame = pd.read_parquet(entry)
+        except Exception as exc:
+            print(f"  Warning: discarding unreadable cache entry for {path.name} ({exc}).")
+            entry.unlink(missing_ok=True)
+            return None
+        # Touch the entry so eviction treats it as recently used
+        os.utime(entry)
+        return frame
+
+    def put(self, path: Path, usecols: List[int], names: List[str], frame: pd.DataFrame,
+            timestamp_format: str | None = None, schema: RawSchema | None = None) -> None:
+        """Store the extract of a raw file, then evict old entries if over the size limit."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(self.key(path, usecols, names, timestamp_format, schema))
+        partial = entry.with_suffix(".tmp")
+        try:
+            frame.to_parquet(partial, index=False)
+        except Exception as exc:
+            # Mixed-type object columns cannot be stored; just read the file next time
+            print(f"  Warning: not caching {path.name} ({exc}).")
+            partial.unlink(missing_ok=True)
+            return
+        os.replace(partial, entry)
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits its size limit.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if not self.directory.is_dir():
+            return 0
+        entries = sorted(self.directory.glob("*.parquet"), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        removed = 0
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Delete every cache entry.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if not self.directory.is_dir():
+            return 0
+        removed = 0
+        for entry in self.directory.iterdir():
+            if entry.suffix in {".parquet", ".tmp"}:
+                entry.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def cache_from_config(config: dict) -> IngestCache | None:
+    """Build the ingest cache described in ``inputs.json``, or None when disabled."""
+    if not config.get("Ingest cache", False):
+        return None
+    return IngestCache(
+        directory=Path(config.get("Cache folder") or DEFAULT_CACHE_DIR),
+        max_mb=config.get("Cache size (MB)", DEFAULT_CACHE_MB),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the raw file ingest cache.")
+    parser.add_argument("--clear", action="store_true", help="delete every cached extract")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_CACHE_DIR, help="cache folder")
+    args = parser.parse_args()
+
+    cache = IngestCache(args.dir)
+    if args.clear:
+        print(f"Removed {cache.clear()} cached file(s) from {cache.directory}.")
+    else:
+        entries = list(cache.directory.glob("*.parquet")) if cache.directory.is_dir() else []
+        size_mb = sum(entry.stat().st_size for entry in entries) / (1024 * 1024)
+        print(f"{len(entries)} cached file(s), {size_mb:.1f} MB in {cache.directory}.")
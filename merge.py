@@ -0,0 +1,200 @@
+"""Linear merge of time-ordered raw files into one chronological frame.
+
+Every raw datalog and MFC file is written in time order, so the combined data
+does not need a full sort: each file is checked to be monotonic and the files
+are merged pairwise. Only a file that is out of order is sorted on its own.
+Files whose time ranges overlap are reported, since that is where duplicate
+timestamps come from.
+
+``join_mfc_asof`` lines the final MFC channels up with the datalog timeline
+for the combined output.
+"""
+
+from __future__ import annotations
+
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_writer import HYPHENATED_ATTR
+
+# Frame attribute naming the raw file a frame was read from
+SOURCE_ATTR = "source_file"
+
+_NAT = np.iinfo(np.int64).min
+
+
+class FileRange(NamedTuple):
+    """First and last valid timestamp of one raw file."""
+
+    name: str
+    first: pd.Timestamp
+    last: pd.Timestamp
+
+
+def _time_values(frame: pd.DataFrame) -> np.ndarray:
+    """Return the first column of a frame as int64 nanoseconds, NaT as ``iNaT``."""
+    stamps = frame.iloc[:, 0]
+    if not pd.api.types.is_datetime64_dtype(stamps.dtype):
+        stamps = pd.to_datetime(stamps, dayfirst=True, errors="coerce")
+    return stamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def is_time_ordered(values: np.ndarray) -> bool:
+    """True when the valid timestamps never go backwards and NaT only trails."""
+    valid = values != _NAT
+    count = int(valid.sum())
+    if not valid[:count].all():
+        return False
+    return not (np.diff(values[:count]) < 0).any()
+
+
+def overlapping_ranges(ranges: Sequence[FileRange]) -> List[Tuple[FileRange, FileRange]]:
+    """Return every pair of files whose time ranges share at least one instant."""
+    ordered = sorted(ranges, key=lambda r: r.first)
+    pairs = []
+    for i, earlier in enumerate(ordered):
+        for later in ordered[i + 1:]:
+            if later.first > earlier.last:
+                break
+            pairs.append((earlier, later))
+    return pairs
+
+
+def report_overlaps(ranges: Sequence[FileRange]) -> None:
+    """Print the files whose time ranges overlap."""
+    pairs = overlapping_ranges(ranges)
+    if not pairs:
+        return
+    print(f"  {len(pairs)} overlapping time range(s) between files (expect duplicate timestamps):")
+    for earlier, later in pairs:
+        end = min(earlier.last, later.last)
+        print(f"    {earlier.name} and {later.name}: {later.first} to {end}")
+
+
+def _merge_two(a: np.ndarray, a_rows: np.ndarray,
+               b: np.ndarray, b_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge two sorted runs; on equal timestamps the rows of ``a`` come first."""
+    merged = np.empty(len(a) + len(b), dtype=np.int64)
+    rows = np.empty(len(a) + len(b), dtype=np.int64)
+    a_at = np.searchsorted(b, a, side="left") + np.arange(len(a))
+    b_at = np.searchsorted(a, b, side="right") + np.arange(len(b))
+    merged[a_at], rows[a_at] = a, a_rows
+    merged[b_at], rows[b_at] = b, b_rows
+    return merged, rows
+
+
+def merge_time_ordered(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Combine per-file frames into one frame in time order.
+
+    Rows with equal timestamps keep file order and then row order, as a stable
+    sort of the concatenated files would. Rows whose timestamp cannot be
+    parsed go last, where a sort puts NaT.
+
+    Args:
+        frames: One frame per raw file, in the order they should be combined,
+            with the timestamp in the first column. ``attrs["source_file"]``
+            names the file in messages.
+
+    Returns:
+        DataFrame of all rows in chronological order, timestamps as datetimes.
+    """
+    stamps: List[np.ndarray] = []
+    runs: List[Tuple[np.ndarray, np.ndarray]] = []
+    unparsed: List[np.ndarray] = []
+    ranges: List[FileRange] = []
+    offset = 0
+    for number, frame in enumerate(frames):
+        name = frame.attrs.get(SOURCE_ATTR, f"file {number + 1}")
+        values = _time_values(frame)
+        stamps.append(values)
+        rows = np.arange(offset, offset + len(values))
+        offset += len(values)
+
+        valid = values != _NAT
+        unparsed.append(rows[~valid])
+        values, rows = values[valid], rows[valid]
+        if not len(values):
+            continue
+        if (np.diff(values) < 0).any():
+            print(f"  {name} is not in time order; sorting it.")
+            order = np.argsort(values, kind="stable")
+            values, rows = values[order], rows[order]
+        runs.append((values, rows))
+        ranges.append(FileRange(name, pd.Timestamp(values[0]), pd.Timestamp(values[-1])))
+
+    report_overlaps(ranges)
+
+    # Merge neighbouring runs until one is left, so ties keep file order
+    while len(runs) > 1:
+        paired = [_merge_two(*runs[i], *runs[i + 1]) for i in range(0, len(runs) - 1, 2)]
+        if len(runs) % 2:
+            paired.append(runs[-1])
+        runs = paired
+
+    merged = [runs[0][1]] if runs else []
+    order = np.concatenate([*merged, *unparsed]).astype(np.int64)
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined[combined.columns[0]] = np.concatenate(stamps).view("datetime64[ns]")
+    combined = combined.take(order).reset_index(drop=True)
+    combined.attrs.pop(SOURCE_ATTR, None)
+    return combined
+
+
+def sort_by_time(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort a frame on its first column, unless it is already in time order."""
+    if is_time_ordered(_time_values(df)):
+        return df.reset_index(drop=True)
+    return df.sort_values(by=df.columns[0]).reset_index(drop=True)
+
+
+def join_mfc_asof(datalog: pd.DataFrame, mfc: pd.DataFrame,
+                  tolerance: pd.Timedelta = pd.Timedelta(seconds=1)) -> pd.DataFrame:
+    """Line the MFC channels up with the datalog timeline.
+
+    Each datalog row gets the MFC row at or before its timestamp, if that row
+    is no more than ``tolerance`` earlier; otherwise the MFC channels are
+    blank. Both frames must be sorted on their first (timestamp) column. The
+    join walks both frames once, so it runs in linear time.
+
+    Args:
+        datalog: The final datalog frame.
+        mfc: The final, resampled MFC frame.
+        tolerance: Largest time an MFC row may lag the datalog row.
+
+    Returns:
+        The datalog frame with the MFC channels appended. MFC columns whose
+        names clash with datalog columns get a " (MFC)" suffix, and hyphenated
+        columns of both frames stay hyphenated.
+    """
+    timestamp_col = datalog.columns[0]
+    mfc_timestamp = mfc.columns[0]
+    channels = [col for col in mfc.columns[1:] if col != "Time Step"]
+    renames = {col: f"{col} (MFC)" for col in channels if col in datalog.columns}
+
+    right = mfc[[mfc_timestamp, *channels]].rename(columns=renames)
+    right[mfc_timestamp] = pd.to_datetime(right[mfc_timestamp])
+    right = right[right[mfc_timestamp].notna()]
+    left = datalog.copy(deep=False)
+    left[timestamp_col] = pd.to_datetime(left[timestamp_col])
+    valid = left[timestamp_col].notna()
+
+    key = "__mfc_time__"
+    joined = pd.merge_asof(
+        left[valid],
+        right.rename(columns={mfc_timestamp: key}),
+        left_on=timestamp_col,
+        right_on=key,
+        direction="backward",
+        tolerance=tolerance,
+    ).drop(columns=key)
+    if not valid.all():
+        joined = pd.concat([joined, left[~valid]], ignore_index=True)
+
+    hyphenated = list(datalog.attrs.get(HYPHENATED_ATTR, []))
+    hyphenated += [renames.get(col, col) for col in mfc.attrs.get(HYPHENATED_ATTR, [])
+                   if col in channels]
+    joined.attrs = {HYPHENATED_ATTR: hyphenated}
+    return joined
@@ -0,0 +1,134 @@
+"""Which output files a run writes, and in which formats.
+
+``"Outputs"`` in ``inputs.json`` maps each artifact of a run to the formats it
+is written in; artifacts left out keep their default:
+
+    "Outputs": {
+        "Step 1": ["parquet"],
+        "Precomparison": [],
+        "Final": ["csv"],
+        "Combined": []
+    }
+
+``"csv"`` gives the usual delivery CSVs, ``"parquet"`` a zstd-compressed
+parquet file and ``"arrow"`` an uncompressed Arrow IPC file, which step 2 of
+a ``"Separate steps"`` run memory-maps instead of parsing. Hyphenated columns
+are written as "-" in every format.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from arrow_reader import arrow_available, pa
+from csv_writer import write_csv
+from functions import apply_hyphenation
+from run_report import advance
+
+ARTIFACTS = ("Step 1", "Precomparison", "Final", "Combined")
+FORMATS = ("csv", "parquet", "arrow")
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+# The finished deliverables plus one compact copy of the merged raw data
+DEFAULT_OUTPUTS: Dict[str, Tuple[str, ...]] = {
+    "Step 1": ("parquet",),
+    "Precomparison": (),
+    "Final": ("csv",),
+    "Combined": (),
+}
+# Formats step 2 can load, fastest first
+HANDOFF_FORMATS = ("arrow", "parquet")
+PARQUET_COMPRESSION = "zstd"
+ROW_GROUP_ROWS = 1 << 18
+
+
+def output_plan(config: Dict[str, Any]) -> Dict[str, Tuple[str, ...]]:
+    """Resolve the formats to write each artifact in.
+
+    ``"Combined output": true`` still adds a combined CSV when ``"Outputs"``
+    does not mention ``"Combined"``.
+
+    Raises:
+        ValueError: If ``"Outputs"`` names an unknown artifact or format, asks
+            for Arrow without pyarrow installed, or gives ``"Separate steps"``
+            no step 1 file to load.
+    """
+    outputs = dict(DEFAULT_OUTPUTS)
+    if config.get("Combined output", False):
+        outputs["Combined"] = ("csv",)
+    for artifact, formats in config.get("Outputs", {}).items():
+        if artifact not in ARTIFACTS:
+            raise ValueError(f"Unknown output {artifact!r} in \"Outputs\"; expected one of {ARTIFACTS}")
+        if isinstance(formats, str):
+            formats = [formats]
+        unknown = [fmt for fmt in formats if fmt not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown format(s) {unknown} for {artifact!r} in \"Outputs\"; "
+                             f"expected any of {FORMATS}")
+        outputs[artifact] = tuple(dict.fromkeys(formats))
+
+    if any("arrow" in formats for formats in outputs.values()) and not arrow_available():
+        raise ValueError("The \"arrow\" output format needs pyarrow; install it or use \"parquet\".")
+    if config.get("Separate steps", False) and handoff_format(outputs["Step 1"]) is None:
+        raise ValueError("\"Separate steps\" needs a \"parquet\" or \"arrow\" \"Step 1\" output for step 2 to load.")
+    return outputs
+
+
+def handoff_format(formats: Iterable[str]) -> str | None:
+    """The step 1 format step 2 loads from, or None if none was written."""
+    formats = list(formats)
+    return next((fmt for fmt in HANDOFF_FORMATS if fmt in formats), None)
+
+
+def write_arrow(df: pd.DataFrame, path: Path) -> None:
+    """Write a frame as an uncompressed Arrow IPC file, so it can be memory-mapped."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=ROW_GROUP_ROWS)
+
+
+def write_frame(df: pd.DataFrame, base: Path, formats: Iterable[str], workers: int | None = None) -> List[Path]:
+    """Write one frame in each of ``formats``.
+
+    Args:
+        df: The frame to write.
+        base: Output path without the extension.
+        formats: Any of ``"csv"``, ``"parquet"`` and ``"arrow"``.
+        workers: CSV formatting processes, as for ``write_csv``.
+
+    Returns:
+        The paths written, in the order of ``formats``.
+    """
+    paths = []
+    for fmt in formats:
+        path = Path(f"{base}{EXTENSIONS[fmt]}")
+        if fmt == "csv":
+            write_csv(df, path, workers=workers)
+        elif fmt == "parquet":
+            apply_hyphenation(df).to_parquet(path, index=False, compression=PARQUET_COMPRESSION,
+                                        row_group_size=ROW_GROUP_ROWS)
+        else:
+            write_arrow(apply_hyphenation(df), path)
+        if fmt != "csv":
+            advance(rows=len(df))
+        paths.append(path)
+    return paths
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """Load a step 1 file written by ``write_frame``.
+
+    Arrow files are memory-mapped, so the file is not read into a buffer
+    before conversion. Paths without an extension, as stored in older
+    state files, are read as parquet.
+    """
+    path = Path(path)
+    if path.suffix == EXTENSIONS["arrow"]:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+    if path.suffix != EXTENSIONS["parquet"]:
+        path = Path(f"{path}{EXTENSIONS['parquet']}")
+    return pd.read_parquet(path)
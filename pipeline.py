@@ -0,0 +1,568 @@
+"""In-process data pack pipeline: discovery, read, clean and write.
+
+``build_data_pack`` runs both steps in one process and hands the DataFrames
+from step 1 to step 2 in memory, so the GUI and other scripts can call it
+directly. ``df_readAndmap.py`` and ``loadMappeddata.py`` are thin command-line
+wrappers around the functions below.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+import pandas as pd
+
+from compact import compact_frame, frame_memory_mb, placeholder_column, report_memory
+from csv_writer import hyphenated_columns
+from file_discovery import DiscoveredFiles, discover_files
+from functions import (CONSTANT_SENTINELS, build_output_headers, deduplicate_timestamps,
+                       exclude_columns, mark_hyphenated, read_raw_files, resample_seconds)
+from ingest_cache import cache_from_config
+from merge import join_mfc_asof, merge_time_ordered, sort_by_time
+from output_plan import handoff_format, output_plan, write_frame
+from presets import DEFAULT_PRESET_NAME
+from quality import (COLUMNS_SUFFIX, QUALITY_SUFFIX, TimestampTally, frame_quality, hyphen_reasons,
+                     report_timestamps, write_quality_report)
+from raw_schema import RawSchema, resolve_schema
+from run_report import RunReport, begin_stage, file_bytes, pack_rows
+from streaming import DEFAULT_CHUNK_ROWS, ColumnStats, collect_column_stats, stream_data_pack
+from timestamps import resolve_format
+
+INPUTS = Path(__file__).resolve().parent / "inputs.json"
+RUN_REPORT_SUFFIX = "_run_report.json"
+
+
+class DataPack(NamedTuple):
+    """The datalog and MFC frames of one data pack."""
+
+    datalog: pd.DataFrame
+    mfc: pd.DataFrame
+
+
+class ColumnPlan(NamedTuple):
+    """How raw file columns map onto data pack headers."""
+
+    usecols: List[int]
+    names: List[str]
+    usecols_mfc: List[int]
+    names_mfc: List[str]
+    output_headers: List[str]
+    output_headers_mfc: List[str]
+
+
+def load_config(path: Path = INPUTS) -> Dict[str, Any]:
+    """Load the run configuration from ``inputs.json``."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def output_path(config: Dict[str, Any], suffix: str) -> Path:
+    """Build an output path in the raw data folder from the Data Pack Name.
+
+    Args:
+        config: The run configuration.
+        suffix: Text appended to the Data Pack Name, e.g. ``"_MFC.csv"``.
+
+    Returns:
+        Path: The output file path.
+    """
+    return Path(config["Folder Path"]) / f"{config['Data Pack Name']}{suffix}"
+
+
+def _write_workers(config: Dict[str, Any]) -> int | None:
+    """CSV formatting processes from ``"Write workers"``; null means one per CPU core."""
+    return config.get("Write workers")
+
+
+def _compact(config: Dict[str, Any]) -> bool:
+    """Whether ``"Compact dtypes"`` is on."""
+    return config.get("Compact dtypes", False)
+
+
+def sentinel_values(config: Dict[str, Any]) -> Tuple[float, ...]:
+    """Values that mark a whole column as invalid, from ``"Sentinel values"``."""
+    return tuple(float(value) for value in config.get("Sentinel values", CONSTANT_SENTINELS))
+
+
+def mfc_resampling(config: Dict[str, Any]) -> Tuple[Dict[str, str], int | None]:
+    """MFC aggregation per column and maximum gap to fill, from the config.
+
+    ``"MFC aggregation"`` maps column names to mean, last, max, min or first;
+    unlisted columns are averaged. ``"MFC max gap (s)"`` is the longest run of
+    empty seconds filled with blank rows: 0 (the default) keeps only seconds
+    with data, and null fills every gap.
+    """
+    return config.get("MFC aggregation", {}), config.get("MFC max gap (s)", 0)
+
+
+def plan_columns(config: Dict[str, Any]) -> ColumnPlan:
+    """Work out which raw columns to read and the headers to give them.
+
+    Raises:
+        ValueError: If a column list and its header list differ in length.
+    """
+    preset_columns = config["Datalog columns"]
+    preset_headers = config["Datalog names"]
+    preset_colsMfc = config["MFC columns"]
+    preset_headersMfc = config["MFC names"]
+
+    if len(preset_columns) != len(preset_headers):
+        raise ValueError("Preset columns and headers length mismatch")
+    if len(preset_colsMfc) != len(preset_headersMfc):
+        raise ValueError("Preset MFC columns and headers length mismatch")
+
+    # Create sorted mappings (pandas reads usecols in sorted order)
+    # Then we'll reindex to the desired output order
+    headerMap = dict(sorted(zip(preset_columns, preset_headers)))
+    headerMapMfc = dict(sorted(zip(preset_colsMfc, preset_headersMfc)))
+
+    return ColumnPlan(
+        usecols=list(headerMap.keys()),
+        names=list(headerMap.values()),
+        usecols_mfc=list(headerMapMfc.keys()),
+        names_mfc=list(headerMapMfc.values()),
+        output_headers=build_output_headers(preset_headers, config["Additional columns"]),
+        output_headers_mfc=list(preset_headersMfc),
+    )
+
+
+def discover(config: Dict[str, Any], report: RunReport | None = None) -> DiscoveredFiles:
+    """Find and list the datalog and MFC files in the configured folder."""
+    stage = begin_stage(report, "discover")
+    discovered = discover_files(Path(config["Folder Path"]))
+
+    print(f"Found {len(discovered.mfc_files)} MFC file(s):")
+    for mfc in discovered.mfc_files:
+        print(f"  - {mfc.name}")
+
+    print(f"\nFound {len(discovered.datalog_files)} datalog file(s):")
+    for datalog in discovered.datalog_files:
+        print(f"  - {datalog.name}")
+
+    stage.counts["datalog_files"] = len(discovered.datalog_files)
+    stage.counts["mfc_files"] = len(discovered.mfc_files)
+    stage.finish()
+    return discovered
+
+
+def timestamp_formats(config: Dict[str, Any], discovered: DiscoveredFiles) -> Tuple[str | None, str | None]:
+    """Resolve the datalog and MFC timestamp formats for the configured preset.
+
+    ``"Timestamp format"`` and ``"MFC timestamp format"`` in the config win;
+    otherwise the format stored for ``"Preset"`` is used, or detected from the
+    files and stored.
+    """
+    preset = config.get("Preset", DEFAULT_PRESET_NAME)
+    datalog_format = resolve_format(
+        preset, "datalog", discovered.datalog_files, config["Datalog columns"][0],
+        configured=config.get("Timestamp format"),
+    )
+    mfc_format = resolve_format(
+        preset, "mfc", discovered.mfc_files, config["MFC columns"][0],
+        configured=config.get("MFC timestamp format"),
+    )
+    return datalog_format, mfc_format
+
+
+def raw_schemas(config: Dict[str, Any], discovered: DiscoveredFiles) -> Tuple[RawSchema | None, RawSchema | None]:
+    """Resolve the datalog and MFC raw-file schemas for the configured preset.
+
+    ``"Datalog schema"`` and ``"MFC schema"`` in the config win; otherwise the
+    schema stored for ``"Preset"`` is used, with any newly selected columns
+    inferred from the files and stored. ``"Typed reads": false`` lets pandas
+    infer the column types of every file instead.
+    """
+    if not config.get("Typed reads", True):
+        return None, None
+    preset = config.get("Preset", DEFAULT_PRESET_NAME)
+    datalog_schema = resolve_schema(
+        preset, "datalog", discovered.datalog_files, config["Datalog columns"], config["Datalog columns"][0],
+        configured=config.get("Datalog schema"),
+    )
+    mfc_schema = resolve_schema(
+        preset, "mfc", discovered.mfc_files, config["MFC columns"], config["MFC columns"][0],
+        configured=config.get("MFC schema"),
+    )
+    return datalog_schema, mfc_schema
+
+
+def read_data_pack(config: Dict[str, Any], discovered: DiscoveredFiles | None = None,
+                   report: RunReport | None = None) -> DataPack:
+    """Step 1: read and combine the raw files into mapped datalog and MFC frames.
+
+    Args:
+        config: The run configuration.
+        discovered: Files to read; discovered from the Folder Path if omitted.
+        report: Run report to record the stage on.
+
+    Returns:
+        DataPack with the combined frames in time order and output column order.
+    """
+    if discovered is None:
+        discovered = discover(config, report)
+    plan = plan_columns(config)
+    stage = begin_stage(report, "read",
+                        bytes_read=file_bytes(discovered.datalog_files + discovered.mfc_files))
+
+    # Parallel reads are opt-in; "Read workers" of null means one per CPU core
+    read_workers = config.get("Read workers") if config.get("Parallel read", False) else 1
+    reader = config.get("Reader", "pandas")
+    cache = cache_from_config(config)
+    datalog_format, mfc_format = timestamp_formats(config, discovered)
+    datalog_schema, mfc_schema = raw_schemas(config, discovered)
+
+    # Read all datalog files and merge them in time order
+    print("\nReading datalog files...")
+    datalog_chunks = read_raw_files(discovered.datalog_files, plan.usecols, plan.names,
+                                    workers=read_workers, cache=cache,
+                                    timestamp_col=plan.output_headers[0],
+                                    timestamp_format=datalog_format, reader=reader,
+                                    schema=datalog_schema)
+
+    if not datalog_chunks:
+        raise ValueError("No datalog files were successfully read.")
+
+    compact = _compact(config)
+    if compact:
+        before_mb = sum(frame_memory_mb(chunk) for chunk in datalog_chunks)
+        arrow_dtypes = config.get("Arrow dtypes", False)
+        datalog_chunks = [compact_frame(chunk, arrow_dtypes=arrow_dtypes) for chunk in datalog_chunks]
+
+    df = merge_time_ordered(datalog_chunks)
+    print(f"Combined datalog: {len(df)} rows")
+
+    # Read all MFC files and merge them in time order
+    print("\nReading MFC files...")
+    mfc_chunks = read_raw_files(discovered.mfc_files, plan.usecols_mfc, plan.names_mfc,
+                                workers=read_workers, cache=cache,
+                                timestamp_col=plan.output_headers_mfc[0],
+                                timestamp_format=mfc_format, reader=reader,
+                                schema=mfc_schema)
+
+    if not mfc_chunks:
+        raise ValueError("No MFC files were successfully read.")
+
+    dfMfc = merge_time_ordered(mfc_chunks)
+    print(f"Combined MFC: {len(dfMfc)} rows")
+
+    # Add additional columns
+    for new_column in config["Additional columns"]:
+        if new_column not in df.columns:
+            df[new_column] = placeholder_column(len(df)) if compact else "-"
+
+    df = df.reindex(columns=plan.output_headers)
+    dfMfc = dfMfc.reindex(columns=plan.output_headers_mfc)
+
+    if compact:
+        print("\nCompact dtypes:")
+        report_memory("Datalog", before_mb, frame_memory_mb(df))
+
+    stage.finish(rows_out=pack_rows(df, dfMfc))
+    return DataPack(datalog=df, mfc=dfMfc)
+
+
+def write_combined(pack: DataPack, config: Dict[str, Any], report: RunReport | None = None) -> DataPack | None:
+    """Write the step 1 files in the formats of the ``"Step 1"`` output.
+
+    Returns:
+        DataPack of the files step 2 loads (Arrow IPC if written, otherwise
+        parquet), as stored in the state file; None if neither was written.
+    """
+    formats = output_plan(config)["Step 1"]
+    stage = begin_stage(report, "write_combined", rows_in=pack_rows(*pack))
+    datalog_output = output_path(config, "")
+    mfc_output = output_path(config, "_MFC")
+
+    print(f"\nWriting combined datalog to {datalog_output.name} ({', '.join(formats)})...")
+    written = write_frame(pack.datalog, datalog_output, formats, _write_workers(config))
+    print(f"Writing combined MFC to {mfc_output.name} ({', '.join(formats)})...")
+    written += write_frame(pack.mfc, mfc_output, formats, _write_workers(config))
+    stage.finish(bytes_written=file_bytes(written))
+
+    handoff = handoff_format(formats)
+    if handoff is None:
+        return None
+    suffix = f".{handoff}"
+    return DataPack(datalog=Path(f"{datalog_output}{suffix}"), mfc=Path(f"{mfc_output}{suffix}"))
+
+
+def prepare_data_pack(pack: DataPack, config: Dict[str, Any], report: RunReport | None = None) -> DataPack:
+    """Sort both frames if needed, resample MFC data to 1 second and add Time Step columns."""
+    df, dfMfc = pack
+    stage = begin_stage(report, "prepare", rows_in=pack_rows(df, dfMfc))
+
+    # Convert first column (Date/Time) to datetime and sort chronologically;
+    # merged step 1 frames are already in order and skip the sort
+    df.iloc[:, 0] = pd.to_datetime(df.iloc[:, 0], dayfirst=True, errors='coerce')
+    df = sort_by_time(df)
+    #add a time step column based on the new index
+    if "Time Step" in df.columns:
+        df = df.drop(columns="Time Step")
+    df.insert(1, "Time Step", df.index)
+
+    dfMfc.iloc[:, 0] = pd.to_datetime(dfMfc.iloc[:, 0], dayfirst=True, errors='coerce')
+    dfMfc = sort_by_time(dfMfc)
+
+    ##resample  mfc data to 1 second intervals, skipping long gaps
+    aggregation, max_gap = mfc_resampling(config)
+    dfMfc = resample_seconds(dfMfc, aggregation, max_gap)
+
+    print(f"Resampled MFC: {len(dfMfc)} rows")
+    #add a time step column based on the new index
+    if "Time Step" in dfMfc.columns:
+        dfMfc = dfMfc.drop(columns="Time Step")
+    dfMfc.insert(1, "Time Step", dfMfc.index)
+
+    stage.finish(rows_out=pack_rows(df, dfMfc))
+    return DataPack(datalog=df, mfc=dfMfc)
+
+
+def write_precomparison(pack: DataPack, config: Dict[str, Any], report: RunReport | None = None) -> None:
+    """Write the sorted frames before duplicate removal."""
+    formats = output_plan(config)["Precomparison"]
+    stage = begin_stage(report, "write_precomparison", rows_in=pack_rows(*pack))
+    workers = _write_workers(config)
+    paths = write_frame(pack.mfc, output_path(config, "_MFC_precomparison"), formats, workers)
+    paths += write_frame(pack.datalog, output_path(config, "_precomparison"), formats, workers)
+    stage.finish(bytes_written=file_bytes(paths))
+
+
+def frame_report(config: Dict[str, Any], columns: List[str], timestamps: TimestampTally,
+                 stats: ColumnStats) -> Dict[str, Any]:
+    """The quality report of one frame, with the reasons its columns are hyphenated."""
+    reasons = hyphen_reasons(columns, stats.rules, config.get("Excluded Columns", []),
+                             config["Additional columns"])
+    return frame_quality(timestamps, stats, reasons)
+
+
+def write_quality(config: Dict[str, Any], reports: DataPack) -> None:
+    """Write the data quality report of a pack, unless ``"Quality report"`` is false."""
+    if config.get("Quality report", True):
+        write_quality_report({"Datalog": reports.datalog, "MFC": reports.mfc},
+                             output_path(config, QUALITY_SUFFIX), output_path(config, COLUMNS_SUFFIX))
+
+
+def clean_data_pack(pack: DataPack, config: Dict[str, Any], report: RunReport | None = None) -> DataPack:
+    """Step 2: resolve duplicate timestamps and mark invalid or excluded columns as hyphens.
+
+    The marked columns keep their data in memory and are listed in
+    ``attrs["hyphenated_columns"]`` of each frame; ``write_final`` writes them as "-".
+    """
+    df, dfMfc = pack
+    debug = config.get("Debug", False)
+    stage = begin_stage(report, "clean", rows_in=pack_rows(df, dfMfc))
+    rows_before = len(df), len(dfMfc)
+
+    # Timestamp facts are taken before duplicate removal changes them
+    gap_seconds = config.get("Gap threshold (s)")
+    timestamps = DataPack(TimestampTally(gap_seconds), TimestampTally(gap_seconds))
+    timestamps.datalog.add(df.iloc[:, 0])
+    timestamps.mfc.add(dfMfc.iloc[:, 0])
+    datalog_duplicates = int(df.iloc[:, 0].duplicated(keep=False).sum())
+    mfc_duplicates = int(dfMfc.iloc[:, 0].duplicated(keep=False).sum())
+
+    report_timestamps("datalog", timestamps.datalog)
+    if datalog_duplicates:
+        df=deduplicate_timestamps(df, debug=debug)
+    report_timestamps("MFC", timestamps.mfc)
+    if mfc_duplicates:
+        dfMfc=deduplicate_timestamps(dfMfc, debug=debug)
+
+    # One pass per column block gives the invalid columns and the value statistics
+    sentinels = sentinel_values(config)
+    stats = DataPack(collect_column_stats([df], sentinels), collect_column_stats([dfMfc], sentinels))
+    dfMfc = mark_hyphenated(dfMfc, stats.mfc.invalid_columns)
+    df = mark_hyphenated(df, stats.datalog.invalid_columns)
+    write_quality(config, DataPack(
+        datalog=frame_report(config, list(df.columns), timestamps.datalog, stats.datalog),
+        mfc=frame_report(config, list(dfMfc.columns), timestamps.mfc, stats.mfc),
+    ))
+
+    ##excluding specified columns
+    excluded_columns = config.get("Excluded Columns", [])
+    if excluded_columns:
+        print("excluding columns")
+        df = exclude_columns(df, excluded_columns)
+        dfMfc = exclude_columns(dfMfc, excluded_columns)
+
+    # Hyphenated columns are only ever written as "-", so drop their data
+    if _compact(config):
+        before_mb = frame_memory_mb(df) + frame_memory_mb(dfMfc)
+        df = compact_frame(df, hyphenated_columns(df), downcast=False)
+        dfMfc = compact_frame(dfMfc, hyphenated_columns(dfMfc), downcast=False)
+        report_memory("Cleaned data pack", before_mb, frame_memory_mb(df) + frame_memory_mb(dfMfc))
+
+    stage.counts["datalog_duplicate_rows"] = datalog_duplicates
+    stage.counts["mfc_duplicate_rows"] = mfc_duplicates
+    stage.counts["datalog_dropped_rows"] = rows_before[0] - len(df)
+    stage.counts["mfc_dropped_rows"] = rows_before[1] - len(dfMfc)
+    stage.finish(rows_out=pack_rows(df, dfMfc))
+    return DataPack(datalog=df, mfc=dfMfc)
+
+
+def write_final(pack: DataPack, config: Dict[str, Any], report: RunReport | None = None) -> DataPack:
+    """Write the final delivery files, as CSV unless ``"Outputs"`` says otherwise.
+
+    Returns:
+        DataPack of the lists of paths written.
+    """
+    formats = output_plan(config)["Final"]
+    stage = begin_stage(report, "write_final", rows_in=pack_rows(*pack))
+
+    workers = _write_workers(config)
+    mfc_final = write_frame(pack.mfc, output_path(config, "_MFC_DataPack_final"), formats, workers)
+    datalog_final = write_frame(pack.datalog, output_path(config, "_DataPack_final"), formats, workers)
+    stage.finish(bytes_written=file_bytes(datalog_final + mfc_final))
+
+    print(f"\nFinal outputs written:")
+    for path in datalog_final:
+        print(f"  Datalog: {path}")
+    for path in mfc_final:
+        print(f"  MFC: {path}")
+    return DataPack(datalog=datalog_final, mfc=mfc_final)
+
+
+def write_combined_final(pack: DataPack, config: Dict[str, Any], report: RunReport | None = None) -> List[Path]:
+    """Write the datalog with the MFC channels joined onto its timeline.
+
+    Each datalog row takes the MFC second at or before it, at most
+    ``"Combined tolerance (s)"`` (default 1) earlier.
+
+    Returns:
+        List[Path]: The combined files written, one per ``"Combined"`` format.
+    """
+    formats = output_plan(config)["Combined"] or ("csv",)
+    stage = begin_stage(report, "write_combined_final", rows_in=pack_rows(*pack))
+    tolerance = pd.Timedelta(seconds=config.get("Combined tolerance (s)", 1))
+    combined = join_mfc_asof(pack.datalog, pack.mfc, tolerance)
+    combined_final = write_frame(combined, output_path(config, "_Combined_DataPack_final"), formats,
+                                 _write_workers(config))
+    stage.finish(rows_out=len(combined), bytes_written=file_bytes(combined_final))
+    for path in combined_final:
+        print(f"  Combined: {path}")
+    return combined_final
+
+
+def stream_data_packs(config: Dict[str, Any], discovered: DiscoveredFiles | None = None,
+                      report: RunReport | None = None) -> None:
+    """Run both steps in bounded memory, writing the CSVs chunk by chunk.
+
+    Only CSV outputs are written in this mode: the final CSVs always, and the
+    precomparison CSVs when ``"Outputs"`` asks for them.
+    """
+    outputs = output_plan(config)
+    if discovered is None:
+        discovered = discover(config, report)
+    plan = plan_columns(config)
+    chunk_rows = config.get("Chunk rows", DEFAULT_CHUNK_ROWS)
+    excluded_columns = config.get("Excluded Columns", [])
+    sentinels = sentinel_values(config)
+    aggregation, max_gap = mfc_resampling(config)
+    datalog_format, mfc_format = timestamp_formats(config, discovered)
+    datalog_schema, mfc_schema = raw_schemas(config, discovered)
+    gap_seconds = config.get("Gap threshold (s)")
+    timestamps = DataPack(TimestampTally(gap_seconds), TimestampTally(gap_seconds))
+
+    print(f"\nStreaming datalog files in chunks of {chunk_rows} rows...")
+    precomparison = bool(outputs["Precomparison"])
+    paths = (output_path(config, "_precomparison.csv") if precomparison else None,
+             output_path(config, "_DataPack_final.csv"))
+    stage = begin_stage(report, "stream_datalog", bytes_read=file_bytes(discovered.datalog_files))
+    stats = stream_data_pack(
+        discovered.datalog_files, plan.usecols, plan.names, plan.output_headers, *paths,
+        additional_columns=config["Additional columns"],
+        excluded_columns=excluded_columns,
+        sentinels=sentinels,
+        chunk_rows=chunk_rows,
+        timestamp_format=datalog_format,
+        schema=datalog_schema,
+        timestamps=timestamps.datalog,
+    )
+    report_timestamps("datalog", timestamps.datalog)
+    datalog_report = frame_report(config, plan.output_headers, timestamps.datalog, stats)
+    stage.finish(rows_out=stats.rows, bytes_written=file_bytes(path for path in paths if path is not None))
+
+    print(f"Streaming MFC files in chunks of {chunk_rows} rows...")
+    paths = (output_path(config, "_MFC_precomparison.csv") if precomparison else None,
+             output_path(config, "_MFC_DataPack_final.csv"))
+    stage = begin_stage(report, "stream_mfc", bytes_read=file_bytes(discovered.mfc_files))
+    stats = stream_data_pack(
+        discovered.mfc_files, plan.usecols_mfc, plan.names_mfc, plan.output_headers_mfc, *paths,
+        excluded_columns=excluded_columns,
+        sentinels=sentinels,
+        resample=True,
+        aggregation=aggregation,
+        max_gap=max_gap,
+        chunk_rows=chunk_rows,
+        timestamp_format=mfc_format,
+        schema=mfc_schema,
+        timestamps=timestamps.mfc,
+    )
+    stage.finish(rows_out=stats.rows, bytes_written=file_bytes(path for path in paths if path is not None))
+    report_timestamps("MFC", timestamps.mfc)
+    write_quality(config, DataPack(datalog_report, frame_report(config, plan.output_headers_mfc,
+                                                                timestamps.mfc, stats)))
+    if outputs["Combined"]:
+        print("The combined output is not written in streaming mode.")
+    if any(fmt != "csv" for artifact in ("Precomparison", "Final") for fmt in outputs[artifact]):
+        print("Streaming mode writes the precomparison and final files as CSV only.")
+
+
+def new_run_report(config: Dict[str, Any], mode: str) -> RunReport:
+    """Start the run report for a data pack build."""
+    return RunReport(config["Data Pack Name"], mode)
+
+
+def write_run_report(report: RunReport, config: Dict[str, Any], suffix: str = RUN_REPORT_SUFFIX) -> Path:
+    """Print the per-stage summary and write the report next to the outputs.
+
+    Returns:
+        Path: The JSON report written.
+    """
+    report.print_summary()
+    path = report.write(output_path(config, suffix))
+    print(f"Run report: {path}")
+    return path
+
+
+def build_data_pack(config: Dict[str, Any], write_intermediates: bool = True,
+                    report: RunReport | None = None) -> DataPack:
+    """Build a data pack in one process and return the final frames.
+
+    Runs discovery, read, clean and write without a subprocess or a parquet
+    round-trip between the steps, and writes the run report next to the
+    outputs.
+
+    Args:
+        config: The run configuration, as loaded from ``inputs.json``.
+        write_intermediates: Also write the step 1 and precomparison files
+            listed in ``"Outputs"``.
+        report: Run report to record the stages on; a new one if omitted.
+
+    Returns:
+        DataPack with the final datalog and MFC frames. Invalid and excluded
+        columns keep their values and are only listed in
+        ``attrs["hyphenated_columns"]``; pass the frames through
+        ``functions.apply_hyphenation`` to replace them with "-" as the
+        written outputs do.
+    """
+    outputs = output_plan(config)
+    if report is None:
+        report = new_run_report(config, "in-memory")
+    pack = read_data_pack(config, report=report)
+    if write_intermediates and outputs["Step 1"]:
+        write_combined(pack, config, report)
+
+    pack = prepare_data_pack(pack, config, report)
+    if write_intermediates and outputs["Precomparison"]:
+        write_precomparison(pack, config, report)
+
+    pack = clean_data_pack(pack, config, report)
+    if outputs["Final"]:
+        write_final(pack, config, report)
+    if outputs["Combined"]:
+        write_combined_final(pack, config, report)
+    write_run_report(report, config)
+    return pack
@@ -0,0 +1,244 @@
+"""Single-pass data quality report written alongside each data pack.
+
+The clean step used to print every row with a repeated timestamp. Instead,
+the facts are gathered while the data goes through the clean step anyway.
+``TimestampTally`` records NaT rows, runs of repeated timestamps and gaps in
+the time-ordered timestamp column, one chunk at a time.
+``streaming.ColumnTally`` records the count, NaN count, min, max and mean of
+every column, one block of columns at a time, with the rule that marked a
+column invalid. ``write_quality_report`` saves both as
+``<Data Pack Name>_quality.json``, with the per-column table also in
+``<Data Pack Name>_quality_columns.csv``. The console gets one summary line
+per frame.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from streaming import ColumnStats
+
+QUALITY_SUFFIX = "_quality.json"
+COLUMNS_SUFFIX = "_quality_columns.csv"
+# Runs and gaps listed in the report; all of them are counted
+MAX_LISTED = 20
+# A gap is a step longer than this many times the typical sampling interval
+GAP_FACTOR = 2.0
+_NAT = np.iinfo(np.int64).min
+
+
+class ColumnSummary(NamedTuple):
+    """Value statistics of one column; min, max and mean are None without numbers."""
+
+    dtype: str
+    values: int
+    nan: int
+    minimum: float | None = None
+    maximum: float | None = None
+    mean: float | None = None
+
+
+class DuplicateRun(NamedTuple):
+    """Rows sharing one timestamp."""
+
+    timestamp: str
+    rows: int
+
+
+class Gap(NamedTuple):
+    """A step between consecutive timestamps longer than the gap threshold."""
+
+    start: str
+    end: str
+    seconds: float
+
+
+def _stamp(ns: int) -> str:
+    return str(pd.Timestamp(int(ns)))
+
+
+def json_number(value: float) -> float | None:
+    """A JSON-safe float: None for NaN and infinities."""
+    return float(value) if np.isfinite(value) else None
+
+
+class TimestampTally:
+    """Running NaT, repeated-timestamp and gap facts of a time-ordered timestamp column.
+
+    Chunks must arrive in time order; a run of repeated timestamps or a gap
+    may span two chunks. Without ``gap_seconds`` the threshold is
+    ``GAP_FACTOR`` times the median step of the first chunk with steps.
+    """
+
+    def __init__(self, gap_seconds: float | None = None, listed: int = MAX_LISTED) -> None:
+        self.gap_ns = None if gap_seconds is None else int(gap_seconds * 1e9)
+        self.listed = listed
+        self.rows = 0
+        self.nat = 0
+        self.first: int | None = None
+        self.last: int | None = None
+        self.run_length = 0
+        self.duplicate_rows = 0
+        self.duplicate_runs = 0
+        self.runs: List[DuplicateRun] = []
+        self.gap_count = 0
+        self.gap_ns_total = 0
+        # (length, -start) in nanoseconds of the longest gaps
+        self.gaps: List[Tuple[int, int]] = []
+
+    def add(self, stamps: pd.Series) -> None:
+        """Fold one chunk of the timestamp column into the tally."""
+        values = stamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        self.rows += len(values)
+        valid = values != _NAT
+        self.nat += len(values) - int(valid.sum())
+        values = values[valid]
+        if not len(values):
+            return
+        if self.gap_ns is None:
+            steps = np.diff(values)
+            steps = steps[steps > 0]
+            if len(steps):
+                self.gap_ns = int(GAP_FACTOR * np.median(steps))
+
+        carried = self.last is not None
+        if carried:
+            values = np.concatenate(([self.last], values))
+        else:
+            self.first = int(values[0])
+
+        # Every run but the last is complete; the last may go on in the next chunk
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        lengths = np.diff(np.r_[starts, len(values)])
+        if carried:
+            lengths[0] += self.run_length - 1
+        self._close_runs(values[starts[:-1]], lengths[:-1])
+        self.run_length = int(lengths[-1])
+        self.last = int(values[-1])
+
+        if self.gap_ns is not None:
+            steps = np.diff(values)
+            at = np.flatnonzero(steps > self.gap_ns)
+            self.gap_count += len(at)
+            self.gap_ns_total += int(steps[at].sum())
+            # Longest first, then earliest, whichever way the stream was chunked
+            at = at[np.lexsort((-values[at], steps[at]))[-self.listed:]]
+            found = [(int(steps[i]), -int(values[i])) for i in at]
+            self.gaps = heapq.nlargest(self.listed, self.gaps + found)
+
+    def _close_runs(self, values: np.ndarray, lengths: np.ndarray) -> None:
+        repeated = np.flatnonzero(lengths > 1)
+        self.duplicate_runs += len(repeated)
+        self.duplicate_rows += int(lengths[repeated].sum())
+        for i in repeated[:max(self.listed - len(self.runs), 0)]:
+            self.runs.append(DuplicateRun(_stamp(values[i]), int(lengths[i])))
+
+    def summary(self) -> Dict[str, Any]:
+        """The tally so far, with the run still open counted as complete."""
+        runs, duplicate_runs, duplicate_rows = list(self.runs), self.duplicate_runs, self.duplicate_rows
+        if self.run_length > 1:
+            duplicate_runs += 1
+            duplicate_rows += self.run_length
+            if len(runs) < self.listed:
+                runs.append(DuplicateRun(_stamp(self.last), self.run_length))
+        return {
+            "rows": self.rows,
+            "nat_rows": self.nat,
+            "first": None if self.first is None else _stamp(self.first),
+            "last": None if self.last is None else _stamp(self.last),
+            "duplicate_rows": duplicate_rows,
+            "duplicate_runs": duplicate_runs,
+            "first_duplicate_runs": [run._asdict() for run in runs],
+            "gap_threshold_s": None if self.gap_ns is None else self.gap_ns / 1e9,
+            "gaps": self.gap_count,
+            "gap_seconds": self.gap_ns_total / 1e9,
+            "largest_gaps": [
+                Gap(_stamp(-start), _stamp(-start + length), length / 1e9)._asdict()
+                for length, start in sorted(self.gaps, reverse=True)
+            ],
+        }
+
+
+def report_timestamps(label: str, tally: TimestampTally) -> None:
+    """Print one line on the repeated and unparseable timestamps of a frame."""
+    summary = tally.summary()
+    if summary["duplicate_rows"]:
+        first = summary["first_duplicate_runs"][0]["timestamp"]
+        print(f"\nRepeated timestamps found in {label}: {summary['duplicate_rows']} rows in "
+              f"{summary['duplicate_runs']} run(s), the first at {first}.")
+    else:
+        print(f"\nNo repeated timestamps found in {label}.")
+    if summary["nat_rows"]:
+        print(f"{summary['nat_rows']} {label} row(s) have no valid timestamp.")
+    if summary["gaps"]:
+        print(f"{summary['gaps']} gap(s) longer than {summary['gap_threshold_s']:g} s in {label}, "
+              f"{summary['gap_seconds']:g} s in total.")
+
+
+def hyphen_reasons(columns: Iterable[str], rules: Dict[str, str], excluded: Iterable[str],
+                   placeholders: Iterable[str]) -> Dict[str, List[str]]:
+    """Why each hyphenated column is written as "-".
+
+    Args:
+        columns: Columns of the frame.
+        rules: Invalid-data rule per invalid column, e.g. ``"all 1372"``.
+        excluded: The ``"Excluded Columns"``.
+        placeholders: The ``"Additional columns"``, which hold no data.
+
+    Returns:
+        The reasons per hyphenated column, in frame order.
+    """
+    excluded, placeholders = set(excluded), set(placeholders)
+    reasons = {}
+    for col in columns:
+        found = [rules[col]] if col in rules else []
+        if col in placeholders:
+            found.append("placeholder")
+        if col in excluded:
+            found.append("excluded")
+        if found:
+            reasons[col] = found
+    return reasons
+
+
+def frame_quality(timestamps: TimestampTally, stats: ColumnStats,
+                  reasons: Dict[str, List[str]]) -> Dict[str, Any]:
+    """The quality report of one frame.
+
+    The timestamp column and ``"Time Step"`` are described by the timestamp
+    facts rather than by column statistics.
+    """
+    skip = set(list(stats.columns)[:1]) | {"Time Step"}
+    columns = {}
+    for col, summary in stats.columns.items():
+        if col in skip:
+            continue
+        columns[col] = {**summary._asdict(), "hyphenated": reasons.get(col, [])}
+    return {"timestamps": timestamps.summary(), "columns": columns}
+
+
+def write_quality_report(reports: Dict[str, Dict[str, Any]], json_path: Path, csv_path: Path) -> None:
+    """Write the quality reports of a pack's frames as JSON, and their columns as CSV.
+
+    Args:
+        reports: ``frame_quality`` results by frame label (``"Datalog"``, ``"MFC"``).
+        json_path: The full report.
+        csv_path: One row per column of every frame.
+    """
+    json_path.write_text(json.dumps(reports, indent=2), encoding="utf-8")
+    rows = [
+        {"Data": label, "Column": col, "Dtype": facts["dtype"], "Values": facts["values"], "NaN": facts["nan"],
+         "Min": facts["minimum"], "Max": facts["maximum"], "Mean": facts["mean"],
+         "Hyphenated": "; ".join(facts["hyphenated"])}
+        for label, report in reports.items()
+        for col, facts in report["columns"].items()
+    ]
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    print(f"Data quality report: {json_path}")
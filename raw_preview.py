@@ -0,0 +1,110 @@
+"""Bounded head samples of raw files, for picking columns in the GUI.
+
+Opening a 100+ column datalog in Excel to find the column indices takes
+minutes on a long run. ``read_sample`` reads at most ``PREVIEW_BYTES`` from
+the start of a file, decodes it with the encoding sniffed from those same
+bytes and splits the first ``PREVIEW_ROWS`` lines on tabs. ``SampleCache``
+keeps recent samples per file fingerprint (path, size and modified time), so
+opening the same file again is instant and a file that has grown is read
+again.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+from file_encoding import sniff_encoding
+
+PREVIEW_BYTES = 1 << 18
+PREVIEW_ROWS = 50
+CACHE_ENTRIES = 16
+
+
+class RawSample(NamedTuple):
+    """The first lines of a raw file, split into fields."""
+
+    path: Path
+    encoding: str
+    rows: List[List[str]]
+    columns: int
+    truncated: bool
+
+    def column_values(self, index: int) -> List[str]:
+        """The sampled values of one column, skipping rows too short to have it."""
+        return [row[index] for row in self.rows if index < len(row)]
+
+
+def read_sample(path: Path, max_bytes: int = PREVIEW_BYTES, max_rows: int = PREVIEW_ROWS) -> RawSample:
+    """Read a bounded head sample of a tab-separated raw file.
+
+    Only whole lines are kept unless the first line alone is longer than
+    ``max_bytes``, in which case its fields are cut off at the limit.
+
+    Args:
+        path: The raw datalog or MFC file.
+        max_bytes: Most bytes read from the start of the file.
+        max_rows: Most lines kept.
+
+    Returns:
+        RawSample with the split lines and the widest line's field count;
+        ``truncated`` is True when the file holds more than the sample.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        data = f.read(max_bytes + 1)
+    truncated = len(data) > max_bytes
+    data = data[:max_bytes]
+    if truncated and b"\n" in data:
+        data = data[:data.rindex(b"\n") + 1]
+
+    encoding = sniff_encoding(data)
+    text = data.decode(encoding, errors="replace")
+    lines = [line for line in text.splitlines() if line.strip()]
+    truncated = truncated or len(lines) > max_rows
+    rows = [line.split("\t") for line in lines[:max_rows]]
+    return RawSample(
+        path=path,
+        encoding=encoding,
+        rows=rows,
+        columns=max((len(row) for row in rows), default=0),
+        truncated=truncated,
+    )
+
+
+def _fingerprint(path: Path) -> Tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+
+class SampleCache:
+    """The most recently read samples, keyed on file fingerprint. Thread-safe."""
+
+    def __init__(self, entries: int = CACHE_ENTRIES) -> None:
+        self.entries = entries
+        self._samples: OrderedDict[Tuple[str, int, int], RawSample] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cached(self, path: Path) -> RawSample | None:
+        """The sample of ``path`` if it is cached and the file is unchanged."""
+        key = _fingerprint(Path(path))
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is not None:
+                self._samples.move_to_end(key)
+            return sample
+
+    def get(self, path: Path) -> RawSample:
+        """The sample of ``path``, read from the file if it is not cached."""
+        sample = self.cached(path)
+        if sample is not None:
+            return sample
+        key = _fingerprint(Path(path))
+        sample = read_sample(Path(path))
+        with self._lock:
+            self._samples[key] = sample
+            while len(self._samples) > self.entries:
+                self._samples.popitem(last=False)
+        return sample
@@ -0,0 +1,286 @@
+"""Per-preset dtype schemas for typed raw-file reads.
+
+Letting pandas infer every column's type costs a pass over each file, and one
+bad line (a logger error message, a half-written row) turns a whole sensor
+channel into an object column of strings. Instead, the dtype of every raw
+column, the decimal mark and the NA markers are inferred once from a sample
+of the files and remembered per preset and file kind in ``raw_schemas.json``,
+next to the detected timestamp formats. Each run checks the stored schema
+against a fresh sample and infers the columns that no longer match again.
+Reads then pass explicit dtypes. A file with values that do not fit is read
+again as text and converted column by column; the values that do not match
+become blank and their rows are reported.
+
+Run ``python raw_schema.py --clear`` to forget the stored schemas
+(``--preset NAME`` for one preset only).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from arrow_reader import NULL_VALUES, pa
+from file_encoding import detect_encoding
+
+PROJECT_DIR = Path(__file__).resolve().parent
+SCHEMAS_FILE = PROJECT_DIR / "raw_schemas.json"
+SAMPLE_ROWS = 1000
+SAMPLE_FILES = 3
+DTYPES = ("float64", "int64", "string", "datetime")
+# A sampled column is numeric when at least this share of its values parse
+NUMERIC_SHARE = 0.9
+REPORTED_ROWS = 5
+
+_INT = re.compile(r"^[+-]?\d+$")
+_COMMA_DECIMAL = re.compile(r"^[+-]?\d*,\d+$")
+_DOT_DECIMAL = re.compile(r"^[+-]?\d*\.\d+(?:[eE][+-]?\d+)?$")
+
+# How each schema dtype is read by pandas; the timestamp is parsed afterwards
+_READ_DTYPES = {"float64": "float64", "int64": "int64", "string": str, "datetime": str}
+
+
+class RawSchema(NamedTuple):
+    """How to read the raw columns of one kind of file."""
+
+    dtypes: Dict[int, str]
+    decimal: str = "."
+    na_values: List[str] = NULL_VALUES
+
+    def read_dtypes(self, usecols: Sequence[int], names: Sequence[str]) -> Dict[str, Any]:
+        """The ``dtype`` argument for ``pd.read_csv`` over the selected columns."""
+        return {name: _READ_DTYPES[self.dtypes[col]] for col, name in zip(usecols, names) if col in self.dtypes}
+
+    def read_options(self) -> Dict[str, Any]:
+        """The decimal and NA conventions, as ``pd.read_csv`` arguments."""
+        return {"decimal": self.decimal, "na_values": self.na_values, "keep_default_na": False}
+
+    def arrow_types(self, usecols: Sequence[int], names: Sequence[str]) -> Dict[str, "pa.DataType"]:
+        """The ``column_types`` for ``arrow_reader.read_raw_table``."""
+        types = {"float64": pa.float64(), "int64": pa.int64(), "string": pa.string(), "datetime": pa.string()}
+        return {name: types[self.dtypes[col]] for col, name in zip(usecols, names) if col in self.dtypes}
+
+    def numeric(self, usecols: Sequence[int], names: Sequence[str]) -> Dict[str, str]:
+        """Schema dtype of each selected numeric column, by header."""
+        return {name: self.dtypes[col] for col, name in zip(usecols, names)
+                if self.dtypes.get(col) in ("float64", "int64")}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The JSON form stored in ``raw_schemas.json``."""
+        return {
+            "dtypes": {str(col): dtype for col, dtype in sorted(self.dtypes.items())},
+            "decimal": self.decimal,
+            "na_values": list(self.na_values),
+        }
+
+    @classmethod
+    def from_dict(cls, stored: Dict[str, Any]) -> RawSchema:
+        """Build a schema from its JSON form.
+
+        Raises:
+            ValueError: If a dtype is not one of ``DTYPES``.
+        """
+        dtypes = {int(col): dtype for col, dtype in stored.get("dtypes", {}).items()}
+        unknown = sorted(set(dtypes.values()) - set(DTYPES))
+        if unknown:
+            raise ValueError(f"Unknown schema dtype(s) {unknown}; use {', '.join(DTYPES)}.")
+        return cls(dtypes, stored.get("decimal", "."), list(stored.get("na_values", NULL_VALUES)))
+
+
+def _column_dtype(values: pd.Series, decimal: str) -> str:
+    """The schema dtype of one sampled column of raw text values."""
+    values = values.dropna().str.strip()
+    values = values[values != ""]
+    if values.empty:
+        # pandas reads an all-empty column as float64 NaN
+        return "float64"
+    numbers = values.str.replace(",", ".", regex=False) if decimal == "," else values
+    parsed = pd.to_numeric(numbers, errors="coerce")
+    if parsed.notna().mean() < NUMERIC_SHARE:
+        return "string"
+    if values.str.match(_INT).all():
+        return "int64"
+    return "float64"
+
+
+def infer_schema(paths: Sequence[Path], usecols: Sequence[int], timestamp_index: int,
+                 rows: int = SAMPLE_ROWS, na_values: Sequence[str] = NULL_VALUES) -> RawSchema | None:
+    """Infer the schema of the selected columns from the first rows of a few files.
+
+    Args:
+        paths: Raw files of one kind; the first ``SAMPLE_FILES`` that exist are sampled.
+        usecols: Raw column indices to type.
+        timestamp_index: Raw index of the Date/Time column.
+        rows: Rows sampled per file.
+        na_values: Markers read as missing.
+
+    Returns:
+        RawSchema for ``usecols``, or None if there are no rows to sample.
+    """
+    frames = [
+        pd.read_csv(path, sep="\t", usecols=list(usecols), header=None, nrows=rows, dtype=str,
+                    na_values=list(na_values), keep_default_na=False, encoding=detect_encoding(path))
+        for path in [path for path in paths if path.exists()][:SAMPLE_FILES]
+    ]
+    if not any(len(frame) for frame in frames):
+        return None
+    sample = pd.concat(frames, ignore_index=True)
+
+    tokens = pd.Series(sample.drop(columns=[timestamp_index], errors="ignore").to_numpy().ravel()).dropna()
+    tokens = tokens.astype(str)
+    comma = tokens.str.match(_COMMA_DECIMAL).sum()
+    dot = tokens.str.match(_DOT_DECIMAL).sum()
+    decimal = "," if comma > dot else "."
+
+    dtypes = {}
+    for col in usecols:
+        if col == timestamp_index:
+            dtypes[col] = "datetime"
+        elif col in sample.columns:
+            dtypes[col] = _column_dtype(sample[col], decimal)
+        else:
+            dtypes[col] = "float64"
+    return RawSchema(dtypes, decimal, list(na_values))
+
+
+def coerce_to_schema(df: pd.DataFrame, numeric: Dict[str, str], decimal: str = ".",
+                     first_row: int = 0) -> Tuple[pd.DataFrame, Dict[str, List[int]]]:
+    """Convert text columns of a file that did not fit the schema to their numeric dtypes.
+
+    Values that are not numbers become NaN. Integer columns with blanks
+    become float64, as pandas would have read them.
+
+    Args:
+        df: Frame read with the numeric columns as text.
+        numeric: Schema dtype per numeric column.
+        decimal: Decimal mark of the values.
+        first_row: Row number of the frame's first row in its file.
+
+    Returns:
+        The converted frame, and for each column with mismatches the row
+        numbers (from 0 at the start of the file) of the values that did not fit.
+    """
+    mismatches: Dict[str, List[int]] = {}
+    columns = {}
+    for name in numeric:
+        if name not in df.columns:
+            continue
+        text = df[name]
+        numbers = text.str.replace(",", ".", regex=False) if decimal == "," else text
+        converted = pd.to_numeric(numbers, errors="coerce")
+        bad = np.flatnonzero((converted.isna() & text.notna()).to_numpy())
+        if len(bad):
+            mismatches[name] = [first_row + int(row) for row in bad]
+        columns[name] = converted
+    return df.assign(**columns), mismatches
+
+
+def report_mismatches(name: str, numeric: Dict[str, str], mismatches: Dict[str, List[int]]) -> None:
+    """Print the values of a file that did not match the schema and were left blank."""
+    for column, rows in mismatches.items():
+        shown = ", ".join(str(row + 1) for row in rows[:REPORTED_ROWS])
+        more = ", ..." if len(rows) > REPORTED_ROWS else ""
+        print(f"  {name}: {len(rows)} value(s) in '{column}' are not {numeric[column]} and were left "
+              f"blank (line {shown}{more}).")
+
+
+def load_schemas(preset: str) -> Dict[str, RawSchema]:
+    """Return the stored schemas of a preset, keyed ``"datalog"``/``"mfc"``."""
+    if not SCHEMAS_FILE.exists():
+        return {}
+    stored = json.loads(SCHEMAS_FILE.read_text(encoding="utf-8"))
+    return {kind: RawSchema.from_dict(schema) for kind, schema in stored.get(preset, {}).items()}
+
+
+def store_schema(preset: str, kind: str, schema: RawSchema) -> None:
+    """Remember the schema of one kind of file for a preset."""
+    stored = json.loads(SCHEMAS_FILE.read_text(encoding="utf-8")) if SCHEMAS_FILE.exists() else {}
+    stored.setdefault(preset, {})[kind] = schema.to_dict()
+    SCHEMAS_FILE.write_text(json.dumps(stored, indent=2), encoding="utf-8")
+
+
+def resolve_schema(preset: str, kind: str, paths: Sequence[Path], usecols: Iterable[int],
+                   timestamp_index: int, configured: Dict[str, Any] | None = None) -> RawSchema | None:
+    """Find the schema for one kind of file (``"datalog"`` or ``"mfc"``).
+
+    A schema given in the config wins. Otherwise the schema stored for the
+    preset is checked against a sample of the files on every run: columns it
+    does not cover yet, or whose sampled dtype or decimal mark no longer
+    matches it (a later campaign logging text in a once-numeric channel), are
+    inferred again and the stored schema is updated. Columns no schema covers
+    are typed by pandas per file.
+    """
+    usecols = list(usecols)
+    if configured:
+        return RawSchema.from_dict(configured)
+    stored = load_schemas(preset).get(kind)
+    sampled = infer_schema(paths, usecols, timestamp_index,
+                           na_values=stored.na_values if stored is not None else NULL_VALUES)
+    if sampled is None:
+        if stored is None:
+            print(f"  Could not infer the {kind} schema; inferring column types per file.")
+        return stored
+
+    if stored is None or stored.decimal != sampled.decimal:
+        changed = usecols
+        schema = sampled if stored is None else sampled._replace(dtypes={**stored.dtypes, **sampled.dtypes})
+    else:
+        changed = [col for col in usecols if stored.dtypes.get(col) != sampled.dtypes[col]]
+        if not changed:
+            return stored
+        schema = stored._replace(dtypes={**stored.dtypes, **sampled.dtypes})
+
+    conflicts = [col for col in changed if stored is not None and col in stored.dtypes
+                 and stored.dtypes[col] != sampled.dtypes[col]]
+    if conflicts:
+        detail = ", ".join(f"{col}: {stored.dtypes[col]} -> {sampled.dtypes[col]}" for col in conflicts)
+        print(f"  The stored {kind} schema for preset '{preset}' no longer fits the files; "
+              f"re-inferred column(s) {detail}.")
+    if stored is not None and stored.decimal != sampled.decimal:
+        print(f"  The {kind} decimal mark for preset '{preset}' changed from '{stored.decimal}' "
+              f"to '{sampled.decimal}'.")
+    counts = {dtype: sum(1 for col in changed if sampled.dtypes[col] == dtype) for dtype in DTYPES}
+    summary = ", ".join(f"{count} {dtype}" for dtype, count in counts.items() if count)
+    print(f"  Inferred the {kind} schema for preset '{preset}' ({summary}; decimal '{schema.decimal}').")
+    store_schema(preset, kind, schema)
+    return schema
+
+
+def clear_schemas(preset: str | None = None) -> int:
+    """Forget the stored schemas of one preset, or of every preset.
+
+    Returns:
+        The number of schemas removed.
+    """
+    if not SCHEMAS_FILE.exists():
+        return 0
+    stored = json.loads(SCHEMAS_FILE.read_text(encoding="utf-8"))
+    if preset is None:
+        removed = sum(len(kinds) for kinds in stored.values())
+        SCHEMAS_FILE.unlink()
+        return removed
+    removed = len(stored.pop(preset, {}))
+    SCHEMAS_FILE.write_text(json.dumps(stored, indent=2), encoding="utf-8")
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the stored raw-file schemas.")
+    parser.add_argument("--clear", action="store_true", help="delete the stored schemas")
+    parser.add_argument("--preset", help="only this preset")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"Removed {clear_schemas(args.preset)} stored schema(s) from {SCHEMAS_FILE}.")
+    else:
+        schemas = json.loads(SCHEMAS_FILE.read_text(encoding="utf-8")) if SCHEMAS_FILE.exists() else {}
+        for name, kinds in schemas.items():
+            if args.preset is None or name == args.preset:
+                for kind, schema in kinds.items():
+                    print(f"{name} {kind}: {len(schema['dtypes'])} column(s), decimal '{schema['decimal']}'")
@@ -0,0 +1,261 @@
+"""Per-stage instrumentation and the machine-readable run report.
+
+Each pipeline step opens a stage on the run's ``RunReport`` and closes it
+with the rows it produced and the bytes it wrote. The report records wall
+time, rows in and out, throughput, bytes read and written, the process peak
+resident memory at the end of the stage and any counts the step adds (such
+as deduplicated and dropped rows), and is written as JSON next to the
+outputs.
+
+The GUI, or any other caller, can follow a run as it goes with
+``subscribe``: listeners are called with the stage name and ``None`` when a
+stage starts, and with its ``StageRecord`` when it finishes. Long stages also
+call ``advance`` between chunks (files read, CSV chunks written, streamed
+chunks), which sends a ``StageProgress`` to the ``subscribe_progress``
+listeners and is where ``request_cancel`` takes effect: the next stage start
+or ``advance`` raises ``RunCancelled``.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple
+
+import pandas as pd
+
+from compact import peak_memory_mb
+
+Listener = Callable[[str, "StageRecord | None"], None]
+ProgressListener = Callable[["StageProgress"], None]
+
+_listeners: List[Listener] = []
+_progress_listeners: List[ProgressListener] = []
+_cancel = threading.Event()
+_current: StageTracker | None = None
+
+
+class RunCancelled(Exception):
+    """Raised between chunks after ``request_cancel``."""
+
+
+class StageRecord(NamedTuple):
+    """Measurements of one finished pipeline stage."""
+
+    stage: str
+    seconds: float
+    rows_in: int | None
+    rows_out: int | None
+    rows_per_second: float | None
+    bytes_read: int
+    bytes_written: int
+    peak_rss_mb: float | None
+    counts: Dict[str, int]
+
+
+class StageProgress(NamedTuple):
+    """How far the running stage has got."""
+
+    stage: str
+    rows: int
+    fraction: float | None
+    seconds: float
+    rows_per_second: float | None
+    eta_seconds: float | None
+
+
+def subscribe(listener: Listener) -> None:
+    """Call ``listener(stage, record)`` as stages start (record None) and finish."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Listener) -> None:
+    """Stop calling a listener added with ``subscribe``."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def subscribe_progress(listener: ProgressListener) -> None:
+    """Call ``listener(progress)`` each time the running stage advances."""
+    if listener not in _progress_listeners:
+        _progress_listeners.append(listener)
+
+
+def unsubscribe_progress(listener: ProgressListener) -> None:
+    """Stop calling a listener added with ``subscribe_progress``."""
+    if listener in _progress_listeners:
+        _progress_listeners.remove(listener)
+
+
+def _notify(stage: str, record: StageRecord | None) -> None:
+    for listener in list(_listeners):
+        listener(stage, record)
+
+
+def _set_current(tracker: StageTracker | None, finished: StageTracker | None = None) -> None:
+    """Track the stage ``advance`` reports on; a finished stage only clears itself."""
+    global _current
+    if finished is None or _current is finished:
+        _current = tracker
+
+
+def request_cancel() -> None:
+    """Stop the run at the next stage start or chunk boundary."""
+    _cancel.set()
+
+
+def clear_cancel() -> None:
+    """Forget an earlier ``request_cancel``, before starting a new run."""
+    _cancel.clear()
+
+
+def check_cancelled() -> None:
+    """Raise RunCancelled if ``request_cancel`` was called."""
+    if _cancel.is_set():
+        raise RunCancelled("The run was cancelled.")
+
+
+def advance(rows: int = 0, bytes_done: int = 0, fraction: float | None = None) -> None:
+    """Record work done in the running stage and stop if the run was cancelled.
+
+    Args:
+        rows: Rows handled since the last call.
+        bytes_done: Bytes of input handled since the last call.
+        fraction: Share of the stage done, when the caller knows it better
+            than the stage's ``rows_in`` or ``bytes_read`` totals.
+
+    Raises:
+        RunCancelled: If ``request_cancel`` was called.
+    """
+    check_cancelled()
+    tracker = _current
+    if tracker is not None and _progress_listeners:
+        tracker.advance(rows, bytes_done, fraction)
+
+
+def file_bytes(paths: Iterable[Path | str]) -> int:
+    """Total size of the files that exist among ``paths``."""
+    return sum(Path(path).stat().st_size for path in paths if Path(path).is_file())
+
+
+def pack_rows(*frames: pd.DataFrame) -> int:
+    """Total rows over several frames."""
+    return sum(len(frame) for frame in frames)
+
+
+class StageTracker:
+    """An open stage; ``finish`` records it on the report, if there is one."""
+
+    def __init__(self, report: RunReport | None, stage: str, rows_in: int | None = None,
+                 bytes_read: int = 0) -> None:
+        self.report = report
+        self.stage = stage
+        self.rows_in = rows_in
+        self.bytes_read = bytes_read
+        self.counts: Dict[str, int] = {}
+        self.rows_done = 0
+        self.bytes_done = 0
+        self._start = time.perf_counter()
+        check_cancelled()
+        if report is not None:
+            _set_current(self)
+            _notify(stage, None)
+
+    def advance(self, rows: int = 0, bytes_done: int = 0, fraction: float | None = None) -> StageProgress:
+        """Add to the work done and tell the progress listeners; see ``advance``."""
+        self.rows_done += rows
+        self.bytes_done += bytes_done
+        if fraction is None and self.bytes_read and self.bytes_done:
+            fraction = self.bytes_done / self.bytes_read
+        elif fraction is None and self.rows_in:
+            fraction = self.rows_done / self.rows_in
+        if fraction is not None:
+            fraction = min(fraction, 1.0)
+        seconds = time.perf_counter() - self._start
+        progress = StageProgress(
+            stage=self.stage,
+            rows=self.rows_done,
+            fraction=fraction,
+            seconds=seconds,
+            rows_per_second=self.rows_done / seconds if seconds > 0 else None,
+            eta_seconds=seconds * (1 - fraction) / fraction if fraction else None,
+        )
+        for listener in list(_progress_listeners):
+            listener(progress)
+        return progress
+
+    def finish(self, rows_out: int | None = None, bytes_written: int = 0) -> StageRecord:
+        """Close the stage.
+
+        Args:
+            rows_out: Rows the stage produced; taken as ``rows_in`` if omitted.
+            bytes_written: Bytes of output files the stage wrote.
+
+        Returns:
+            StageRecord: The stage's measurements.
+        """
+        seconds = time.perf_counter() - self._start
+        if rows_out is None:
+            rows_out = self.rows_in
+        rows = self.rows_in if self.rows_in is not None else rows_out
+        record = StageRecord(
+            stage=self.stage,
+            seconds=seconds,
+            rows_in=self.rows_in,
+            rows_out=rows_out,
+            rows_per_second=rows / seconds if rows is not None and seconds > 0 else None,
+            bytes_read=self.bytes_read,
+            bytes_written=bytes_written,
+            peak_rss_mb=peak_memory_mb(),
+            counts=dict(self.counts),
+        )
+        if self.report is not None:
+            _set_current(None, finished=self)
+            self.report.stages.append(record)
+            _notify(self.stage, record)
+        return record
+
+
+def begin_stage(report: RunReport | None, stage: str, rows_in: int | None = None,
+                bytes_read: int = 0) -> StageTracker:
+    """Start timing a stage; without a report the measurements are not kept."""
+    return StageTracker(report, stage, rows_in=rows_in, bytes_read=bytes_read)
+
+
+class RunReport:
+    """The stages of one run, in the order they finished."""
+
+    def __init__(self, name: str, mode: str) -> None:
+        self.name = name
+        self.mode = mode
+        self.started = datetime.now()
+        self.stages: List[StageRecord] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "data_pack": self.name,
+            "mode": self.mode,
+            "started": self.started.isoformat(timespec="seconds"),
+            "total_seconds": sum(record.seconds for record in self.stages),
+            "peak_rss_mb": peak_memory_mb(),
+            "stages": [record._asdict() for record in self.stages],
+        }
+
+    def print_summary(self) -> None:
+        """Print one line per stage, so the slow stages stand out."""
+        print(f"\n{'Stage':<22}{'Seconds':>10}{'Rows out':>12}{'Rows/s':>12}{'Peak RSS (MB)':>15}")
+        for record in self.stages:
+            rows = f"{record.rows_out}" if record.rows_out is not None else "-"
+            rate = f"{record.rows_per_second:.0f}" if record.rows_per_second is not None else "-"
+            peak = f"{record.peak_rss_mb:.0f}" if record.peak_rss_mb is not None else "-"
+            print(f"{record.stage:<22}{record.seconds:>10.2f}{rows:>12}{rate:>12}{peak:>15}")
+
+    def write(self, path: Path) -> Path:
+        """Write the report as JSON and return its path."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
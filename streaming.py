@@ -0,0 +1,578 @@
+"""Bounded-memory streaming pipeline from raw log files to the final CSVs.
+
+The in-memory path holds the whole combined datalog several times over. This
+module walks the raw files in chunks of rows instead, so peak memory is set by
+the chunk size rather than by the length of the run. The sentinel and
+all-negative column test has to see every value of a column, so the stream is
+run twice: a first pass only gathers column statistics, and a second pass
+writes the precomparison and final CSVs with the invalid columns hyphenated.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_writer import LayoutTally, append_csv
+from functions import (CONSTANT_SENTINELS, aggregate_seconds, invalid_column_masks, iter_raw_file,
+                       resolve_duplicate_slots)
+from merge import FileRange, report_overlaps
+from quality import ColumnSummary, TimestampTally, json_number
+from raw_schema import RawSchema
+from run_report import advance
+from timestamps import parse_timestamps, report_parse
+
+DEFAULT_CHUNK_ROWS = 200_000
+# Numeric columns converted to one float array at a time by ColumnTally
+COLUMN_BLOCK = 64
+_ONE_SECOND_NS = 1_000_000_000
+
+
+class ColumnStats(NamedTuple):
+    """Whole-stream column facts gathered by the first pass."""
+
+    dtypes: Dict[str, np.dtype]
+    invalid_columns: List[str]
+    rows: int = 0
+    columns: Dict[str, ColumnSummary] | None = None
+    rules: Dict[str, str] | None = None
+
+
+def _as_ns(stamps: pd.Series) -> np.ndarray:
+    """Return a datetime series as int64 nanoseconds, NaT as ``iNaT``."""
+    return stamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _is_number(dtype) -> bool:
+    """True for the dtypes ``select_dtypes(include="number")`` picks up."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _iter_parsed(path: Path, usecols: List[int], names: List[str], columns: List[str],
+                 chunk_rows: int, timestamp_format: str | None = None,
+                 byte_range: Tuple[int, int] | None = None,
+                 schema: RawSchema | None = None) -> Iterator[pd.DataFrame]:
+    """Yield chunks of one raw file in output column order with parsed timestamps."""
+    mismatched = coerced = 0
+    for chunk in iter_raw_file(path, usecols, names, chunk_rows, byte_range, schema):
+        chunk = chunk.reindex(columns=columns)
+        timestamp_col = chunk.columns[0]
+        chunk[timestamp_col], missed, failed = parse_timestamps(chunk[timestamp_col], timestamp_format)
+        mismatched += missed
+        coerced += failed
+        yield chunk
+    report_parse(path.name, timestamp_format, mismatched, coerced)
+
+
+def iter_time_ordered(paths: Iterable[Path], usecols: List[int], names: List[str],
+                      columns: List[str], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      timestamp_format: str | None = None,
+                      report: bool = False,
+                      byte_ranges: Dict[Path, Tuple[int, int]] | None = None,
+                      schema: RawSchema | None = None) -> Iterator[pd.DataFrame]:
+    """Merge several time-ordered raw files into one chronological stream.
+
+    Rows with equal timestamps come out in file order and then row order, as
+    a stable sort of the concatenated files would give. Rows whose timestamp
+    cannot be parsed are held back and yielded last, where a sort puts NaT.
+
+    Args:
+        paths: The raw files to merge, in the order they should be combined.
+        usecols: Column indices to extract, in ascending order.
+        names: Headers for the extracted columns, in the same order as usecols.
+        columns: Output column order; the timestamp column must be first.
+        chunk_rows: Rows read from a file at a time.
+        timestamp_format: Explicit format of the timestamp column, if known.
+        report: Print the files whose time ranges overlap once the stream is done.
+        byte_ranges: Byte range to read per file, for files that are only
+            partly read; other files are read whole.
+        schema: Dtypes and NA conventions to read the files with.
+
+    Yields:
+        Chronologically ordered DataFrames.
+
+    Raises:
+        ValueError: If a file is not in time order.
+    """
+    paths = list(paths)
+    byte_ranges = byte_ranges or {}
+    readers = [
+        _iter_parsed(path, usecols, names, columns, chunk_rows, timestamp_format,
+                     byte_ranges.get(path), schema)
+        for path in paths
+    ]
+    pending: list[pd.DataFrame] = [pd.DataFrame(columns=columns) for _ in paths]
+    exhausted = [False] * len(paths)
+    first_seen: list[int | None] = [None] * len(paths)
+    last_seen = [np.iinfo(np.int64).min] * len(paths)
+    unparsed: list[pd.DataFrame] = []
+
+    def pull(i: int) -> None:
+        chunk = next(readers[i], None)
+        if chunk is None:
+            exhausted[i] = True
+            return
+        timestamp_col = chunk.columns[0]
+        nat = chunk[timestamp_col].isna().to_numpy()
+        if nat.any():
+            unparsed.append(chunk[nat])
+            chunk = chunk[~nat]
+        if chunk.empty:
+            return
+        values = _as_ns(chunk[timestamp_col])
+        if values[0] < last_seen[i] or (np.diff(values) < 0).any():
+            raise ValueError(
+                f"{paths[i].name} is not in time order; streaming mode needs "
+                "time-ordered raw files."
+            )
+        if first_seen[i] is None:
+            first_seen[i] = values[0]
+        last_seen[i] = values[-1]
+        pending[i] = chunk if pending[i].empty else pd.concat([pending[i], chunk], ignore_index=True)
+
+    while True:
+        for i in range(len(paths)):
+            while not exhausted[i] and pending[i].empty:
+                pull(i)
+
+        live = [i for i in range(len(paths)) if not exhausted[i]]
+        if not live:
+            break
+
+        # Everything strictly before the slowest file's last row is final
+        watermark = min(last_seen[i] for i in live)
+        pieces = []
+        for i, frame in enumerate(pending):
+            if frame.empty:
+                continue
+            cut = np.searchsorted(_as_ns(frame.iloc[:, 0]), watermark, side="left")
+            if cut:
+                pieces.append(frame.iloc[:cut])
+                pending[i] = frame.iloc[cut:]
+        if pieces:
+            yield _stable_sort(pd.concat(pieces, ignore_index=True))
+
+        for i in live:
+            if last_seen[i] == watermark:
+                pull(i)
+
+    remaining = [frame for frame in pending if not frame.empty]
+    if remaining:
+        yield _stable_sort(pd.concat(remaining, ignore_index=True))
+    if unparsed:
+        yield pd.concat(unparsed, ignore_index=True)
+
+    if report:
+        report_overlaps([
+            FileRange(path.name, pd.Timestamp(first), pd.Timestamp(last))
+            for path, first, last in zip(paths, first_seen, last_seen)
+            if first is not None
+        ])
+
+
+def _stable_sort(frame: pd.DataFrame) -> pd.DataFrame:
+    """Sort a frame by its first column, keeping the order of equal keys."""
+    return frame.sort_values(by=frame.columns[0], kind="stable").reset_index(drop=True)
+
+
+def iter_resampled(chunks: Iterable[pd.DataFrame], aggregation: Dict[str, str] | None = None,
+                   max_gap: int | None = 0) -> Iterator[pd.DataFrame]:
+    """Resample a chronological stream to one row per second.
+
+    Matches ``resample_seconds`` on the whole stream: seconds with data get a
+    row, and so do the empty seconds of gaps no longer than ``max_gap``
+    (``None`` fills every gap, like ``resample("1s")``). The rows of the
+    last, possibly incomplete, second of each chunk are carried into the next
+    one. Value columns are coerced to numbers.
+
+    Args:
+        chunks: Chronologically ordered DataFrames with the timestamp first.
+        aggregation: Aggregation per column; columns not listed are averaged.
+        max_gap: Longest run of empty seconds to fill with NaN rows.
+
+    Yields:
+        DataFrames with one row per emitted second.
+    """
+    carry: pd.DataFrame | None = None
+    last_bin: int | None = None
+
+    def aggregate(frame: pd.DataFrame, seconds: np.ndarray) -> pd.DataFrame:
+        nonlocal last_bin
+        values = frame.iloc[:, 1:].apply(pd.to_numeric, errors="coerce").reset_index(drop=True)
+        bins, block = aggregate_seconds(values, seconds, aggregation, max_gap, last_bin)
+        block.insert(0, frame.columns[0], pd.to_datetime(bins * _ONE_SECOND_NS))
+        last_bin = int(bins[-1])
+        return block
+
+    for chunk in chunks:
+        frame = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+        frame = frame[frame.iloc[:, 0].notna()]
+        if frame.empty:
+            carry = None
+            continue
+        seconds = _as_ns(frame.iloc[:, 0]) // _ONE_SECOND_NS
+        ready = seconds < seconds[-1]
+        carry = frame[~ready]
+        if ready.any():
+            yield aggregate(frame[ready], seconds[ready])
+
+    if carry is not None and not carry.empty:
+        yield aggregate(carry, _as_ns(carry.iloc[:, 0]) // _ONE_SECOND_NS)
+
+
+def iter_with_time_step(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Insert a running "Time Step" column in position 1 across the stream."""
+    offset = 0
+    for chunk in chunks:
+        if "Time Step" in chunk.columns:
+            chunk = chunk.drop(columns="Time Step")
+        chunk = chunk.copy()
+        chunk.insert(1, "Time Step", np.arange(offset, offset + len(chunk)))
+        offset += len(chunk)
+        yield chunk
+
+
+def iter_deduplicated(chunks: Iterable[pd.DataFrame], report: bool = True) -> Iterator[pd.DataFrame]:
+    """Resolve duplicate timestamps across a chronological stream.
+
+    Gives the same rows as ``deduplicate_timestamps`` on the whole stream. The
+    trailing run of each chunk is carried into the next, because its forward
+    window is not known until the following timestamp is seen. The slot given
+    to the last resolved row is passed on as the lower bound of the next run.
+
+    Args:
+        chunks: Chronologically ordered DataFrames with the timestamp first.
+        report: Print how many rows were dropped once the stream is done.
+
+    Yields:
+        DataFrames with duplicates adjusted or removed.
+    """
+    carry: pd.DataFrame | None = None
+    context: int | None = None
+    held: pd.DataFrame | None = None
+    dropped = 0
+
+    def resolve(frame: pd.DataFrame, upto: int, final: bool) -> pd.DataFrame:
+        nonlocal context, dropped
+        values = _as_ns(frame.iloc[:, 0])
+        # One row of lookahead supplies the next timestamp for the last run
+        segment = values if final else values[:upto + 1]
+        lead = 0 if context is None else 1
+        if lead:
+            segment = np.concatenate(([context], segment))
+        new_values, drop_positions = resolve_duplicate_slots(segment)
+        new_values = new_values[lead:lead + upto]
+        drop_positions = drop_positions[drop_positions >= lead] - lead
+        drop_positions = drop_positions[drop_positions < upto]
+
+        resolved = frame.iloc[:upto].copy()
+        resolved[resolved.columns[0]] = new_values.view("datetime64[ns]")
+        context = int(new_values[-1])
+        dropped += len(drop_positions)
+        if len(drop_positions):
+            resolved = resolved.drop(index=resolved.index[drop_positions])
+        return resolved
+
+    def release(resolved: pd.DataFrame, final: bool) -> pd.DataFrame | None:
+        # A later run can be pushed back in between rows already resolved, so
+        # only rows at or below the last resolved slot are safe to hand on
+        nonlocal held
+        frame = resolved if held is None else pd.concat([held, resolved], ignore_index=True)
+        frame = _stable_sort(frame)
+        if final:
+            held = None
+            return frame
+        cut = np.searchsorted(_as_ns(frame.iloc[:, 0]), context, side="right")
+        held = frame.iloc[cut:]
+        return frame.iloc[:cut] if cut else None
+
+    for chunk in chunks:
+        frame = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+        if frame.empty:
+            continue
+        values = _as_ns(frame.iloc[:, 0])
+        # Hold back the trailing run, it may continue in the next chunk
+        differs = np.flatnonzero(values != values[-1])
+        tail_start = differs[-1] + 1 if len(differs) else 0
+        carry = frame.iloc[tail_start:]
+        if tail_start == 0:
+            continue
+        ready = release(resolve(frame, tail_start, final=False), final=False)
+        if ready is not None and not ready.empty:
+            yield ready
+
+    if carry is not None and not carry.empty:
+        resolved = resolve(carry, len(carry), final=True)
+        yield release(resolved, final=True)
+    elif held is not None and not held.empty:
+        yield release(held.iloc[:0], final=True)
+
+    if report and dropped:
+        print(f"Dropped {dropped} rows due to insufficient spacing for duplicates.")
+
+
+class ColumnTally:
+    """Running dtype, validity and value facts of every column of a stream.
+
+    Chunks can be added at any time and ``stats`` reflects everything added
+    so far, so the same tally serves a whole-stream pass and a live stream.
+    Numeric columns are folded ``COLUMN_BLOCK`` at a time, so a whole frame
+    can be added without converting all of it to one float array.
+    """
+
+    def __init__(self, values: Iterable[float] = CONSTANT_SENTINELS) -> None:
+        self.sentinels = list(values)
+        self.rows = 0
+        self.dtypes: Dict[str, list] = {}
+        self.seen: Dict[str, bool] = {}
+        self.all_sentinel: Dict[str, np.ndarray] = {}
+        self.all_negative: Dict[str, bool] = {}
+        self.nan: Dict[str, int] = {}
+        self.minimum: Dict[str, float] = {}
+        self.maximum: Dict[str, float] = {}
+        self.total: Dict[str, float] = {}
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk into the tally."""
+        self.rows += len(chunk)
+        for col, dtype in chunk.dtypes.items():
+            found = self.dtypes.setdefault(col, [])
+            if dtype not in found:
+                found.append(dtype)
+
+        numeric = [col for col, dtype in chunk.dtypes.items() if _is_number(dtype)]
+        numbers = set(numeric)
+        for col in chunk.columns:
+            if col not in numbers:
+                self.nan[col] = self.nan.get(col, 0) + int(chunk[col].isna().sum())
+        for start in range(0, len(numeric), COLUMN_BLOCK):
+            self._add_block(chunk, numeric[start:start + COLUMN_BLOCK])
+
+    def _add_block(self, chunk: pd.DataFrame, numeric: List[str]) -> None:
+        block = chunk[numeric].to_numpy(dtype=float, na_value=np.nan)
+        has_data, matches, negative = invalid_column_masks(block, self.sentinels)
+        missing = np.isnan(block)
+        nan = missing.sum(axis=0)
+        total = np.where(missing, 0.0, block).sum(axis=0)
+        minimum = np.where(missing, np.inf, block).min(axis=0, initial=np.inf)
+        maximum = np.where(missing, -np.inf, block).max(axis=0, initial=-np.inf)
+        for pos, col in enumerate(numeric):
+            self.seen[col] = self.seen.get(col, False) or bool(has_data[pos])
+            self.all_negative[col] = self.all_negative.get(col, True) and bool(negative[pos])
+            previous = self.all_sentinel.get(col, np.ones(len(self.sentinels), dtype=bool))
+            self.all_sentinel[col] = previous & matches[:, pos] if len(self.sentinels) else previous
+            self.nan[col] = self.nan.get(col, 0) + int(nan[pos])
+            self.total[col] = self.total.get(col, 0.0) + float(total[pos])
+            self.minimum[col] = min(self.minimum.get(col, np.inf), float(minimum[pos]))
+            self.maximum[col] = max(self.maximum.get(col, -np.inf), float(maximum[pos]))
+
+    def changed_dtypes(self) -> List[str]:
+        """Numeric columns whose dtype differed between chunks, so their values print differently."""
+        return [
+            col for col, found in self.dtypes.items()
+            if len(found) > 1 and all(_is_number(dtype) for dtype in found)
+        ]
+
+    def _rule(self, col: str) -> str:
+        matched = np.flatnonzero(self.all_sentinel[col])
+        return f"all {self.sentinels[matched[0]]:g}" if len(matched) else "all negative"
+
+    def _summary(self, col: str, dtype: np.dtype) -> ColumnSummary:
+        nan = self.nan.get(col, 0)
+        values = self.rows - nan
+        if not _is_number(dtype) or not values:
+            return ColumnSummary(str(dtype), values, nan)
+        return ColumnSummary(str(dtype), values, nan, json_number(self.minimum[col]),
+                             json_number(self.maximum[col]), json_number(self.total[col] / values))
+
+    def stats(self) -> ColumnStats:
+        """The common dtype, value summary and invalid-data rule per column, and the row count so far."""
+        common: Dict[str, np.dtype] = {}
+        for col, found in self.dtypes.items():
+            if all(_is_number(dtype) for dtype in found):
+                common[col] = np.result_type(*found)
+            elif len(set(found)) == 1:
+                common[col] = found[0]
+            else:
+                common[col] = np.dtype(object)
+
+        invalid = [
+            col for col, dtype in common.items()
+            if _is_number(dtype)
+            and self.seen.get(col, False)
+            and (self.all_sentinel[col].any() or self.all_negative[col])
+        ]
+        return ColumnStats(
+            dtypes=common,
+            invalid_columns=invalid,
+            rows=self.rows,
+            columns={col: self._summary(col, dtype) for col, dtype in common.items()},
+            rules={col: self._rule(col) for col in invalid},
+        )
+
+
+def collect_column_stats(chunks: Iterable[pd.DataFrame],
+                         values: Iterable[float] = CONSTANT_SENTINELS) -> ColumnStats:
+    """Gather the whole-stream dtype and validity of every column.
+
+    A column is invalid when it is numeric throughout and its non-NaN values
+    are all one of the sentinel values or all negative, the same rule as
+    ``replace_constant_numeric_columns``.
+
+    Args:
+        chunks: The stream to inspect.
+        values: Sentinel values that mark a column as invalid.
+
+    Returns:
+        ColumnStats with the common dtype per column, the invalid columns and
+        the number of rows in the stream.
+    """
+    tally = ColumnTally(values)
+    for chunk in chunks:
+        tally.add(chunk)
+    return tally.stats()
+
+
+def iter_cast(chunks: Iterable[pd.DataFrame], dtypes: Dict[str, np.dtype]) -> Iterator[pd.DataFrame]:
+    """Cast numeric columns to their whole-stream dtype so every chunk prints alike."""
+    for chunk in chunks:
+        casts = {
+            col: dtype for col, dtype in dtypes.items()
+            if col in chunk.columns
+            and _is_number(dtype)
+            and chunk[col].dtype != dtype
+        }
+        yield chunk.astype(casts) if casts else chunk
+
+
+def iter_written(chunks: Iterable[pd.DataFrame], path: Path, layouts: Dict[str, str] | None = None,
+                 columns: List[str] | None = None, hyphenated: Iterable[str] = ()) -> Iterator[pd.DataFrame]:
+    """Append each chunk to a CSV file as it passes through.
+
+    Args:
+        chunks: The stream to write.
+        path: Destination CSV file.
+        layouts: Whole-stream datetime layouts from ``LayoutTally``.
+        columns: Header written when the stream has no rows; without it, no
+            file is written then.
+        hyphenated: Columns written as "-"; the chunks passed on keep their values.
+    """
+    hyphenated = list(hyphenated)
+    header = True
+    for chunk in chunks:
+        append_csv(chunk, path, header, hyphenated, layouts)
+        header = False
+        yield chunk
+    if header and columns is not None:
+        append_csv(pd.DataFrame(columns=columns), path, True)
+
+
+def iter_laid_out(chunks: Iterable[pd.DataFrame], layouts: LayoutTally) -> Iterator[pd.DataFrame]:
+    """Fold each chunk's datetime layouts into a tally as it passes through."""
+    for chunk in chunks:
+        layouts.add(chunk)
+        yield chunk
+
+
+def iter_tallied(chunks: Iterable[pd.DataFrame], timestamps: TimestampTally) -> Iterator[pd.DataFrame]:
+    """Fold each chunk's timestamps into a tally as it passes through."""
+    for chunk in chunks:
+        timestamps.add(chunk.iloc[:, 0])
+        yield chunk
+
+
+def stream_data_pack(
+    paths: Iterable[Path],
+    usecols: List[int],
+    names: List[str],
+    columns: List[str],
+    precomparison_path: Path | None,
+    final_path: Path,
+    additional_columns: Iterable[str] = (),
+    excluded_columns: Iterable[str] = (),
+    sentinels: Iterable[float] = CONSTANT_SENTINELS,
+    resample: bool = False,
+    aggregation: Dict[str, str] | None = None,
+    max_gap: int | None = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    timestamp_format: str | None = None,
+    schema: RawSchema | None = None,
+    timestamps: TimestampTally | None = None,
+) -> ColumnStats:
+    """Run the cleaning pipeline over raw files in bounded memory.
+
+    Produces the same precomparison and final CSVs as the in-memory path:
+    rows are merged chronologically, optionally resampled to 1-second bins, given
+    a Time Step, deduplicated, and invalid or excluded columns are written as
+    hyphens. The first pass also picks the datetime layout of each output as
+    ``csv_writer.write_csv`` would for the whole frame. Without any rows, the
+    CSVs hold just the header.
+
+    Args:
+        paths: The raw files to process.
+        usecols: Column indices to extract, in ascending order.
+        names: Headers for the extracted columns, in the same order as usecols.
+        columns: Output column order; the timestamp column must be first.
+        precomparison_path: CSV written before duplicate removal; None to skip it.
+        final_path: CSV written after cleaning.
+        additional_columns: Placeholder columns filled with hyphens.
+        excluded_columns: Columns always written as hyphens.
+        sentinels: Values that mark a whole column as invalid.
+        resample: Resample to 1-second bins (used for MFC data).
+        aggregation: Aggregation per column when resampling; default mean.
+        max_gap: Longest run of empty seconds to fill when resampling.
+        chunk_rows: Rows read from a file at a time.
+        timestamp_format: Explicit format of the timestamp column, if known.
+        schema: Dtypes and NA conventions to read the files with.
+        timestamps: Tally of the timestamps before duplicate removal, for
+            the quality report; filled in the first pass.
+
+    Returns:
+        ColumnStats gathered in the first pass.
+    """
+    paths = list(paths)
+    placeholders = [col for col in additional_columns if col in columns]
+    header = [columns[0], "Time Step"] + [col for col in columns[1:] if col != "Time Step"]
+    # Datetime layouts of the rows before and after duplicate removal
+    precomparison_layouts, final_layouts = LayoutTally(), LayoutTally()
+
+    def iter_stream(dtypes: Dict[str, np.dtype] | None = None) -> Iterator[pd.DataFrame]:
+        chunks = iter_time_ordered(paths, usecols, names, columns, chunk_rows, timestamp_format,
+                                   report=dtypes is None, schema=schema)
+        if placeholders:
+            chunks = (chunk.assign(**{col: "-" for col in placeholders}) for chunk in chunks)
+        if resample:
+            chunks = iter_resampled(chunks, aggregation, max_gap)
+        chunks = iter_with_time_step(chunks)
+        if dtypes is not None:
+            chunks = iter_cast(chunks, dtypes)
+            if precomparison_path is not None:
+                chunks = iter_written(chunks, precomparison_path, precomparison_layouts.layouts, header)
+        else:
+            chunks = iter_laid_out(chunks, precomparison_layouts)
+            if timestamps is not None:
+                chunks = iter_tallied(chunks, timestamps)
+        return iter_deduplicated(chunks, report=dtypes is not None)
+
+    def iter_advanced(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            advance(rows=len(chunk))
+            yield chunk
+
+    # Pass 1: whole-column statistics for the sentinel/all-negative test,
+    # and the datetime layouts the whole frames would be printed with
+    stats = collect_column_stats(iter_laid_out(iter_advanced(iter_stream()), final_layouts), sentinels)
+
+    # Pass 2: write the precomparison and final CSVs chunk by chunk; its
+    # row count is known now, so it reports the second half of the progress
+    hyphenated = set(stats.invalid_columns) | set(excluded_columns)
+    chunks = iter_written(iter_stream(stats.dtypes), final_path, final_layouts.layouts, header, hyphenated)
+    written = 0
+    for chunk in chunks:
+        written += len(chunk)
+        advance(rows=len(chunk), fraction=0.5 + 0.5 * written / max(stats.rows, 1))
+
+    return stats
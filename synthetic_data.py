@@ -0,0 +1,155 @@
+"""Synthetic raw datalog and MFC files for benchmarking.
+
+Writes tab-separated files in the layout ``inputs.json`` expects (no header,
+Date/Time in column 0), together with a matching configuration, so the whole
+pipeline can be run and timed on data of any size.
+
+Run ``python synthetic_data.py OUTPUT_FOLDER --rows 100000`` to write a set;
+the configuration is saved next to the folder as ``OUTPUT_FOLDER_inputs.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S"
+# Values written into the sentinel columns, in turn
+SENTINEL_KINDS = ("zero", "1372", "negative")
+
+
+class SyntheticSpec(NamedTuple):
+    """Shape of a synthetic data pack."""
+
+    rows: int = 100_000
+    files: int = 4
+    channels: int = 40
+    mfc_channels: int = 12
+    mfc_rows_per_second: int = 2
+    duplicate_fraction: float = 0.01
+    gap_every: int = 0
+    gap_seconds: int = 3600
+    overlap_seconds: int = 120
+    sentinel_columns: int = 2
+    seed: int = 0
+
+
+def _timestamps(rng: np.random.Generator, start: pd.Timestamp, rows: int,
+                spec: SyntheticSpec, step: float = 1.0) -> pd.DatetimeIndex:
+    """Timestamps with repeated seconds and an occasional long gap."""
+    steps = np.full(rows, step)
+    steps[0] = 0.0
+    steps[rng.random(rows) < spec.duplicate_fraction] = 0.0
+    if spec.gap_every:
+        steps[spec.gap_every::spec.gap_every] += spec.gap_seconds
+    return start + pd.to_timedelta(np.cumsum(steps), unit="s")
+
+
+def _sentinel_column(kind: str, rng: np.random.Generator, rows: int) -> np.ndarray:
+    if kind == "zero":
+        return np.zeros(rows)
+    if kind == "1372":
+        return np.full(rows, 1372.0)
+    # Strictly negative: a value rounding to -0.0 would not count as negative
+    return -(rng.random(rows) * 0.9999 + 0.0001).round(4)
+
+
+def write_datalog_file(path: Path, start: pd.Timestamp, spec: SyntheticSpec,
+                       rng: np.random.Generator) -> pd.Timestamp:
+    """Write one datalog file and return its last timestamp."""
+    rows = spec.rows // spec.files
+    stamps = _timestamps(rng, start, rows, spec)
+    columns = {0: stamps.strftime(TIMESTAMP_FORMAT)}
+    values = rng.normal(100.0, 20.0, (rows, spec.channels)).round(3)
+    for channel in range(spec.channels):
+        columns[channel + 1] = values[:, channel]
+    for number in range(spec.sentinel_columns):
+        kind = SENTINEL_KINDS[number % len(SENTINEL_KINDS)]
+        columns[spec.channels + 1 + number] = _sentinel_column(kind, rng, rows)
+    pd.DataFrame(columns).to_csv(path, sep="\t", header=False, index=False)
+    return stamps[-1]
+
+
+def write_mfc_file(path: Path, start: pd.Timestamp, spec: SyntheticSpec,
+                   rng: np.random.Generator) -> None:
+    """Write one MFC file, several readings per second."""
+    rows = spec.rows // spec.files * spec.mfc_rows_per_second
+    stamps = _timestamps(rng, start, rows, spec, step=1.0 / spec.mfc_rows_per_second)
+    columns = {0: stamps.strftime(TIMESTAMP_FORMAT)}
+    values = rng.random((rows, spec.mfc_channels)).round(4)
+    for channel in range(spec.mfc_channels):
+        columns[channel + 1] = values[:, channel]
+    pd.DataFrame(columns).to_csv(path, sep="\t", header=False, index=False)
+
+
+def synthetic_config(folder: Path, spec: SyntheticSpec) -> Dict[str, Any]:
+    """The run configuration for a synthetic data pack in ``folder``."""
+    datalog_columns = list(range(spec.channels + spec.sentinel_columns + 1))
+    mfc_columns = list(range(spec.mfc_channels + 1))
+    return {
+        "Folder Path": str(folder),
+        "Data Pack Name": "Synthetic",
+        "Datalog columns": datalog_columns,
+        "Datalog names": ["Date/Time"] + [f"Channel {col} (-)" for col in datalog_columns[1:]],
+        "MFC columns": mfc_columns,
+        "MFC names": ["Date/Time"] + [f"MFC {col} (SLPM)" for col in mfc_columns[1:]],
+        "Additional columns": {"Placeholder (-)": "Channel 1 (-)"},
+        "Excluded Columns": [],
+        "Timestamp format": TIMESTAMP_FORMAT,
+        "MFC timestamp format": TIMESTAMP_FORMAT,
+    }
+
+
+def write_synthetic_pack(folder: Path, spec: SyntheticSpec = SyntheticSpec()) -> Dict[str, Any]:
+    """Write a synthetic set of raw files and return the matching configuration.
+
+    Files follow each other in time, each starting ``overlap_seconds`` before
+    the previous one ended, so the overlaps produce duplicate timestamps as
+    real campaigns do.
+
+    Args:
+        folder: Folder to write into; created if missing.
+        spec: Row, channel, duplicate, gap and sentinel settings.
+
+    Returns:
+        The configuration dict, as ``inputs.json`` would hold it.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(spec.seed)
+    start = pd.Timestamp("2025-10-02 08:00:00")
+    for number in range(spec.files):
+        last = write_datalog_file(folder / f"datalog_{number:03d}.txt", start, spec, rng)
+        write_mfc_file(folder / f"MFC_{number:03d}.txt", start, spec, rng)
+        start = last - pd.Timedelta(seconds=spec.overlap_seconds)
+    return synthetic_config(folder, spec)
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one command-line option per ``SyntheticSpec`` field."""
+    for field, default in SyntheticSpec._field_defaults.items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=default)
+
+
+def spec_from_args(args: argparse.Namespace) -> SyntheticSpec:
+    return SyntheticSpec(**{field: getattr(args, field) for field in SyntheticSpec._fields})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic raw datalog and MFC files.")
+    parser.add_argument("folder", type=Path, help="folder to write the raw files into")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    config = write_synthetic_pack(args.folder, spec_from_args(args))
+    # Kept outside the folder, where it would be picked up as a datalog file
+    config_path = args.folder.with_name(f"{args.folder.name}_inputs.json")
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=4)
+    print(f"Wrote {args.files} datalog and {args.files} MFC file(s) to {args.folder}.")
+    print(f"Matching configuration: {config_path}")
@@ -0,0 +1,134 @@
+"""Timestamp format detection and explicit-format parsing for raw files.
+
+The raw logs write their Date/Time column in one fixed layout, so the format
+is detected once from a sample of each file and remembered per preset in
+``timestamp_formats.json``. Later runs parse with that explicit format. Any
+value the format does not match is parsed again the old way (day-first
+inference) and counted, so the fast path never drops rows silently.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import pandas as pd
+
+from file_encoding import detect_encoding
+
+PROJECT_DIR = Path(__file__).resolve().parent
+FORMATS_FILE = PROJECT_DIR / "timestamp_formats.json"
+SAMPLE_ROWS = 200
+
+# Day-first layouts come before month-first ones, matching dayfirst=True
+CANDIDATE_FORMATS: Tuple[str, ...] = (
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S.%f",
+    "%d/%m/%Y %H:%M",
+    "%d-%m-%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %I:%M:%S %p",
+)
+
+
+def sample_timestamps(path: Path, column: int, rows: int = SAMPLE_ROWS) -> List[str]:
+    """Read the first ``rows`` raw values of one column of a tab-separated file."""
+    sample = pd.read_csv(path, sep="\t", usecols=[column], header=None, nrows=rows, dtype=str,
+                         encoding=detect_encoding(path))
+    return [value for value in sample.iloc[:, 0].dropna().str.strip() if value]
+
+
+def detect_timestamp_format(samples: Iterable[str]) -> str | None:
+    """Return the first candidate format that parses every sample, or None."""
+    values = pd.Series(list(samples), dtype=object)
+    if values.empty:
+        return None
+    for fmt in CANDIDATE_FORMATS:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        if parsed.notna().all():
+            return fmt
+    return None
+
+
+def detect_files_format(paths: Sequence[Path], column: int) -> str | None:
+    """Detect one format that fits a sample from each of ``paths``."""
+    samples: List[str] = []
+    for path in paths:
+        if path.exists():
+            samples.extend(sample_timestamps(path, column))
+    return detect_timestamp_format(samples)
+
+
+def parse_timestamps(values: pd.Series, fmt: str | None) -> Tuple[pd.Series, int, int]:
+    """Parse a raw timestamp column.
+
+    Args:
+        values: Raw timestamp strings.
+        fmt: Explicit strptime format, or None for day-first inference.
+
+    Returns:
+        Tuple of the parsed series, the number of values the explicit format
+        did not match (re-parsed by inference), and the number of non-empty
+        values that still could not be parsed and became NaT.
+    """
+    if fmt is None:
+        parsed = pd.to_datetime(values, dayfirst=True, errors="coerce")
+        mismatched = 0
+    else:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        missed = parsed.isna() & values.notna()
+        mismatched = int(missed.sum())
+        if mismatched:
+            parsed[missed] = pd.to_datetime(values[missed], dayfirst=True, errors="coerce")
+    coerced = int((parsed.isna() & values.notna()).sum())
+    return parsed, mismatched, coerced
+
+
+def report_parse(name: str, fmt: str | None, mismatched: int, coerced: int) -> None:
+    """Print how many timestamps of a file missed the format or became NaT."""
+    if mismatched:
+        print(f"  {name}: {mismatched} timestamp(s) did not match '{fmt}' and were inferred.")
+    if coerced:
+        print(f"  {name}: {coerced} timestamp(s) could not be parsed and are NaT.")
+
+
+def load_formats(preset: str) -> Dict[str, str]:
+    """Return the stored formats of a preset, keyed ``"datalog"``/``"mfc"``."""
+    if not FORMATS_FILE.exists():
+        return {}
+    stored = json.loads(FORMATS_FILE.read_text(encoding="utf-8"))
+    return dict(stored.get(preset, {}))
+
+
+def store_formats(preset: str, formats: Dict[str, str]) -> None:
+    """Remember the detected formats of a preset."""
+    stored = json.loads(FORMATS_FILE.read_text(encoding="utf-8")) if FORMATS_FILE.exists() else {}
+    stored.setdefault(preset, {}).update(formats)
+    FORMATS_FILE.write_text(json.dumps(stored, indent=2), encoding="utf-8")
+
+
+def resolve_format(preset: str, kind: str, paths: Sequence[Path], column: int,
+                   configured: str | None = None) -> str | None:
+    """Find the timestamp format for one kind of file (``"datalog"`` or ``"mfc"``).
+
+    An explicitly configured format wins, then the one stored for the preset.
+    Otherwise the format is detected from the files and stored for next time.
+    """
+    if configured:
+        return configured
+    stored = load_formats(preset).get(kind)
+    if stored:
+        return stored
+    detected = detect_files_format(paths, column)
+    if detected is None:
+        print(f"  Could not detect the {kind} timestamp format; falling back to inference.")
+        return None
+    print(f"  Detected {kind} timestamp format '{detected}' for preset '{preset}'.")
+    store_formats(preset, {kind: detected})
+    return detected
@@ -0,0 +1,421 @@
+"""Watch mode: keep a live data pack up to date while the rig is logging.
+
+During a live ageing test the logger keeps appending to the current datalog
+and MFC files. Instead of rebuilding the whole pack for every interim
+delivery, ``watch_data_packs`` polls the Folder Path and feeds only the
+complete lines added since the last poll through the streaming pipeline
+(merge, resample, Time Step, duplicate removal). Those stages already carry
+their small trailing window from one chunk to the next (the last MFC second
+and the last duplicate run), so the new rows are simply appended to the
+precomparison and final CSVs.
+
+Column validity and the datetime layout are tallied as rows are written. The
+final CSV is written once the existing data has been read, and rewritten only
+when a column turns valid or invalid or a timestamp needs a finer layout (the
+first sub-second value), from a copy holding every value in ``.watch/`` inside
+the Folder Path. The precomparison CSV is rewritten in place for a new layout. The pack is rebuilt from the raw files only when data already processed
+changes: a file shrinks, is rewritten or removed, a new file holds rows older
+than those already written, or a numeric column changes type.
+
+Stop with Ctrl+C: the held-back rows are then written, and the outputs match
+a streaming build of the same files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_writer import LayoutTally, append_csv
+from file_discovery import discover_files
+from functions import CONSTANT_SENTINELS
+from output_plan import output_plan
+from pipeline import (discover, mfc_resampling, output_path, plan_columns, raw_schemas, sentinel_values,
+                      timestamp_formats)
+from raw_schema import RawSchema
+from streaming import (DEFAULT_CHUNK_ROWS, ColumnTally, iter_cast, iter_deduplicated, iter_resampled,
+                       iter_time_ordered, iter_with_time_step)
+
+WATCH_DIR = ".watch"
+DEFAULT_WATCH_INTERVAL = 30
+# Leading bytes of each file checked on every poll, to notice rewritten files
+_HEAD_BYTES = 4096
+_TAIL_SCAN_BYTES = 1 << 16
+
+
+class HistoryChanged(Exception):
+    """Raw data that was already processed has changed; the pack must be rebuilt."""
+
+    def __init__(self, reason: str, dtypes: Dict[str, np.dtype] | None = None) -> None:
+        super().__init__(reason)
+        self.dtypes = dtypes
+
+
+def _head_digest(f, length: int) -> bytes:
+    f.seek(0)
+    return hashlib.blake2b(f.read(length)).digest()
+
+
+def rewrite_csv(source: Path, target: Path, layouts: Dict[str, str], hyphenated: Iterable[str] = (),
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    """Write ``source`` again as ``target`` with other hyphenated columns or datetime layouts.
+
+    Values are copied as text; only the datetime columns are parsed, to print
+    them with ``layouts``.
+    """
+    partial = target.with_name(f"{target.name}.partial")
+    hyphenated = list(hyphenated)
+    header = True
+    with pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            chunk = chunk.assign(**{col: pd.to_datetime(chunk[col], format="ISO8601") for col in layouts})
+            append_csv(chunk, partial, header, hyphenated, layouts)
+            header = False
+    os.replace(partial, target)
+
+
+def complete_end(f, start: int, size: int) -> int:
+    """Offset just past the last newline between ``start`` and ``size``, or ``start`` if none.
+
+    The logger may be half way through writing a line; only complete lines
+    are read.
+    """
+    pos = size
+    while pos > start:
+        step = min(_TAIL_SCAN_BYTES, pos - start)
+        f.seek(pos - step)
+        newline = f.read(step).rfind(b"\n")
+        if newline >= 0:
+            return pos - step + newline + 1
+        pos -= step
+    return start
+
+
+class LiveSource:
+    """Chronological stream of the complete lines appended to a set of raw files.
+
+    Iterating polls the files every ``interval`` seconds and yields the new
+    rows in time order, until ``stop`` is set. Rows whose timestamp cannot be
+    parsed are held back and yielded last, as ``iter_time_ordered`` does.
+    """
+
+    def __init__(self, find_files: Callable[[], List[Path]], usecols: List[int], names: List[str],
+                 columns: List[str], chunk_rows: int, timestamp_format: str | None,
+                 interval: float, stop: threading.Event, on_idle: Callable[[], None],
+                 schema: RawSchema | None = None) -> None:
+        self.find_files = find_files
+        self.usecols = usecols
+        self.names = names
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self.timestamp_format = timestamp_format
+        self.interval = interval
+        self.stop = stop
+        self.on_idle = on_idle
+        self.schema = schema
+        self.offsets: Dict[Path, int] = {}
+        self.heads: Dict[Path, Tuple[int, bytes]] = {}
+        self.watermark = np.iinfo(np.int64).min
+        self.unparsed: List[pd.DataFrame] = []
+
+    def new_ranges(self, final: bool = False) -> Dict[Path, Tuple[int, int]]:
+        """Byte ranges of the complete lines added since the last poll, in file order.
+
+        With ``final``, a last line without a newline is included too.
+
+        Raises:
+            HistoryChanged: If a file read before was removed, shrank or rewritten.
+        """
+        for path in self.offsets:
+            if not path.is_file():
+                raise HistoryChanged(f"{path.name} was removed")
+
+        ranges = {}
+        for path in self.find_files():
+            offset = self.offsets.get(path, 0)
+            size = path.stat().st_size
+            if size == offset:
+                continue
+            with open(path, "rb") as f:
+                if size < offset:
+                    raise HistoryChanged(f"{path.name} shrank")
+                length, digest = self.heads.get(path, (0, b""))
+                if length and _head_digest(f, length) != digest:
+                    raise HistoryChanged(f"{path.name} was rewritten")
+                end = size if final else complete_end(f, offset, size)
+                if end > offset:
+                    ranges[path] = (offset, end)
+                    if length < _HEAD_BYTES:
+                        self.heads[path] = (min(end, _HEAD_BYTES), _head_digest(f, min(end, _HEAD_BYTES)))
+        return ranges
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        while True:
+            ranges = self.new_ranges()
+            if ranges:
+                yield from self.read(ranges)
+                continue
+            self.on_idle()
+            if self.stop.wait(self.interval):
+                break
+
+        # Pick up whatever was written up to the moment the watch stopped
+        yield from self.read(self.new_ranges(final=True))
+        if self.unparsed:
+            yield pd.concat(self.unparsed, ignore_index=True)
+
+    def read(self, ranges: Dict[Path, Tuple[int, int]]) -> Iterator[pd.DataFrame]:
+        """Yield the rows in ``ranges`` in time order and move the offsets past them."""
+        if not ranges:
+            return
+        for chunk in iter_time_ordered(list(ranges), self.usecols, self.names, self.columns,
+                                       self.chunk_rows, self.timestamp_format, byte_ranges=ranges,
+                                       schema=self.schema):
+            nat = chunk.iloc[:, 0].isna().to_numpy()
+            if nat.any():
+                self.unparsed.append(chunk[nat])
+                chunk = chunk[~nat]
+            if chunk.empty:
+                continue
+            values = chunk.iloc[:, 0].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            if values[0] < self.watermark:
+                raise HistoryChanged("new rows are older than rows already written")
+            self.watermark = values[-1]
+            yield chunk
+        for path, (_, end) in ranges.items():
+            self.offsets[path] = end
+
+
+class LiveStream:
+    """One watched stream of raw files (datalog or MFC) and its output CSVs."""
+
+    def __init__(
+        self,
+        label: str,
+        find_files: Callable[[], List[Path]],
+        usecols: List[int],
+        names: List[str],
+        columns: List[str],
+        precomparison_path: Path | None,
+        final_path: Path,
+        stop: threading.Event,
+        additional_columns: Iterable[str] = (),
+        excluded_columns: Iterable[str] = (),
+        sentinels: Iterable[float] = CONSTANT_SENTINELS,
+        resample: bool = False,
+        aggregation: Dict[str, str] | None = None,
+        max_gap: int | None = 0,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        timestamp_format: str | None = None,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        schema: RawSchema | None = None,
+    ) -> None:
+        self.label = label
+        self.find_files = find_files
+        self.usecols = usecols
+        self.names = names
+        self.columns = columns
+        self.precomparison_path = precomparison_path
+        self.final_path = final_path
+        self.values_path = final_path.parent / WATCH_DIR / final_path.name
+        self.stop = stop
+        self.placeholders = [col for col in additional_columns if col in columns]
+        self.excluded_columns = list(excluded_columns)
+        self.sentinels = list(sentinels)
+        self.resample = resample
+        self.aggregation = aggregation
+        self.max_gap = max_gap
+        self.chunk_rows = chunk_rows
+        self.timestamp_format = timestamp_format
+        self.interval = interval
+        self.schema = schema
+        # Whole-stream dtypes, known once a build has seen a column change type
+        self.dtypes: Dict[str, np.dtype] = {}
+
+    def run(self) -> None:
+        """Build the outputs from the raw files and keep appending until ``stop`` is set.
+
+        Raises:
+            HistoryChanged: If data already processed changed; call ``run`` again to rebuild.
+        """
+        self.values_path.parent.mkdir(exist_ok=True)
+        self.tally = ColumnTally(self.sentinels)
+        # Datetime layouts of every row so far, as a fresh build would print them
+        self.layouts = LayoutTally()
+        self.written_invalid: List[str] | None = None
+        self.reported_rows = 0
+
+        source = LiveSource(self.find_files, self.usecols, self.names, self.columns, self.chunk_rows,
+                            self.timestamp_format, self.interval, self.stop, self.sync_final, self.schema)
+        chunks: Iterator[pd.DataFrame] = iter(source)
+        if self.placeholders:
+            chunks = (chunk.assign(**{col: "-" for col in self.placeholders}) for chunk in chunks)
+        if self.resample:
+            chunks = iter_resampled(chunks, self.aggregation, self.max_gap)
+        chunks = iter_with_time_step(chunks)
+        if self.dtypes:
+            chunks = iter_cast(chunks, self.dtypes)
+        if self.precomparison_path is not None:
+            chunks = self.iter_precomparison(chunks)
+        for chunk in iter_deduplicated(chunks, report=False):
+            self.append(chunk)
+        self.sync_final()
+
+    def hyphenated(self, invalid: Iterable[str]) -> set:
+        return set(invalid) | set(self.excluded_columns)
+
+    def iter_precomparison(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Append each chunk to the precomparison CSV, rewriting it when a datetime layout changes."""
+        layouts = LayoutTally()
+        header = True
+        for chunk in chunks:
+            if layouts.add(chunk) and not header:
+                rewrite_csv(self.precomparison_path, self.precomparison_path, layouts.layouts,
+                            chunk_rows=self.chunk_rows)
+            append_csv(chunk, self.precomparison_path, header, layouts=layouts.layouts)
+            header = False
+            yield chunk
+
+    def append(self, chunk: pd.DataFrame) -> None:
+        """Add deduplicated rows to the full-value copy and, once written, the final CSV.
+
+        The final CSV is written again instead when the rows need a finer
+        datetime layout, such as the first sub-second timestamp.
+        """
+        first = self.tally.rows == 0
+        self.tally.add(chunk)
+        relaid = self.layouts.add(chunk)
+        append_csv(chunk, self.values_path, first, layouts=self.layouts.layouts)
+        if self.written_invalid is None:
+            return
+        if relaid:
+            self.rewrite_final(self.written_invalid)
+        else:
+            append_csv(chunk, self.final_path, False, self.hyphenated(self.written_invalid), self.layouts.layouts)
+
+    def sync_final(self) -> None:
+        """Bring the final CSV in line with the column validity of every row so far.
+
+        Raises:
+            HistoryChanged: If a numeric column changed type, so earlier rows
+                would print differently.
+        """
+        changed = self.tally.changed_dtypes()
+        if changed:
+            raise HistoryChanged(f"column type changed ({', '.join(changed)})", self.tally.stats().dtypes)
+        if self.tally.rows == 0:
+            return
+
+        invalid = self.tally.stats().invalid_columns
+        if self.written_invalid is None or set(invalid) != set(self.written_invalid):
+            self.rewrite_final(invalid)
+            self.written_invalid = invalid
+        if self.tally.rows != self.reported_rows:
+            print(f"  {self.label}: {self.tally.rows} rows written to {self.final_path.name}")
+            self.reported_rows = self.tally.rows
+
+    def rewrite_final(self, invalid: Iterable[str]) -> None:
+        """Write the final CSV again from the full-value copy with new hyphenated columns."""
+        rewrite_csv(self.values_path, self.final_path, self.layouts.layouts, self.hyphenated(invalid),
+                    self.chunk_rows)
+
+
+def live_streams(config: Dict[str, Any], stop: threading.Event) -> List[LiveStream]:
+    """The datalog and MFC streams of the configured data pack."""
+    folder = Path(config["Folder Path"])
+    plan = plan_columns(config)
+    discovered = discover(config)
+    datalog_format, mfc_format = timestamp_formats(config, discovered)
+    datalog_schema, mfc_schema = raw_schemas(config, discovered)
+    aggregation, max_gap = mfc_resampling(config)
+    precomparison = bool(output_plan(config)["Precomparison"])
+    common = dict(
+        stop=stop,
+        excluded_columns=config.get("Excluded Columns", []),
+        sentinels=sentinel_values(config),
+        chunk_rows=config.get("Chunk rows", DEFAULT_CHUNK_ROWS),
+        interval=config.get("Watch interval (s)", DEFAULT_WATCH_INTERVAL),
+    )
+    return [
+        LiveStream(
+            "Datalog", lambda: discover_files(folder).datalog_files,
+            plan.usecols, plan.names, plan.output_headers,
+            output_path(config, "_precomparison.csv") if precomparison else None,
+            output_path(config, "_DataPack_final.csv"),
+            additional_columns=config["Additional columns"],
+            timestamp_format=datalog_format,
+            schema=datalog_schema,
+            **common,
+        ),
+        LiveStream(
+            "MFC", lambda: discover_files(folder).mfc_files,
+            plan.usecols_mfc, plan.names_mfc, plan.output_headers_mfc,
+            output_path(config, "_MFC_precomparison.csv") if precomparison else None,
+            output_path(config, "_MFC_DataPack_final.csv"),
+            resample=True,
+            aggregation=aggregation,
+            max_gap=max_gap,
+            timestamp_format=mfc_format,
+            schema=mfc_schema,
+            **common,
+        ),
+    ]
+
+
+def _keep_running(stream: LiveStream, errors: List[BaseException]) -> None:
+    """Run a stream, rebuilding it whenever its history changes."""
+    try:
+        while True:
+            try:
+                stream.run()
+                return
+            except HistoryChanged as exc:
+                print(f"{stream.label}: {exc}; rebuilding from the raw files.")
+                if exc.dtypes is not None:
+                    stream.dtypes = exc.dtypes
+    except Exception as exc:
+        errors.append(exc)
+        stream.stop.set()
+
+
+def watch_data_packs(config: Dict[str, Any], stop: threading.Event | None = None) -> None:
+    """Keep the precomparison and final CSVs up to date as the raw files grow.
+
+    Polls the Folder Path every ``"Watch interval (s)"`` seconds (default 30)
+    until Ctrl+C is pressed or ``stop`` is set. The datalog and MFC streams
+    run side by side, each in its own thread.
+
+    Args:
+        config: The run configuration.
+        stop: Event that ends the watch, for callers such as the GUI.
+    """
+    stop = stop or threading.Event()
+    streams = live_streams(config, stop)
+    errors: List[BaseException] = []
+    threads = [
+        threading.Thread(target=_keep_running, args=(stream, errors), name=f"watch {stream.label}", daemon=True)
+        for stream in streams
+    ]
+    print(f"\nWatching {config['Folder Path']} every "
+          f"{streams[0].interval} s; press Ctrl+C to stop.")
+    if output_plan(config)["Combined"]:
+        print("The combined output is not written in watch mode.")
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("\nStopping; writing the rows held back so far...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]